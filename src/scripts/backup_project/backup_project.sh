@@ -1,8 +1,13 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
+SCRIPT_DIR="$(dirname "$(readlink -f "${BASH_SOURCE[0]}")")"
+SNAPSHOT_TOOL="${SCRIPT_DIR}/backup_snapshot.py"
+
 show_help() {
-  echo "Usage: backup_project <source_pattern...> [<destination_folder>] [<date>] [--no-compress] [--quiet]"
+  echo "Usage: backup_project <source_pattern...> [<destination_folder>] [<date>] [--no-compress]"
+  echo "                      [--compressor=NAME] [--level=N] [--incremental] [--quiet]"
+  echo "       backup_project list|restore|verify|prune [options] [--store=DIR]"
   echo
   echo "Arguments:"
   echo "  <source_pattern...>   One or more folders (wildcards allowed)."
@@ -12,6 +17,13 @@ show_help() {
   echo "Options:"
   echo "  --help                Show this help message and exit."
   echo "  --no-compress         Disable compression. By default, backups are compressed."
+  echo "  --compressor=NAME     auto (default), pigz, gzip or zstd. auto uses pigz (parallel)"
+  echo "                        when installed, else gzip; both write .tar.gz. zstd -T0"
+  echo "                        writes .tar.zst and is only used when asked for."
+  echo "  --level=N             Compression level: gzip 1-9, pigz 0-11, zstd 1-19"
+  echo "                        (default: 9 for pigz/gzip, 3 for zstd)."
+  echo "  --incremental         Record a snapshot in <destination_folder>/store instead of"
+  echo "                        a full copy: only new or changed file content is stored."
   echo "  --quiet               Suppress all output."
   echo
   echo "Examples:"
@@ -19,7 +31,35 @@ show_help() {
   echo "  backup_project src1 src2 /mnt/backups"
   echo "  backup_project src1 src2 /mnt/backups \"2025-11-06 08:00:00\""
   echo "  backup_project src1 src2 --no-compress"
+  echo "  backup_project src1 --compressor=zstd --level=10"
   echo "  backup_project src1 src2 --quiet"
+  echo "  backup_project src1 --incremental"
+  echo
+  echo "Snapshot commands (store defaults to ./.project_backups/store):"
+  echo "  backup_project list                         List snapshots."
+  echo "  backup_project restore <snapshot> <folder>  Recreate a snapshot (--force to"
+  echo "                                              restore into a non-empty folder)."
+  echo "  backup_project verify [<snapshot>...]       Check stored content (--quick only"
+  echo "                                              checks that it exists)."
+  echo "  backup_project prune --keep=N --keep-days=N Drop old snapshots and unreferenced"
+  echo "                                              content (--dry-run to preview)."
+}
+
+# run_snapshot_command:
+#   Hands list/restore/verify/prune to backup_snapshot.py. --store=DIR is a
+#   global option there, so it is moved in front of the command.
+run_snapshot_command() {
+  local store_args=()
+  local command_args=()
+
+  for arg in "$@"; do
+    case "$arg" in
+      --store=*) store_args+=("$arg") ;;
+      *) command_args+=("$arg") ;;
+    esac
+  done
+
+  exec python3 "$SNAPSHOT_TOOL" "${store_args[@]}" "${command_args[@]}"
 }
 
 if [ "${1:-}" = "--help" ]; then
@@ -27,9 +67,16 @@ if [ "${1:-}" = "--help" ]; then
   exit 0
 fi
 
+case "${1:-}" in
+  list|restore|verify|prune) run_snapshot_command "$@" ;;
+esac
+
 args=("$@")
 compress=true
 quiet=false
+compressor="auto"
+level=""
+incremental=false
 
 # Detect flags
 for i in "${!args[@]}"; do
@@ -42,9 +89,85 @@ for i in "${!args[@]}"; do
       quiet=true
       unset 'args[$i]'
       ;;
+    --compressor=*)
+      compressor="${args[$i]#*=}"
+      unset 'args[$i]'
+      ;;
+    --level=*)
+      level="${args[$i]#*=}"
+      unset 'args[$i]'
+      ;;
+    --incremental)
+      incremental=true
+      unset 'args[$i]'
+      ;;
   esac
 done
 
+# Re-index after removing flags so args[-1] is the last remaining argument
+args=("${args[@]}")
+
+# resolve_compressor:
+#   Picks the compressor for auto, sets the archive extension and default
+#   level, and checks that the compressor is installed and the level is in
+#   its range. Only called when a compressed archive is written.
+resolve_compressor() {
+  if [ "$compressor" = "auto" ]; then
+    # Keep gzip compatible output: zstd is only used when asked for
+    for candidate in pigz gzip; do
+      if command -v "$candidate" >/dev/null 2>&1; then
+        compressor="$candidate"
+        break
+      fi
+    done
+    if [ "$compressor" = "auto" ]; then
+      echo "Error: neither pigz nor gzip is installed (use --no-compress or --compressor=zstd)."
+      exit 1
+    fi
+  fi
+
+  case "$compressor" in
+    pigz)
+      archive_ext="tar.gz"
+      level="${level:-9}"
+      level_range=(0 11)
+      ;;
+    gzip)
+      archive_ext="tar.gz"
+      level="${level:-9}"
+      level_range=(1 9)
+      ;;
+    zstd)
+      archive_ext="tar.zst"
+      level="${level:-3}"
+      level_range=(1 19)
+      ;;
+    *)
+      echo "Error: unknown compressor '$compressor' (expected auto, pigz, zstd or gzip)."
+      exit 1
+      ;;
+  esac
+
+  if ! command -v "$compressor" >/dev/null 2>&1; then
+    echo "Error: compressor '$compressor' is not installed."
+    exit 1
+  fi
+
+  if ! [[ "$level" =~ ^[0-9]+$ ]]; then
+    echo "Error: '--level=$level' is not a number."
+    exit 1
+  fi
+
+  if [ "$((10#$level))" -lt "${level_range[0]}" ] || [ "$((10#$level))" -gt "${level_range[1]}" ]; then
+    echo "Error: '--level=$level' is out of range for $compressor (${level_range[0]}-${level_range[1]})."
+    exit 1
+  fi
+}
+
+if $compress && ! $incremental; then
+  resolve_compressor
+fi
+
 dest="./.project_backups"
 date_arg=""
 
@@ -78,9 +201,58 @@ else
   fi
 fi
 
+# archive_tree:
+#   Writes a tar stream of a source to stdout, excluding .git folders and the
+#   destination. Changes to files while they are read (tar status 1) are not
+#   fatal for a backup of a live tree. Records the uncompressed size in
+#   $totals_file.
+archive_tree() {
+  local src="$1"
+  local status=0
+
+  tar -C "$src" --totals \
+    --exclude="$(basename "$dest")" \
+    --exclude='.git' \
+    -cf - . 2> "$totals_file" || status=$?
+
+  grep -v '^Total bytes written' "$totals_file" >&2 || true
+  [ "$status" -le 1 ]
+}
+
+# compress_stream:
+#   Compresses stdin to stdout with the selected compressor on all cores.
+compress_stream() {
+  case "$compressor" in
+    pigz) pigz "-$level" ;;
+    zstd) zstd -q -T0 "-$level" ;;
+    gzip) gzip "-$level" ;;
+  esac
+}
+
+# human_size:
+#   Prints a byte count in human readable form.
+human_size() {
+  awk -v bytes="$1" 'BEGIN {
+    split("B K M G T", units)
+    for (i = 1; bytes >= 1024 && i < 5; i++) bytes /= 1024
+    printf (i == 1 ? "%d%s" : "%.1f%s"), bytes, units[i]
+  }'
+}
+
+# cleanup:
+#   Removes the partial archive and tar totals of an interrupted or failed
+#   compression, so no truncated archive is left behind.
+cleanup() {
+  rm -f "${partial_path:-}" "${totals_file:-}"
+}
+
+trap cleanup EXIT
+trap 'exit 1' INT TERM
+
 mkdir -p "$dest"
 
 archive_count=0
+snapshot_count=0
 source_count=0
 
 if ! $quiet; then
@@ -107,43 +279,68 @@ for src in "${sources[@]}"; do
   fi
 
   source_count=$((source_count + 1))
-  backup_dir="$dest/$(basename "$src")_$ts"
-  mkdir -p "$backup_dir"
 
-  if ! $quiet; then
-    echo "[*] Backing up $src -> $backup_dir ..."
-  fi
-  rsync -a --info=progress2 \
-    --exclude="$(basename "$dest")" \
-    --exclude='**/.git' \
-    "$src"/ "$backup_dir"/
-  if ! $quiet; then
-    echo "[✓] Backup complete for $src"
+  if $incremental; then
+    snapshot_args=(snapshot "$src" --timestamp="$ts" --exclude="$(basename "$dest")")
+    $quiet && snapshot_args+=(--quiet)
+    if ! $quiet; then
+      echo "[*] Recording snapshot of $src in $dest/store ..."
+    fi
+    python3 "$SNAPSHOT_TOOL" --store="$dest/store" "${snapshot_args[@]}"
+    snapshot_count=$((snapshot_count + 1))
+    if ! $quiet; then
+      echo
+    fi
+    continue
   fi
 
+  backup_dir="$dest/$(basename "$src")_$ts"
+  mkdir -p "$backup_dir"
+
   if $compress; then
-    archive_name="$(basename "$src")_$ts.tar.gz"
-    tmp_dir="./.project_backups_temp"
-    mkdir -p "$tmp_dir"
+    # Stream the source straight into the compressor: no staging copy
+    archive_name="$(basename "$src")_$ts.$archive_ext"
+    archive_path="$backup_dir/$archive_name"
+    partial_path="$archive_path.part"
+    totals_file="$(mktemp)"
 
     if ! $quiet; then
-      echo "[*] Compressing into $archive_name ..."
+      echo "[*] Compressing $src into $archive_path ($compressor -$level) ..."
     fi
-    if command -v pv >/dev/null 2>&1; then
-      tar -C "$backup_dir" -cf - . | pv | gzip -9 > "$tmp_dir/$archive_name"
+
+    start_ns="$(date +%s%N)"
+    if ! $quiet && command -v pv >/dev/null 2>&1; then
+      archive_tree "$src" | pv | compress_stream > "$partial_path"
     else
-      tar -czf "$tmp_dir/$archive_name" -C "$backup_dir" .
+      archive_tree "$src" | compress_stream > "$partial_path"
     fi
-
-    mv "$tmp_dir/$archive_name" "$backup_dir/$archive_name"
-    rm -rf "$tmp_dir"
-
-    # remove originals, leave only archive
-    find "$backup_dir" -mindepth 1 -maxdepth 1 ! -name "$archive_name" -exec rm -rf {} +
+    end_ns="$(date +%s%N)"
+    mv "$partial_path" "$archive_path"
+    partial_path=""
     archive_count=$((archive_count + 1))
 
     if ! $quiet; then
-      echo "[✓] Compression complete: $backup_dir/$archive_name"
+      raw_bytes="$(sed -n 's/^Total bytes written: \([0-9]*\).*/\1/p' "$totals_file")"
+      raw_bytes="${raw_bytes:-0}"
+      packed_bytes="$(stat -c%s "$archive_path")"
+      elapsed_ns=$((end_ns - start_ns))
+      [ "$elapsed_ns" -gt 0 ] || elapsed_ns=1
+      rate=$((raw_bytes * 1000000000 / elapsed_ns))
+      seconds="$(awk -v ns="$elapsed_ns" 'BEGIN { printf "%.2f", ns / 1e9 }')"
+      echo "[✓] Compression complete: $archive_path"
+      echo "    $(human_size "$raw_bytes") -> $(human_size "$packed_bytes") in ${seconds}s ($(human_size "$rate")/s)"
+    fi
+    rm -f "$totals_file"
+  else
+    if ! $quiet; then
+      echo "[*] Backing up $src -> $backup_dir ..."
+    fi
+    rsync -a --info=progress2 \
+      --exclude="$(basename "$dest")" \
+      --exclude='**/.git' \
+      "$src"/ "$backup_dir"/
+    if ! $quiet; then
+      echo "[✓] Backup complete for $src"
     fi
   fi
 
@@ -159,6 +356,7 @@ if ! $quiet; then
   echo "------------------------------------------------------------"
   echo "   Sources processed : $source_count"
   echo "   Archives created  : $archive_count"
+  echo "   Snapshots created : $snapshot_count"
   echo "   Destination       : $(realpath "$dest")"
   echo "============================================================"
 fi
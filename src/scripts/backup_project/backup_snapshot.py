@@ -0,0 +1,658 @@
+#!/usr/bin/env python3
+"""Incremental snapshots for backup_project.
+
+A snapshot records a source tree as a manifest that points into a
+content-addressed store instead of copying the tree again:
+
+- ``<store>/objects/ab/cdef...`` holds file content cut into CHUNK_SIZE
+  pieces, named by the SHA-256 of the piece and compressed with zlib. A
+  piece that is already stored, from any file or snapshot, is not stored
+  again.
+- ``<store>/snapshots/<name>_<timestamp>.json.gz`` lists every folder,
+  file and symlink of one backup with its mode and mtime, and for files
+  the pieces that make up their content.
+
+A file whose size, mtime and inode match the previous snapshot of the same
+source is taken over from that manifest without being read. Only new or
+changed files are read and hashed, on a thread pool.
+
+Objects are written before the manifest that refers to them, and both are
+written through a temporary file, synced to disk and renamed, so an
+interrupted run or a crash leaves at most unreferenced objects behind;
+``prune`` removes those. Snapshots hold a shared lock on the store and
+``prune`` an exclusive one, so an object a running snapshot reuses is
+never pruned before its manifest is written.
+"""
+
+import argparse
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import stat
+import sys
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+CHUNK_SIZE = 4 << 20
+
+STORE_VERSION = 1
+
+DEFAULT_STORE = "./.project_backups/store"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+SNAPSHOT_PATTERN = re.compile(r"^(?P<name>.+)_(?P<timestamp>\d{4}-\d\d-\d\d_\d\d-\d\d-\d\d)\.json\.gz$")
+
+ALWAYS_EXCLUDED = (".git",)
+
+COMPRESSION_LEVEL = 6
+
+LOCK_FILE = "lock"
+
+
+def format_size(size: float) -> str:
+    """Return a size in bytes in human readable form."""
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024 or unit == "G":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+@dataclass
+class SnapshotStats:
+    """Counters of one snapshot run.
+
+    Attributes:
+        files: Files in the snapshot.
+        unchanged: Files taken over from the previous snapshot unread.
+        read_bytes: Bytes read from changed or new files.
+        stored_bytes: Compressed bytes of objects added to the store.
+        new_objects: Objects added to the store.
+    """
+
+    files: int = 0
+    unchanged: int = 0
+    read_bytes: int = 0
+    stored_bytes: int = 0
+    new_objects: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_read(self, read_bytes: int, stored_bytes: int, new_objects: int) -> None:
+        """Count a file that was read, from any thread."""
+        with self._lock:
+            self.read_bytes += read_bytes
+            self.stored_bytes += stored_bytes
+            self.new_objects += new_objects
+
+
+class Store:
+    """Content-addressed objects and snapshot manifests under one folder.
+
+    Args:
+        root: Folder of the store. Created on first write.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+    @contextmanager
+    def lock(self, exclusive: bool = False, create: bool = False) -> Iterator[None]:
+        """Hold the store's lock while a command runs.
+
+        Snapshots, restores and checks share the lock; prune holds it
+        exclusively because it deletes objects the others may rely on.
+
+        Args:
+            exclusive: Take the lock exclusively instead of shared.
+            create: Create the store if it does not exist. Otherwise a
+                missing store has nothing to guard and is not locked.
+        """
+        if create:
+            os.makedirs(self.root, exist_ok=True)
+        elif not os.path.isdir(self.root):
+            yield
+            return
+
+        with open(os.path.join(self.root, LOCK_FILE), "a", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def object_path(self, digest: str) -> str:
+        """Return the path of an object."""
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def put(self, data: bytes) -> tuple[str, int]:
+        """Store a piece of content unless it is already stored.
+
+        Returns:
+            Tuple of (SHA-256 of data, compressed bytes written, 0 if the
+            object existed).
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+
+        packed = zlib.compress(data, COMPRESSION_LEVEL)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, packed)
+        return digest, len(packed)
+
+    def get(self, digest: str) -> bytes:
+        """Return the content of an object, checking its hash.
+
+        Raises:
+            ValueError: If the object is corrupt.
+            OSError: If the object cannot be read.
+        """
+        with open(self.object_path(digest), "rb") as f:
+            packed = f.read()
+        try:
+            data = zlib.decompress(packed)
+        except zlib.error as exc:
+            raise ValueError(f"object {digest} is corrupt: {exc}") from exc
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"object {digest} does not match its hash")
+        return data
+
+    def snapshot_names(self) -> list[str]:
+        """Return the names of all snapshots, oldest first per source."""
+        try:
+            files = os.listdir(self.snapshots_dir)
+        except FileNotFoundError:
+            return []
+        names = [file[: -len(".json.gz")] for file in files if SNAPSHOT_PATTERN.match(file)]
+        return sorted(names, key=split_name)
+
+    def snapshot_path(self, name: str) -> str:
+        """Return the manifest path of a snapshot."""
+        return os.path.join(self.snapshots_dir, f"{name}.json.gz")
+
+    def load_snapshot(self, name: str) -> dict:
+        """Read a snapshot manifest.
+
+        Raises:
+            ValueError: If the snapshot does not exist or is not readable.
+        """
+        try:
+            with gzip.open(self.snapshot_path(name), "rt", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError as exc:
+            raise ValueError(f"no snapshot named '{name}' in {self.root}") from exc
+        except (OSError, json.JSONDecodeError) as exc:
+            raise ValueError(f"snapshot '{name}' is not readable: {exc}") from exc
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"snapshot '{name}' has unsupported version {manifest.get('version')}")
+        return manifest
+
+    def save_snapshot(self, name: str, manifest: dict) -> int:
+        """Write a snapshot manifest and return its size in bytes."""
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        data = gzip.compress(json.dumps(manifest, separators=(",", ":")).encode(), mtime=0)
+        write_atomic(self.snapshot_path(name), data)
+        return len(data)
+
+    def latest_snapshot(self, source_name: str) -> dict | None:
+        """Return the newest manifest of a source, or None."""
+        names = [name for name in self.snapshot_names() if split_name(name)[0] == source_name]
+        if not names:
+            return None
+        try:
+            return self.load_snapshot(names[-1])
+        except ValueError:
+            return None
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write a file through a temporary file and rename.
+
+    The file is synced before the rename and its folder after it, so after
+    a crash the path holds either nothing or the complete content; put
+    trusts an existing object and would never rewrite a truncated one.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    folder = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(folder)
+    finally:
+        os.close(folder)
+
+
+def split_name(name: str) -> tuple[str, str]:
+    """Split a snapshot name into its source name and timestamp."""
+    match = SNAPSHOT_PATTERN.match(f"{name}.json.gz")
+    if match is None:
+        return name, ""
+    return match["name"], match["timestamp"]
+
+
+def scan(source: str, excludes: tuple[str, ...]):
+    """Yield the folders, files and symlinks of a tree in a stable order.
+
+    Folders or files named like an exclude are skipped at any depth, like
+    ``tar --exclude``. Other special files are ignored.
+
+    Yields:
+        Tuples of (kind, relative path, os.stat_result) where kind is
+        "dir", "file" or "symlink".
+    """
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = sorted(os.scandir(os.path.join(source, rel_dir)), key=lambda entry: entry.name)
+        except OSError as exc:
+            print(f"WARNING: could not read {os.path.join(source, rel_dir)}: {exc.strerror}", file=sys.stderr)
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if entry.name in excludes:
+                continue
+            rel_path = os.path.join(rel_dir, entry.name)
+            try:
+                info = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISLNK(info.st_mode):
+                yield "symlink", rel_path, info
+            elif stat.S_ISDIR(info.st_mode):
+                yield "dir", rel_path, info
+                subdirs.append(rel_path)
+            elif stat.S_ISREG(info.st_mode):
+                yield "file", rel_path, info
+
+        stack.extend(reversed(subdirs))
+
+
+def store_file(store: Store, path: str, stats: SnapshotStats) -> list[str] | None:
+    """Store the content of a file in pieces.
+
+    Returns:
+        Digests of the pieces, or None if the file could not be read.
+    """
+    digests = []
+    read_bytes = stored_bytes = new_objects = 0
+    try:
+        with open(path, "rb") as f:
+            while data := f.read(CHUNK_SIZE):
+                digest, stored = store.put(data)
+                digests.append(digest)
+                read_bytes += len(data)
+                stored_bytes += stored
+                new_objects += stored > 0
+    except OSError as exc:
+        print(f"WARNING: could not read {path}: {exc.strerror}", file=sys.stderr)
+        return None
+    stats.add_read(read_bytes, stored_bytes, new_objects)
+    return digests
+
+
+def snapshot(store: Store, source: str, timestamp: str, excludes: tuple[str, ...], jobs: int) -> tuple[str, dict]:
+    """Record a source tree as a new snapshot.
+
+    Args:
+        store: Store to write to.
+        source: Folder to back up.
+        timestamp: Timestamp of the snapshot in TIMESTAMP_FORMAT.
+        excludes: Extra names to skip besides ALWAYS_EXCLUDED.
+        jobs: Number of files read in parallel.
+
+    Returns:
+        Tuple of (snapshot name, manifest).
+    """
+    source_name = os.path.basename(os.path.abspath(source))
+    name = f"{source_name}_{timestamp}"
+    previous = store.latest_snapshot(source_name)
+    previous_files = {entry["path"]: entry for entry in previous["files"]} if previous else {}
+    stats = SnapshotStats()
+
+    dirs, files, symlinks, to_read = [], [], [], []
+    for kind, rel_path, info in scan(source, ALWAYS_EXCLUDED + excludes):
+        if kind == "dir":
+            dirs.append({"path": rel_path, "mode": stat.S_IMODE(info.st_mode), "mtime_ns": info.st_mtime_ns})
+        elif kind == "symlink":
+            try:
+                symlinks.append({"path": rel_path, "target": os.readlink(os.path.join(source, rel_path))})
+            except OSError:
+                continue
+        else:
+            entry = {
+                "path": rel_path,
+                "mode": stat.S_IMODE(info.st_mode),
+                "size": info.st_size,
+                "mtime_ns": info.st_mtime_ns,
+                "inode": info.st_ino,
+                "chunks": None,
+            }
+            old = previous_files.get(rel_path)
+            if old is not None and all(old[key] == entry[key] for key in ("size", "mtime_ns", "inode")):
+                entry["chunks"] = old["chunks"]
+                stats.unchanged += 1
+            else:
+                to_read.append(entry)
+            files.append(entry)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(lambda entry: store_file(store, os.path.join(source, entry["path"]), stats), to_read)
+        for entry, digests in zip(to_read, results, strict=True):
+            entry["chunks"] = digests
+
+    files = [entry for entry in files if entry["chunks"] is not None]
+    stats.files = len(files)
+    manifest = {
+        "version": STORE_VERSION,
+        "source": os.path.abspath(source),
+        "name": source_name,
+        "timestamp": timestamp,
+        "chunk_size": CHUNK_SIZE,
+        "dirs": dirs,
+        "files": files,
+        "symlinks": symlinks,
+        "stats": {
+            "files": stats.files,
+            "unchanged": stats.unchanged,
+            "read_bytes": stats.read_bytes,
+            "stored_bytes": stats.stored_bytes,
+            "new_objects": stats.new_objects,
+        },
+    }
+    manifest["stats"]["manifest_bytes"] = store.save_snapshot(name, manifest)
+    return name, manifest
+
+
+def restore(store: Store, name: str, target: str, force: bool = False) -> int:
+    """Recreate a snapshot in a folder.
+
+    Args:
+        store: Store holding the snapshot.
+        name: Snapshot name.
+        target: Folder to restore into.
+        force: Restore into a folder that is not empty.
+
+    Returns:
+        Number of files restored.
+
+    Raises:
+        ValueError: If the target is not empty or an object is corrupt.
+    """
+    manifest = store.load_snapshot(name)
+    if os.path.isdir(target) and os.listdir(target) and not force:
+        raise ValueError(f"'{target}' is not empty. Use --force to restore into it.")
+
+    os.makedirs(target, exist_ok=True)
+    for entry in manifest["dirs"]:
+        os.makedirs(os.path.join(target, entry["path"]), exist_ok=True)
+
+    for entry in manifest["files"]:
+        path = os.path.join(target, entry["path"])
+        with open(path, "wb") as f:
+            f.writelines(store.get(digest) for digest in entry["chunks"])
+        os.chmod(path, entry["mode"])
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    for entry in manifest["symlinks"]:
+        path = os.path.join(target, entry["path"])
+        if os.path.lexists(path):
+            os.unlink(path)
+        os.symlink(entry["target"], path)
+
+    # Deepest folders first, so setting a mtime is not undone by a child
+    for entry in reversed(manifest["dirs"]):
+        path = os.path.join(target, entry["path"])
+        os.chmod(path, entry["mode"])
+        os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+    return len(manifest["files"])
+
+
+def referenced_objects(store: Store, names: list[str]) -> set[str]:
+    """Return the digests of all objects the snapshots refer to."""
+    digests = set()
+    for name in names:
+        for entry in store.load_snapshot(name)["files"]:
+            digests.update(entry["chunks"])
+    return digests
+
+
+def verify(store: Store, names: list[str], quick: bool, jobs: int) -> list[str]:
+    """Check that every object of the snapshots exists and matches its hash.
+
+    Args:
+        store: Store holding the snapshots.
+        names: Snapshots to check.
+        quick: Only check that the objects exist.
+        jobs: Number of objects checked in parallel.
+
+    Returns:
+        Descriptions of the problems found, empty if everything matches.
+    """
+    try:
+        digests = sorted(referenced_objects(store, names))
+    except ValueError as exc:
+        return [str(exc)]
+
+    def check(digest: str) -> str | None:
+        if quick:
+            return None if os.path.exists(store.object_path(digest)) else f"object {digest} is missing"
+        try:
+            store.get(digest)
+        except FileNotFoundError:
+            return f"object {digest} is missing"
+        except (OSError, ValueError) as exc:
+            return str(exc)
+        return None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return [problem for problem in pool.map(check, digests) if problem]
+
+
+def select_pruned(names: list[str], keep: int | None, keep_days: int | None, now: datetime) -> list[str]:
+    """Return the snapshots retention does not keep.
+
+    A snapshot is kept if it is among the newest ``keep`` of its source or
+    younger than ``keep_days`` days. The newest snapshot of every source is
+    always kept.
+    """
+    by_source: dict[str, list[str]] = {}
+    for name in names:
+        by_source.setdefault(split_name(name)[0], []).append(name)
+
+    pruned = []
+    cutoff = now - timedelta(days=keep_days) if keep_days is not None else None
+    for source_names in by_source.values():
+        source_names.sort(key=lambda name: split_name(name)[1])
+        newest = max(keep or 0, 1)
+        for name in source_names[:-newest]:
+            created = datetime.strptime(split_name(name)[1], TIMESTAMP_FORMAT)
+            if cutoff is None or created < cutoff:
+                pruned.append(name)
+    return pruned
+
+
+def prune(store: Store, keep: int | None, keep_days: int | None, dry_run: bool) -> tuple[list[str], int, int]:
+    """Delete snapshots retention does not keep, then unreferenced objects.
+
+    Must run under the store's exclusive lock: objects a running snapshot
+    reuses are not referenced until its manifest is written, and its
+    temporary files are still being written.
+
+    Returns:
+        Tuple of (pruned snapshot names, objects removed, bytes freed).
+    """
+    names = store.snapshot_names()
+    pruned = select_pruned(names, keep, keep_days, datetime.now())
+    kept = [name for name in names if name not in set(pruned)]
+    referenced = referenced_objects(store, kept)
+
+    if not dry_run:
+        for name in pruned:
+            os.unlink(store.snapshot_path(name))
+
+    removed = freed = 0
+    if not os.path.isdir(store.objects_dir):
+        return pruned, removed, freed
+    for prefix in os.listdir(store.objects_dir):
+        folder = os.path.join(store.objects_dir, prefix)
+        for rest in os.listdir(folder):
+            path = os.path.join(folder, rest)
+            # Leftovers of an interrupted write are never referenced; under
+            # the exclusive lock no write is in flight
+            if prefix + rest in referenced:
+                continue
+            removed += 1
+            freed += os.path.getsize(path)
+            if not dry_run:
+                os.unlink(path)
+    return pruned, removed, freed
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Incremental content-addressed snapshots for backup_project.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  backup_snapshot.py snapshot ~/projects/app --timestamp=2025-11-06_08-00-00
+  backup_snapshot.py list
+  backup_snapshot.py restore app_2025-11-06_08-00-00 /tmp/app
+  backup_snapshot.py verify
+  backup_snapshot.py prune --keep=7 --keep-days=30
+""",
+    )
+    parser.add_argument(
+        "--store",
+        default=DEFAULT_STORE,
+        help=f"Folder of the snapshot store (default: {DEFAULT_STORE})",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Files or objects processed in parallel (default: number of CPUs)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="Record a folder as a new snapshot")
+    snapshot_parser.add_argument("source", help="Folder to back up")
+    snapshot_parser.add_argument(
+        "--timestamp",
+        default=None,
+        help="Snapshot timestamp as YYYY-MM-DD_HH-MM-SS (default: now)",
+    )
+    snapshot_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Skip folders and files with this name at any depth, besides .git (repeatable)",
+    )
+    snapshot_parser.add_argument("--quiet", action="store_true", help="Print nothing on success")
+
+    subparsers.add_parser("list", help="List snapshots")
+
+    restore_parser = subparsers.add_parser("restore", help="Recreate a snapshot in a folder")
+    restore_parser.add_argument("snapshot", help="Snapshot name, as shown by list")
+    restore_parser.add_argument("target", help="Folder to restore into")
+    restore_parser.add_argument("--force", action="store_true", help="Restore into a folder that is not empty")
+
+    verify_parser = subparsers.add_parser("verify", help="Check that snapshot objects exist and are intact")
+    verify_parser.add_argument("snapshots", nargs="*", help="Snapshots to check (default: all)")
+    verify_parser.add_argument("--quick", action="store_true", help="Only check that objects exist")
+
+    prune_parser = subparsers.add_parser("prune", help="Apply retention and remove unreferenced objects")
+    prune_parser.add_argument("--keep", type=int, help="Keep the newest N snapshots of each source")
+    prune_parser.add_argument("--keep-days", type=int, help="Keep snapshots younger than N days")
+    prune_parser.add_argument("--dry-run", action="store_true", help="Only show what would be removed")
+
+    parsed = parser.parse_args(args)
+    if parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if parsed.command == "prune" and parsed.keep is None and parsed.keep_days is None:
+        parser.error("prune needs --keep and/or --keep-days")
+    if parsed.command == "snapshot" and parsed.timestamp is not None:
+        try:
+            datetime.strptime(parsed.timestamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            parser.error(f"--timestamp '{parsed.timestamp}' is not YYYY-MM-DD_HH-MM-SS")
+    return parsed
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+    store = Store(args.store)
+    start = time.perf_counter()
+
+    try:
+        with store.lock(
+            exclusive=args.command == "prune" and not args.dry_run,
+            create=args.command == "snapshot",
+        ):
+            if args.command == "snapshot":
+                if not os.path.isdir(args.source):
+                    raise ValueError(f"'{args.source}' is not a folder")
+                timestamp = args.timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)
+                name, manifest = snapshot(store, args.source, timestamp, tuple(args.exclude), args.jobs)
+                if not args.quiet:
+                    stats = manifest["stats"]
+                    elapsed = time.perf_counter() - start
+                    print(f"[✓] Snapshot {name}: {stats['files']} files, {stats['unchanged']} unchanged")
+                    print(
+                        f"    read {format_size(stats['read_bytes'])}, stored {stats['new_objects']} new objects "
+                        f"({format_size(stats['stored_bytes'])}) + manifest {format_size(stats['manifest_bytes'])} "
+                        f"in {elapsed:.2f}s"
+                    )
+
+            elif args.command == "list":
+                for name in store.snapshot_names():
+                    stats = store.load_snapshot(name)["stats"]
+                    print(f"{name}  {stats['files']} files, {format_size(stats['stored_bytes'])} new")
+
+            elif args.command == "restore":
+                count = restore(store, args.snapshot, args.target, args.force)
+                elapsed = time.perf_counter() - start
+                print(f"Restored {count} files from {args.snapshot} into {args.target} in {elapsed:.2f}s")
+
+            elif args.command == "verify":
+                names = args.snapshots or store.snapshot_names()
+                problems = verify(store, names, args.quick, args.jobs)
+                for problem in problems:
+                    print(f"FAILED: {problem}", file=sys.stderr)
+                if problems:
+                    sys.exit(1)
+                print(f"OK: {len(names)} snapshots verified in {time.perf_counter() - start:.2f}s")
+
+            elif args.command == "prune":
+                pruned, removed, freed = prune(store, args.keep, args.keep_days, args.dry_run)
+                verb = "Would remove" if args.dry_run else "Removed"
+                for name in pruned:
+                    print(f"{verb} snapshot {name}")
+                print(f"{verb} {len(pruned)} snapshots and {removed} objects ({format_size(freed)})")
+
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,49 @@ Dart files, making it easier to import multiple files from a single location.
 """
 
 import argparse
+import ctypes
+import ctypes.util
+import difflib
+import hashlib
+import itertools
+import json
+import os
+import select
+import struct
 import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
 
 MAGIC_HEADER = "/* created by barrel.py */"
+MANIFEST_NAME = ".barrelpy_manifest.json"
+INDEX_NAME = ".barrelpy_index"
+WATCH_DEBOUNCE = 0.3
+POLL_INTERVAL = 1.0
+
+
+@dataclass
+class Manifest:
+    """Directory fingerprints used by incremental runs.
+
+    Attributes:
+        previous: Entries loaded from the last run, keyed by directory path.
+        current: Entries recorded during this run, keyed by directory path.
+    """
+
+    previous: dict[str, dict[str, str]]
+    current: dict[str, dict[str, str]] = field(default_factory=dict)
 
 
 def show_help() -> None:
     """Display usage instructions and exit."""
-    print("Usage: barrelpy <create|delete> [--folder=.] [--target=name] [--yes] [--quiet]")
+    print(
+        "Usage: barrelpy <create|delete|check|watch> [--folder=.] [--target=name] "
+        "[--incremental] [--jobs=N] [--rescan] [--debounce=SECONDS] [--poll] "
+        "[--yes] [--quiet]"
+    )
     sys.exit(1)
 
 
@@ -26,7 +60,8 @@ def parse_arguments(args: list[str]) -> argparse.Namespace:
         args: Command line arguments passed to the script.
 
     Returns:
-        Parsed arguments namespace with verb, folder, target, yes, and quiet.
+        Parsed arguments namespace with verb, folder (list of roots), target,
+        incremental, jobs, rescan, debounce, poll, yes, and quiet.
     """
     parser = argparse.ArgumentParser(
         description="Barrel file generator for Dart projects",
@@ -34,19 +69,46 @@ def parse_arguments(args: list[str]) -> argparse.Namespace:
     )
     parser.add_argument(
         "verb",
-        choices=["create", "delete"],
-        help="Command to execute: create or delete barrel files",
+        choices=["create", "delete", "check", "watch"],
+        help="Command to execute: create, delete, check, or watch barrel files",
     )
     parser.add_argument(
         "--folder",
-        default=".",
-        help="Folder to process (default: current directory)",
+        action="append",
+        help="Folder to process; repeat for several roots (default: current directory)",
     )
     parser.add_argument(
         "--target",
         default="",
         help="Target name for the root barrel file",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate directories whose listing changed since the last run",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker threads for listing and writing (default: 1)",
+    )
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Delete by scanning the folder instead of using the generated-file index",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help=f"Seconds of quiet before watch regenerates (default: {WATCH_DEBOUNCE})",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Watch by polling directory listings instead of inotify",
+    )
     parser.add_argument(
         "--yes",
         action="store_true",
@@ -63,7 +125,24 @@ def parse_arguments(args: list[str]) -> argparse.Namespace:
     if parsed.quiet:
         parsed.yes = True
 
-    parsed.folder = parsed.folder.rstrip("/")
+    if parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    parsed.folder = [folder.rstrip("/") for folder in parsed.folder or ["."]]
+
+    if len(parsed.folder) > 1 and parsed.target:
+        parser.error("--target cannot be combined with several --folder roots")
+
+    # Root files are written to the cwd, so roots sharing a name would
+    # overwrite each other's root barrel
+    roots: dict[Path, str] = {}
+    for folder in parsed.folder:
+        _, root_file = determine_root_filename(folder, parsed.target)
+        if root_file in roots:
+            parser.error(
+                f"--folder {roots[root_file]} and --folder {folder} would both write {root_file}"
+            )
+        roots[root_file] = folder
 
     return parsed
 
@@ -110,54 +189,704 @@ def is_safe_to_delete(file_path: Path) -> bool:
     return False
 
 
-def generate_recursive(
-    directory: Path,
-    explicit_output: Path | None = None,
-) -> None:
-    """Recursively generate barrel files.
+def load_manifest(folder: Path) -> Manifest:
+    """Load the incremental manifest stored under a folder.
 
     Args:
-        directory: Directory to process.
+        folder: Root folder of the barrel tree.
+
+    Returns:
+        Manifest seeded with the previous run's entries, or empty if there is
+        no readable manifest.
+    """
+    try:
+        with open(folder / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return Manifest(previous={})
+
+    if not isinstance(data, dict) or not isinstance(data.get("directories"), dict):
+        return Manifest(previous={})
+
+    return Manifest(previous=data["directories"])
+
+
+def save_manifest(folder: Path, manifest: Manifest) -> None:
+    """Store the entries recorded during this run as the new manifest.
+
+    Directories that were not visited (because they were removed) drop out
+    of the manifest automatically.
+
+    Args:
+        folder: Root folder of the barrel tree.
+        manifest: Manifest holding this run's entries.
+    """
+    content = json.dumps(
+        {"version": 1, "directories": manifest.current},
+        indent=1,
+        sort_keys=True,
+    )
+    write_if_changed(folder / MANIFEST_NAME, content + "\n")
+
+
+def load_index(folder: Path) -> dict[Path, str] | None:
+    """Load the generated-file index stored under a folder.
+
+    Args:
+        folder: Root folder of the barrel tree.
+
+    Returns:
+        Mapping of barrel path to content hash, or None if there is no index.
+    """
+    try:
+        with open(folder / INDEX_NAME, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    index: dict[Path, str] = {}
+    for line in lines:
+        digest, sep, rel_path = line.partition("  ")
+        if sep:
+            index[folder / rel_path] = digest
+    return index
+
+
+def save_index(folder: Path, index: dict[Path, str]) -> None:
+    """Store the generated-file index under a folder.
+
+    The format matches ``sha256sum`` output, so ``sha256sum -c`` run from the
+    folder also verifies the barrels.
+
+    Args:
+        folder: Root folder of the barrel tree.
+        index: Mapping of barrel path to content hash.
+    """
+    entries = sorted(
+        (path.relative_to(folder).as_posix(), digest) for path, digest in index.items()
+    )
+    write_if_changed(
+        folder / INDEX_NAME,
+        "".join(f"{digest}  {rel_path}\n" for rel_path, digest in entries),
+    )
+
+
+def listing_fingerprint(dart_names: list[str], subdir_names: list[str]) -> str:
+    """Fingerprint the parts of a directory listing that shape its barrel.
+
+    Args:
+        dart_names: Names of the Dart files in the directory.
+        subdir_names: Names of the subdirectories.
+
+    Returns:
+        Hex digest identifying the listing.
+    """
+    digest = hashlib.sha1()
+    for name in sorted(dart_names):
+        digest.update(f"f:{name}\0".encode())
+    for name in sorted(subdir_names):
+        digest.update(f"d:{name}\0".encode())
+    return digest.hexdigest()
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of generated barrel content."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def write_if_changed(file_path: Path, content: str) -> bool:
+    """Write content to a file unless it already holds exactly that content.
+
+    Skipping identical writes keeps mtimes stable, so the Dart analyzer and
+    build_runner do not treat untouched barrels as modified.
+
+    Args:
+        file_path: Path to the file to write.
+        content: Full text to store.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+    """
+    data = content.encode()
+    try:
+        if file_path.stat().st_size == len(data) and file_path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+
+    file_path.write_bytes(data)
+    return True
+
+
+@dataclass
+class DirListing:
+    """Names found by a single pass over one directory.
+
+    Attributes:
+        dart_files: Sorted names of the non-directory ``.dart`` entries.
+        subdirs: Sorted names of the subdirectories.
+    """
+
+    dart_files: list[str]
+    subdirs: list[str]
+
+
+def scan_directory(directory: Path) -> DirListing:
+    """List a directory once, splitting Dart files from subdirectories.
+
+    Uses the dirent type reported by ``os.scandir``, so no per-entry stat is
+    needed except for symlinks.
+
+    Args:
+        directory: Directory to list.
+
+    Returns:
+        Listing with sorted Dart file and subdirectory names.
+    """
+    dart_files: list[str] = []
+    subdirs: list[str] = []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                subdirs.append(entry.name)
+            elif entry.name.endswith(".dart"):
+                dart_files.append(entry.name)
+
+    dart_files.sort()
+    subdirs.sort()
+    return DirListing(dart_files, subdirs)
+
+
+def barrel_output(directory: Path, explicit_output: Path | None = None) -> Path:
+    """Return the barrel file a directory's exports are written to.
+
+    Args:
+        directory: Directory being processed.
         explicit_output: Explicit output filename, or None for auto-generated name.
+
+    Returns:
+        Path of the barrel file for the directory.
     """
+    if explicit_output:
+        return explicit_output
+
     base_name = directory.name if directory.name != "." else "barrel"
+    return directory / f"exports_{base_name}.dart"
 
-    if explicit_output:
-        output_file = explicit_output
-    else:
-        output_file = directory / f"exports_{base_name}.dart"
 
-    lines: list[str] = [MAGIC_HEADER, ""]
+def render_barrel(
+    directory: Path,
+    listing: DirListing,
+    output_file: Path,
+    scan_root: bool = False,
+) -> str:
+    """Build the barrel content for one directory from its listing.
+
+    Root barrels of earlier runs must not be exported. They are named
+    barrel.dart, after the folder they re-export, or after --target, so
+    only barrel.dart, files named like a subdirectory and, in a folder
+    root, every candidate file have their header read. Everywhere else
+    the listing alone decides and no source file is opened.
+
+    Args:
+        directory: Directory being processed.
+        listing: Single-pass listing of the directory.
+        output_file: Barrel file the content is written to.
+        scan_root: The directory is a --folder root.
 
-    dart_files = sorted(directory.glob("*.dart"))
-    for dart_file in dart_files:
-        fname = dart_file.name
+    Returns:
+        Full text of the barrel file.
+    """
+    lines: list[str] = [MAGIC_HEADER, ""]
+    subdirs = set(listing.subdirs)
 
-        if dart_file == output_file or Path(f"./{fname}") == output_file:
+    for fname in listing.dart_files:
+        if fname == output_file.name:
             continue
 
-        if fname.startswith("exports_") and fname.endswith(".dart"):
+        if fname.startswith("exports_"):
             continue
 
         if fname.endswith(".g.dart"):
             continue
 
-        if is_safe_to_delete(dart_file):
+        may_be_root = scan_root or fname == "barrel.dart" or fname[: -len(".dart")] in subdirs
+        if may_be_root and is_safe_to_delete(directory / fname):
             continue
 
         lines.append(f'export "{fname}";')
 
-    subdirs = sorted([d for d in directory.iterdir() if d.is_dir()])
-    for subdir in subdirs:
-        sub_name = subdir.name
+    for sub_name in listing.subdirs:
+        lines.append(f'export "{sub_name}/exports_{sub_name}.dart";')
 
-        generate_recursive(subdir, None)
+    return "\n".join(lines) + "\n"
 
-        lines.append(f'export "{sub_name}/exports_{sub_name}.dart";')
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
-        f.write("\n")
+def render_root_barrel(folder: Path) -> str:
+    """Build the root barrel content for a folder other than the current one.
+
+    Args:
+        folder: Folder whose top-level barrel the root file re-exports.
+
+    Returns:
+        Full text of the root barrel file.
+    """
+    inner_export = folder / f"exports_{folder.name}.dart"
+    return f'{MAGIC_HEADER}\n\nexport "{inner_export}";\n'
+
+
+def update_barrel(
+    directory: Path,
+    listing: DirListing,
+    output_file: Path,
+    manifest: Manifest | None,
+    index: dict[Path, str] | None = None,
+    scan_root: bool = False,
+) -> bool:
+    """Regenerate one directory's barrel file if it may have changed.
+
+    Args:
+        directory: Directory being processed.
+        listing: Single-pass listing of the directory.
+        output_file: Barrel file the content is written to.
+        manifest: Incremental manifest, or None to always regenerate.
+        index: Generated-file index to record the barrel's hash in, or None.
+        scan_root: The directory is a --folder root.
+
+    Returns:
+        True if the barrel file was written.
+    """
+    entry = None
+    previous = None
+    if manifest is not None:
+        key = directory.as_posix()
+        previous = manifest.previous.get(key)
+        if previous and previous.get("fingerprint") == listing_fingerprint(
+            listing.dart_files, listing.subdirs
+        ):
+            manifest.current[key] = previous
+            if index is not None and "hash" in previous:
+                index[output_file] = previous["hash"]
+            return False
+
+        written_names = set(listing.dart_files) | {output_file.name}
+        entry = {
+            "fingerprint": listing_fingerprint(list(written_names), listing.subdirs),
+        }
+        manifest.current[key] = entry
+
+    content = render_barrel(directory, listing, output_file, scan_root)
+
+    if index is not None:
+        index[output_file] = content_hash(content)
+
+    if entry is not None:
+        digest = index[output_file] if index is not None else content_hash(content)
+        unchanged = previous is not None and previous.get("hash") == digest
+        entry["hash"] = digest
+        if unchanged and output_file.name in listing.dart_files:
+            return False
+
+    return write_if_changed(output_file, content)
+
+
+def generate_recursive(
+    directory: Path,
+    explicit_output: Path | None = None,
+    manifest: Manifest | None = None,
+    index: dict[Path, str] | None = None,
+    scan_root: bool = True,
+) -> None:
+    """Recursively generate barrel files.
+
+    Args:
+        directory: Directory to process.
+        explicit_output: Explicit output filename, or None for auto-generated name.
+        manifest: Incremental manifest, or None to regenerate every directory.
+        index: Generated-file index to record every barrel in, or None.
+        scan_root: The directory is a --folder root.
+    """
+    listing = scan_directory(directory)
+
+    for sub_name in listing.subdirs:
+        generate_recursive(directory / sub_name, None, manifest, index, scan_root=False)
+
+    update_barrel(
+        directory,
+        listing,
+        barrel_output(directory, explicit_output),
+        manifest,
+        index,
+        scan_root,
+    )
+
+
+def iter_barrels(
+    directory: Path,
+    explicit_output: Path | None = None,
+    scan_root: bool = True,
+) -> Iterator[tuple[Path, str]]:
+    """Yield the barrel files generate_recursive would write, without writing.
+
+    Args:
+        directory: Directory to process.
+        explicit_output: Explicit output filename, or None for auto-generated name.
+        scan_root: The directory is a --folder root.
+
+    Yields:
+        Tuples of (barrel path, expected content), children before parents.
+    """
+    listing = scan_directory(directory)
+
+    for sub_name in listing.subdirs:
+        yield from iter_barrels(directory / sub_name, None, scan_root=False)
+
+    output_file = barrel_output(directory, explicit_output)
+    yield output_file, render_barrel(directory, listing, output_file, scan_root)
+
+
+def generate_parallel(
+    directory: Path,
+    explicit_output: Path | None,
+    manifest: Manifest | None,
+    pool: ThreadPoolExecutor,
+    index: dict[Path, str] | None = None,
+) -> None:
+    """Generate barrel files with directory listings and writes on a pool.
+
+    Sibling subtrees are listed concurrently. Barrels are then written one
+    depth level at a time, deepest first, so every child barrel exists
+    before its parent's export line is written. The output is the same as
+    generate_recursive's.
+
+    Args:
+        directory: Root directory to process.
+        explicit_output: Explicit output filename for the root, or None.
+        manifest: Incremental manifest, or None to regenerate every directory.
+        pool: Worker pool used for listing and writing.
+        index: Generated-file index to record every barrel in, or None.
+    """
+    levels: list[list[tuple[Path, DirListing]]] = []
+    pending = {pool.submit(scan_directory, directory): (directory, 0)}
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, depth = pending.pop(future)
+            listing = future.result()
+
+            if depth == len(levels):
+                levels.append([])
+            levels[depth].append((path, listing))
+
+            for sub_name in listing.subdirs:
+                subdir = path / sub_name
+                pending[pool.submit(scan_directory, subdir)] = (subdir, depth + 1)
+
+    root_listing = levels[0][0][1]
+
+    def write_barrel(item: tuple[Path, DirListing]) -> None:
+        path, listing = item
+        update_barrel(path, listing, barrel_output(path), manifest, index)
+
+    for level in reversed(levels[1:]):
+        list(pool.map(write_barrel, level))
+
+    update_barrel(
+        directory,
+        root_listing,
+        barrel_output(directory, explicit_output),
+        manifest,
+        index,
+        scan_root=True,
+    )
+
+
+def affects_barrel(name: str, is_dir: bool) -> bool:
+    """Tell whether adding or removing an entry can change a barrel.
+
+    Mirrors the exclusions in render_barrel: other barrels, generated
+    ``*.g.dart`` files and non-Dart files never appear in exports.
+
+    Args:
+        name: Name of the entry that changed.
+        is_dir: Whether the entry is a directory.
+
+    Returns:
+        True if the parent directory's barrel may need regenerating.
+    """
+    if is_dir:
+        return True
+
+    return (
+        name.endswith(".dart")
+        and not name.startswith("exports_")
+        and not name.endswith(".g.dart")
+    )
+
+
+class InotifyWatcher:
+    """Directory watcher backed by Linux inotify through ctypes."""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: dict[int, Path] = {}
+
+    def add_tree(self, directory: Path) -> None:
+        """Watch a directory and every directory below it."""
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), self.WATCH_MASK
+        )
+        if wd < 0:
+            return
+        self.watches[wd] = directory
+
+        try:
+            listing = scan_directory(directory)
+        except OSError:
+            return
+        for sub_name in listing.subdirs:
+            self.add_tree(directory / sub_name)
+
+    def wait(self, timeout: float | None) -> tuple[set[Path], set[Path], bool]:
+        """Wait for directory changes.
+
+        Args:
+            timeout: Seconds to wait, or None to block until something changes.
+
+        Returns:
+            Tuple of (directories whose barrel may change, directories that
+            appeared, whether the event queue overflowed).
+        """
+        dirty: set[Path] = set()
+        created: set[Path] = set()
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return dirty, created, False
+
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        overflow = False
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+
+            if mask & self.IN_IGNORED:
+                del self.watches[wd]
+                continue
+
+            name = os.fsdecode(raw_name)
+            is_dir = bool(mask & self.IN_ISDIR)
+            if not affects_barrel(name, is_dir):
+                continue
+
+            dirty.add(directory)
+            if is_dir and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                created.add(directory / name)
+
+        return dirty, created, overflow
+
+    def close(self) -> None:
+        """Release the inotify file descriptor."""
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Directory watcher that rescans listings on an interval."""
+
+    def __init__(self, interval: float = POLL_INTERVAL) -> None:
+        self.interval = interval
+        self.roots: list[Path] = []
+        self.fingerprints: dict[Path, str] = {}
+
+    def add_tree(self, directory: Path) -> None:
+        """Watch a directory and every directory below it."""
+        if not any(directory.is_relative_to(root) for root in self.roots):
+            self.roots.append(directory)
+        self.fingerprints.update(self.snapshot(directory))
+
+    def snapshot(self, directory: Path) -> dict[Path, str]:
+        """Fingerprint the barrel-relevant listing of every directory in a tree."""
+        fingerprints: dict[Path, str] = {}
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                listing = scan_directory(current)
+            except OSError:
+                continue
+            dart_names = [n for n in listing.dart_files if affects_barrel(n, False)]
+            fingerprints[current] = listing_fingerprint(dart_names, listing.subdirs)
+            stack.extend(current / sub_name for sub_name in listing.subdirs)
+        return fingerprints
+
+    def wait(self, timeout: float | None) -> tuple[set[Path], set[Path], bool]:
+        """Wait for directory changes.
+
+        Args:
+            timeout: Seconds to wait, or None to poll until something changes.
+
+        Returns:
+            Tuple of (directories whose barrel may change, directories that
+            appeared, whether the event queue overflowed).
+        """
+        while True:
+            time.sleep(self.interval if timeout is None else timeout)
+
+            current: dict[Path, str] = {}
+            for root in self.roots:
+                current.update(self.snapshot(root))
+
+            dirty = {
+                path
+                for path, fingerprint in current.items()
+                if self.fingerprints.get(path) != fingerprint
+            }
+            created = {path for path in current if path not in self.fingerprints}
+            self.fingerprints = current
+
+            if dirty or timeout is not None:
+                return dirty - created, created, False
+
+    def close(self) -> None:
+        """Nothing to release for the polling watcher."""
+
+
+def open_watcher(poll: bool) -> InotifyWatcher | PollingWatcher:
+    """Open the best available watcher.
+
+    Args:
+        poll: Force the polling watcher even when inotify is available.
+
+    Returns:
+        An inotify watcher on Linux, otherwise a polling watcher.
+    """
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher()
+
+
+def remove_stale_barrels(directory: Path, index: dict[Path, str]) -> list[Path]:
+    """Remove generated barrels named after another directory.
+
+    A directory that was renamed, or copied from another one, still holds
+    the barrel named after its old name. Only files with the magic header
+    are removed, and they are dropped from the index.
+
+    Args:
+        directory: Directory that appeared under a watched root.
+        index: Generated-file index of the root.
+
+    Returns:
+        Barrel files that were removed.
+    """
+    try:
+        listing = scan_directory(directory)
+    except OSError:
+        return []
+
+    expected = barrel_output(directory).name
+    removed = []
+    for fname in listing.dart_files:
+        path = directory / fname
+        if fname.startswith("exports_") and fname != expected and is_safe_to_delete(path):
+            path.unlink(missing_ok=True)
+            index.pop(path, None)
+            removed.append(path)
+    return removed
+
+
+def refresh_directory(
+    directory: Path,
+    explicit_output: Path | None,
+    index: dict[Path, str] | None = None,
+    scan_root: bool = False,
+) -> bool:
+    """Regenerate a single directory's barrel without recursing.
+
+    Args:
+        directory: Directory whose listing changed.
+        explicit_output: Explicit output filename, or None for auto-generated name.
+        index: Generated-file index to record the barrel's hash in, or None.
+        scan_root: The directory is a --folder root.
+
+    Returns:
+        True if the barrel file was written.
+    """
+    try:
+        listing = scan_directory(directory)
+    except OSError:
+        return False
+
+    return update_barrel(
+        directory,
+        listing,
+        barrel_output(directory, explicit_output),
+        None,
+        index,
+        scan_root,
+    )
+
+
+def delete_indexed(index: dict[Path, str], quiet: bool) -> None:
+    """Delete the barrels recorded in a generated-file index.
+
+    Each file is checked for the magic header and its recorded hash before
+    it is removed. Files that were edited by hand are reported and kept.
+
+    Args:
+        index: Mapping of barrel path to content hash.
+        quiet: Suppress output.
+    """
+    for export_file, digest in sorted(index.items()):
+        try:
+            data = export_file.read_bytes()
+        except OSError:
+            continue
+
+        if not data.startswith(f"{MAGIC_HEADER}\n".encode()):
+            if not quiet:
+                print(f"Skipped (not generated): {export_file}")
+            continue
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            if not quiet:
+                print(f"Skipped (modified since create): {export_file}")
+            continue
+
+        export_file.unlink()
+        if not quiet:
+            print(f"Deleted: {export_file}")
 
 
 def perform_delete(
@@ -165,14 +894,19 @@ def perform_delete(
     folder: Path,
     yes: bool,
     quiet: bool,
+    rescan: bool = False,
 ) -> None:
     """Delete the root file and recursive export files.
 
+    Uses the index written by create when there is one, and falls back to
+    scanning the folder for exports_*.dart files otherwise.
+
     Args:
         root_file: Path to the root barrel file.
         folder: Folder to scan for export files.
         yes: Skip confirmation prompt.
         quiet: Suppress output.
+        rescan: Scan the folder even when an index exists.
     """
     if not quiet:
         print("--------------------------------------------------")
@@ -191,11 +925,23 @@ def perform_delete(
         if not quiet:
             print(f"Deleted: {root_file}")
 
-    for export_file in folder.rglob("exports_*.dart"):
-        if is_safe_to_delete(export_file):
-            export_file.unlink()
-            if not quiet:
-                print(f"Deleted: {export_file}")
+    index = None if rescan else load_index(folder)
+
+    if index is not None:
+        delete_indexed(index, quiet)
+    else:
+        if not quiet and not rescan:
+            print(f"No {INDEX_NAME} in {folder}, scanning for exports_*.dart files.")
+
+        for export_file in folder.rglob("exports_*.dart"):
+            if is_safe_to_delete(export_file):
+                export_file.unlink()
+                if not quiet:
+                    print(f"Deleted: {export_file}")
+
+    for generated in (folder / MANIFEST_NAME, folder / INDEX_NAME):
+        if generated.is_file():
+            generated.unlink()
 
     if not quiet:
         print("Done.")
@@ -206,6 +952,8 @@ def perform_create(
     folder: Path,
     yes: bool,
     quiet: bool,
+    incremental: bool = False,
+    jobs: int = 1,
 ) -> None:
     """Create the barrel files.
 
@@ -214,6 +962,9 @@ def perform_create(
         folder: Folder to scan for Dart files.
         yes: Skip confirmation prompt.
         quiet: Suppress output.
+        incremental: Skip directories whose listing is unchanged since the
+            last incremental run.
+        jobs: Number of worker threads; 1 walks the tree sequentially.
     """
     if not folder.is_dir():
         print(f"Error: Folder '{folder}' does not exist.")
@@ -231,33 +982,251 @@ def perform_create(
         if response != "y":
             return
 
-    if str(folder) == ".":
-        generate_recursive(folder, root_file)
+    manifest = load_manifest(folder) if incremental else None
+    index: dict[Path, str] = {}
+
+    explicit_output = root_file if str(folder) == "." else None
+
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            generate_parallel(folder, explicit_output, manifest, pool, index)
     else:
-        generate_recursive(folder, None)
+        generate_recursive(folder, explicit_output, manifest, index)
+
+    if explicit_output is None:
+        write_if_changed(root_file, render_root_barrel(folder))
 
-        inner_export = folder / f"exports_{folder.name}.dart"
-        with open(root_file, "w", encoding="utf-8") as f:
-            f.write(f"{MAGIC_HEADER}\n\n")
-            f.write(f'export "{inner_export}";\n')
+    save_index(folder, index)
+
+    if manifest is not None:
+        save_manifest(folder, manifest)
 
     if not quiet:
         print("Done.")
 
 
+def diff_barrel(barrel_file: Path, expected: str) -> list[str] | None:
+    """Compare a barrel file on disk with its expected content.
+
+    Args:
+        barrel_file: Path of the barrel file.
+        expected: Content create would write.
+
+    Returns:
+        Unified diff lines from the file on disk to the expected content, or
+        None if the file is current.
+    """
+    try:
+        current_bytes = barrel_file.read_bytes()
+    except OSError:
+        current_bytes = None
+
+    if current_bytes == expected.encode():
+        return None
+
+    if current_bytes is None:
+        current = ""
+        from_file = "/dev/null"
+    else:
+        current = current_bytes.decode("utf-8", errors="replace")
+        from_file = f"a/{barrel_file}"
+
+    return list(
+        difflib.unified_diff(
+            current.splitlines(keepends=True),
+            expected.splitlines(keepends=True),
+            fromfile=from_file,
+            tofile=f"b/{barrel_file}",
+        )
+    )
+
+
+def perform_check(root_file: Path, folder: Path, quiet: bool) -> int:
+    """Verify that the barrel files on disk match what create would write.
+
+    Computes the expected content in memory with the same rendering used by
+    create, streams a unified diff for each stale file, and writes nothing.
+
+    Args:
+        root_file: Path to the root barrel file.
+        folder: Folder to scan for Dart files.
+        quiet: Suppress the diff output.
+
+    Returns:
+        Number of barrel files that are missing or out of date.
+    """
+    if not folder.is_dir():
+        print(f"Error: Folder '{folder}' does not exist.")
+        sys.exit(1)
+
+    explicit_output = root_file if str(folder) == "." else None
+    expected = iter_barrels(folder, explicit_output)
+    if explicit_output is None:
+        expected = itertools.chain(expected, [(root_file, render_root_barrel(folder))])
+
+    stale = 0
+    for barrel_file, content in expected:
+        diff = diff_barrel(barrel_file, content)
+        if diff is None:
+            continue
+
+        stale += 1
+        if not quiet:
+            sys.stdout.writelines(diff)
+
+    if not quiet:
+        if stale:
+            print(f"{stale} barrel file(s) out of date under '{folder}'.")
+        else:
+            print(f"Barrel files under '{folder}' are up to date.")
+
+    return stale
+
+
+def perform_watch(
+    roots: list[tuple[Path, Path]],
+    quiet: bool,
+    debounce: float = WATCH_DEBOUNCE,
+    poll: bool = False,
+) -> None:
+    """Keep barrel files current while Dart files and folders change.
+
+    Runs a full create first, then regenerates only the directories whose
+    listing changed. Bursts of events (such as a git checkout) are collected
+    until nothing has changed for the debounce period.
+
+    Args:
+        roots: Pairs of (root barrel file, folder) to watch.
+        quiet: Suppress output.
+        debounce: Seconds of quiet required before regenerating.
+        poll: Use the polling watcher even when inotify is available.
+    """
+    outputs: dict[Path, Path | None] = {}
+    for root_file, folder in roots:
+        if not folder.is_dir():
+            print(f"Error: Folder '{folder}' does not exist.")
+            sys.exit(1)
+        outputs[folder] = root_file if str(folder) == "." else None
+
+    watcher = open_watcher(poll)
+    indexes: dict[Path, dict[Path, str]] = {}
+    for root_file, folder in roots:
+        watcher.add_tree(folder)
+        perform_create(root_file, folder, True, True)
+        indexes[folder] = load_index(folder) or {}
+
+    def index_for(directory: Path) -> dict[Path, str]:
+        for folder, index in indexes.items():
+            if directory == folder or folder in directory.parents:
+                return index
+        return {}
+
+    if not quiet:
+        mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+        print("--------------------------------------------------")
+        print("Watching barrel files...")
+        for root_file, folder in roots:
+            print(f"  Root: {root_file}")
+            print(f"  Scan: {folder}")
+        print(f"  Mode: {mode}")
+        print("--------------------------------------------------")
+        print("Press Ctrl-C to stop.")
+
+    try:
+        while True:
+            dirty, created, overflow = watcher.wait(None)
+            while True:
+                more_dirty, more_created, more_overflow = watcher.wait(debounce)
+                if not (more_dirty or more_created or more_overflow):
+                    break
+                dirty |= more_dirty
+                created |= more_created
+                overflow |= more_overflow
+
+            if overflow:
+                for root_file, folder in roots:
+                    watcher.add_tree(folder)
+                    perform_create(root_file, folder, True, True)
+                    indexes[folder] = load_index(folder) or {}
+                if not quiet:
+                    print("Event queue overflowed, regenerated all barrels.")
+                continue
+
+            for directory in sorted(created, key=lambda path: len(path.parts)):
+                if any(parent in created for parent in directory.parents):
+                    continue
+                if not directory.is_dir():
+                    continue
+                watcher.add_tree(directory)
+                for stale in remove_stale_barrels(directory, index_for(directory)):
+                    if not quiet:
+                        print(f"Removed: {stale}")
+                generate_recursive(directory, None, None, index_for(directory), scan_root=False)
+                if not quiet:
+                    print(f"Added: {directory}")
+
+            for directory in sorted(dirty, key=lambda path: len(path.parts), reverse=True):
+                index = index_for(directory)
+                written = refresh_directory(
+                    directory, outputs.get(directory), index, scan_root=directory in outputs
+                )
+                if written and not quiet:
+                    print(f"Updated: {barrel_output(directory, outputs.get(directory))}")
+
+                removed = [
+                    path
+                    for path in index
+                    if directory in path.parents[1:] and not path.parent.is_dir()
+                ]
+                for path in removed:
+                    del index[path]
+
+            for folder, index in indexes.items():
+                save_index(folder, index)
+    except KeyboardInterrupt:
+        if not quiet:
+            print("\nStopped.")
+    finally:
+        watcher.close()
+
+
 def main() -> None:
     """Main execution block."""
     args = parse_arguments(sys.argv[1:])
-    _, root_file = determine_root_filename(args.folder, args.target)
-    folder = Path(args.folder)
 
-    if args.verb == "create":
-        perform_create(root_file, folder, args.yes, args.quiet)
-    elif args.verb == "delete":
-        perform_delete(root_file, folder, args.yes, args.quiet)
-    else:
-        print(f"Error: Invalid command '{args.verb}'.")
-        show_help()
+    if args.verb == "watch":
+        roots = [
+            (determine_root_filename(folder_name, args.target)[1], Path(folder_name))
+            for folder_name in args.folder
+        ]
+        perform_watch(roots, args.quiet, args.debounce, args.poll)
+        return
+
+    stale = 0
+
+    for folder_name in args.folder:
+        _, root_file = determine_root_filename(folder_name, args.target)
+        folder = Path(folder_name)
+
+        if args.verb == "check":
+            stale += perform_check(root_file, folder, args.quiet)
+        elif args.verb == "create":
+            perform_create(
+                root_file,
+                folder,
+                args.yes,
+                args.quiet,
+                args.incremental,
+                args.jobs,
+            )
+        elif args.verb == "delete":
+            perform_delete(root_file, folder, args.yes, args.quiet, args.rescan)
+        else:
+            print(f"Error: Invalid command '{args.verb}'.")
+            show_help()
+
+    if stale:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
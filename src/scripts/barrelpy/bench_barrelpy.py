@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Benchmark harness for barrelpy.
+
+Generates reproducible synthetic Dart trees and times barrelpy's create,
+check and delete operations against them. Results are printed as JSON so
+runs can be compared across commits.
+
+Each operation runs in its own child process so peak RSS and I/O counters
+belong to that operation alone. Syscall counts are taken from ``strace -c``
+when it is installed, otherwise only the read/write counters from
+``/proc/self/io`` are reported.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+PRESETS = {
+    "1k": {"depth": 2, "fanout": 5, "files": 32},
+    "10k": {"depth": 3, "fanout": 6, "files": 40},
+    "100k": {"depth": 4, "fanout": 6, "files": 65},
+    "500k": {"depth": 5, "fanout": 6, "files": 54},
+}
+
+PHASES = ["create", "recreate", "check", "delete"]
+
+MAGIC_HEADER = "/* created by barrel.py */"
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        args: Command line arguments passed to the script.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark barrelpy over synthetic Dart trees",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  bench_barrelpy.py --preset=10k
+  bench_barrelpy.py --preset=100k --jobs=8 --workdir=/dev/shm
+  bench_barrelpy.py --depth=3 --fanout=4 --files=50 --g-ratio=0.3
+  bench_barrelpy.py --preset=500k --output=bench_output.txt
+""",
+    )
+    parser.add_argument(
+        "--preset",
+        choices=sorted(PRESETS),
+        help="Tree shape preset (about 1k, 10k, 100k or 500k files)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=3,
+        help="Directory depth (default: 3)",
+    )
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        default=4,
+        help="Subdirectories per directory (default: 4)",
+    )
+    parser.add_argument(
+        "--files",
+        type=int,
+        default=20,
+        help="Dart files per directory (default: 20)",
+    )
+    parser.add_argument(
+        "--g-ratio",
+        type=float,
+        default=0.2,
+        help="Fraction of files generated as *.g.dart (default: 0.2)",
+    )
+    parser.add_argument(
+        "--barrel-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of directories with a pre-existing stale barrel (default: 0)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=1,
+        help="Random seed (default: 1)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="barrelpy --jobs value (default: 1)",
+    )
+    parser.add_argument(
+        "--workdir",
+        default=tempfile.gettempdir(),
+        help="Where to build the tree, e.g. a tmpfs or disk path (default: system temp)",
+    )
+    parser.add_argument(
+        "--output",
+        help="Write the JSON report to a file instead of stdout",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the generated tree",
+    )
+    parser.add_argument("--phase", choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument("--tree", help=argparse.SUPPRESS)
+
+    parsed = parser.parse_args(args)
+
+    if parsed.preset:
+        for key, value in PRESETS[parsed.preset].items():
+            setattr(parsed, key, value)
+
+    return parsed
+
+
+def build_tree(
+    root: Path,
+    depth: int,
+    fanout: int,
+    files: int,
+    g_ratio: float,
+    barrel_ratio: float,
+    seed: int,
+) -> dict[str, int]:
+    """Create a synthetic Dart source tree.
+
+    Args:
+        root: Folder to create (the barrelpy --folder).
+        depth: Number of directory levels below the root.
+        fanout: Subdirectories per directory.
+        files: Dart files per directory.
+        g_ratio: Fraction of files named *.g.dart.
+        barrel_ratio: Fraction of directories given a stale barrel.
+        seed: Random seed, so the same arguments build the same tree.
+
+    Returns:
+        Counts of the directories and files created.
+    """
+    rng = random.Random(seed)
+    counts = {"dirs": 0, "files": 0, "barrels": 0}
+    stack = [(root, 0)]
+
+    while stack:
+        directory, level = stack.pop()
+        directory.mkdir(parents=True, exist_ok=True)
+        counts["dirs"] += 1
+
+        for i in range(files):
+            suffix = ".g.dart" if rng.random() < g_ratio else ".dart"
+            (directory / f"file_{i:04d}{suffix}").write_text(f"class C{i} {{}}\n")
+            counts["files"] += 1
+
+        if rng.random() < barrel_ratio:
+            barrel = directory / f"exports_{directory.name}.dart"
+            barrel.write_text(f"{MAGIC_HEADER}\n\n")
+            counts["barrels"] += 1
+
+        if level < depth:
+            for j in range(fanout):
+                stack.append((directory / f"dir_{j:02d}", level + 1))
+
+    return counts
+
+
+def filesystem_type(path: Path) -> str:
+    """Return the filesystem type holding a path, from /proc/mounts."""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return "unknown"
+
+    resolved = str(path.resolve())
+    best = ("", "unknown")
+    for fields in mounts:
+        mount_point, fs_type = fields[1], fields[2]
+        prefix = mount_point.rstrip("/") + "/"
+        inside = resolved == mount_point or resolved.startswith(prefix)
+        if inside and len(mount_point) > len(best[0]):
+            best = (mount_point, fs_type)
+    return best[1]
+
+
+def read_io_counters() -> dict[str, int]:
+    """Read this process's syscall counters from /proc/self/io."""
+    counters: dict[str, int] = {}
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                counters[key.strip()] = int(value)
+    except (OSError, ValueError):
+        pass
+    return counters
+
+
+def run_phase(phase: str, tree: Path, jobs: int) -> None:
+    """Run one barrelpy operation and print its measurements as JSON.
+
+    Args:
+        phase: Operation to run.
+        tree: Folder holding the synthetic ``lib`` tree.
+        jobs: barrelpy worker threads.
+    """
+    sys.path.insert(0, str(SCRIPT_DIR))
+    import barrelpy
+
+    os.chdir(tree)
+    root_file = Path("lib.dart")
+    folder = Path("lib")
+
+    before = read_io_counters()
+    start = time.perf_counter()
+
+    if phase in ("create", "recreate"):
+        barrelpy.perform_create(root_file, folder, True, True, jobs=jobs)
+    elif phase == "check":
+        barrelpy.perform_check(root_file, folder, True)
+    elif phase == "delete":
+        barrelpy.perform_delete(root_file, folder, True, True)
+
+    wall = time.perf_counter() - start
+    after = read_io_counters()
+
+    result = {
+        "wall_s": round(wall, 4),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    for key in ("syscr", "syscw"):
+        if key in before and key in after:
+            result[key] = after[key] - before[key]
+
+    print(json.dumps(result))
+
+
+def parse_strace_total(summary: str) -> int | None:
+    """Extract the total call count from an ``strace -c`` summary."""
+    for line in summary.splitlines():
+        fields = line.split()
+        if fields and fields[-1] == "total":
+            numbers = [field for field in fields[:-1] if field.isdigit()]
+            if numbers:
+                return int(numbers[0])
+    return None
+
+
+def measure(phase: str, tree: Path, jobs: int, files: int) -> dict[str, object]:
+    """Run a phase in a child process and collect its measurements.
+
+    Args:
+        phase: Operation to run.
+        tree: Folder holding the synthetic ``lib`` tree.
+        jobs: barrelpy worker threads.
+        files: Number of source files, used for the files/second rate.
+
+    Returns:
+        Measurements for the phase.
+    """
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        f"--phase={phase}",
+        f"--tree={tree}",
+        f"--jobs={jobs}",
+    ]
+
+    strace = shutil.which("strace")
+    summary_file = None
+    if strace:
+        fd, summary_file = tempfile.mkstemp(prefix="bench_barrelpy_strace_")
+        os.close(fd)
+        cmd = [strace, "-f", "-c", "-o", summary_file] + cmd
+
+    output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    result: dict[str, object] = {"phase": phase}
+    result.update(json.loads(output.strip().splitlines()[-1]))
+
+    result["syscalls"] = None
+    if summary_file:
+        with open(summary_file, "r", encoding="utf-8") as f:
+            result["syscalls"] = parse_strace_total(f.read())
+        os.unlink(summary_file)
+
+    wall = float(result["wall_s"])
+    result["files_per_s"] = round(files / wall) if wall > 0 else None
+    return result
+
+
+def git_commit() -> str | None:
+    """Return the commit of the barrelpy checkout, if it is a git repo."""
+    try:
+        return subprocess.run(
+            ["git", "-C", str(SCRIPT_DIR), "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+
+    if args.phase:
+        run_phase(args.phase, Path(args.tree), args.jobs)
+        return
+
+    workdir = Path(args.workdir)
+    tree = Path(tempfile.mkdtemp(prefix="bench_barrelpy_", dir=workdir))
+
+    try:
+        counts = build_tree(
+            tree / "lib",
+            args.depth,
+            args.fanout,
+            args.files,
+            args.g_ratio,
+            args.barrel_ratio,
+            args.seed,
+        )
+
+        results = [measure(phase, tree, args.jobs, counts["files"]) for phase in PHASES]
+    finally:
+        if not args.keep:
+            shutil.rmtree(tree, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "workdir": str(workdir),
+        "filesystem": filesystem_type(workdir),
+        "jobs": args.jobs,
+        "tree": {
+            "depth": args.depth,
+            "fanout": args.fanout,
+            "files_per_dir": args.files,
+            "g_ratio": args.g_ratio,
+            "barrel_ratio": args.barrel_ratio,
+            "seed": args.seed,
+            **counts,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,49 +2,107 @@
 
 set -euo pipefail
 
+command="split"
 filename=""
 chunk_size=10200
+engine_args=()
+SCRIPT_DIR="$(dirname "$(readlink -f "${BASH_SOURCE[0]}")")"
+ENGINE="${SCRIPT_DIR}/chunk_engine.py"
 
 show_help() {
   cat <<EOF
-chunk - Split a file into fixed-size chunks
+chunk - Split a file into chunks, and join or verify them
 
 DESCRIPTION
   Splits a file into multiple smaller chunks of a specified size.
   Useful for processing large files in parts or working around
   size limitations in certain tools.
 
+  Chunks are copied by the kernel (copy_file_range) and written in
+  parallel. A manifest records the SHA-256 of every chunk so the file
+  can be reassembled with 'chunk join' and checked with 'chunk verify'.
+
 USAGE
   chunk <filename> [options]
+  chunk [options] -- <filename>
+  chunk join <manifest> [--output=FILE] [--force]
+  chunk verify <manifest> [--file=FILE]
+
+  A first argument of join or verify is the command. To split a file
+  named like a command or an option, write it as ./verify or put it
+  after --, which ends the options.
 
 ARGUMENTS
   <filename>        Required. The file to split into chunks.
+  <manifest>        The <filename>.chunks.json written when splitting.
 
 OPTIONS
   --chunk_size=N    Size of each chunk in bytes (default: 10200)
+  --mode=MODE       Where chunks may end (default: bytes)
+                      bytes   - anywhere, every chunk is exactly N bytes
+                      lines   - after a newline, lines are never split
+                      record  - after --separator, records are never split
+  --separator=SEP   Record separator for --mode=record; escapes such as
+                    \\n are expanded, e.g. --separator='\\n\\n'
+  --jobs=N          Worker threads (default: number of CPUs)
+  --output=FILE     join: file to write (default: the original name)
+  --force           join: overwrite the output if it exists
+  --file=FILE       verify: check FILE, e.g. a joined copy, instead of
+                    the chunk files
   --help            Show this help message and exit
+  --                End of options, the next argument is the filename
 
 OUTPUT
   Creates files named <filename>.chunk0, <filename>.chunk1, etc.
-  in the same directory as the source file.
+  in the same directory as the source file, and <filename>.chunks.json
+  listing the offset, size and SHA-256 of each chunk. A line or record
+  longer than the chunk size gets a chunk of its own.
 
 EXAMPLES
   chunk large_file.txt
   chunk data.json --chunk_size=5000
   chunk backup.sql --chunk_size=1000000
+  chunk app.log --mode=lines --chunk_size=1000000
+  chunk dump.sql --mode=record --separator=';\\n'
+  chunk -- verify
+  chunk verify app.log.chunks.json
+  chunk join app.log.chunks.json --output=app.log.joined
 
 EOF
   exit 0
 }
 
+end_of_options=false
+
 for arg in "$@"; do
+  if $end_of_options; then
+    filename="$arg"
+    continue
+  fi
+
   case $arg in
+    --)
+      end_of_options=true
+      ;;
     --help)
       show_help
       ;;
     --chunk_size=*)
       chunk_size="${arg#*=}"
       ;;
+    --mode=*|--separator=*|--output=*|--file=*|--force)
+      engine_args+=("$arg")
+      ;;
+    --jobs=*)
+      job_count="${arg#*=}"
+      ;;
+    join|verify)
+      if [ -z "$filename" ] && [ "$command" = "split" ]; then
+        command="$arg"
+      else
+        filename="$arg"
+      fi
+      ;;
     *)
       filename="$arg"
       ;;
@@ -52,8 +110,17 @@ for arg in "$@"; do
 done
 
 
+if ! command -v python3 >/dev/null 2>&1; then
+  echo "Error: python3 is required but not installed."
+  exit 1
+fi
+
 if [ -z "$filename" ]; then
-  echo "Error: No filename provided. Use --help for usage."
+  if [ "$command" = "split" ]; then
+    echo "Error: No filename provided. Use --help for usage."
+  else
+    echo "Error: No manifest provided. Use --help for usage."
+  fi
   exit 1
 fi
 
@@ -62,14 +129,13 @@ if [ ! -f "$filename" ]; then
   exit 1
 fi
 
-base=$(basename "$filename")
-dir=$(dirname "$filename")
-size=$(stat -c%s "$filename")
-count=0
-offset=0
+global_args=()
+if [ -n "${job_count:-}" ]; then
+  global_args+=("--jobs=$job_count")
+fi
 
-while [ "$offset" -lt "$size" ]; do
-  dd if="$filename" bs=1 skip="$offset" count="$chunk_size" of="$dir/${base}.chunk${count}" status=none
-  offset=$((offset + chunk_size))
-  count=$((count + 1))
-done
+if [ "$command" = "split" ]; then
+  engine_args+=("--chunk-size=$chunk_size")
+fi
+
+exec python3 "$ENGINE" "${global_args[@]}" "$command" "${engine_args[@]}" -- "$filename"
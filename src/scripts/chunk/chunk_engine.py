@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""Chunking engine for chunk.
+
+``split`` cuts a file into ``<name>.chunk0``, ``<name>.chunk1``, ... and
+writes ``<name>.chunks.json``, a manifest with the offset, size and SHA-256
+of every chunk. ``join`` checks the chunks against the manifest and
+reassembles the file; ``verify`` checks the chunks, or a file that should
+match them, without writing anything.
+
+Chunk boundaries depend on the mode:
+
+- ``bytes``: every chunk is exactly the chunk size, except the last.
+- ``lines``: a chunk ends after the last newline that fits in the chunk
+  size, so lines are never split.
+- ``record``: like ``lines`` with any separator, e.g. a blank line.
+
+A line or record longer than the chunk size gets a chunk of its own
+instead of being split.
+
+The source is memory-mapped to find boundaries and hash chunks without
+copying them into Python. Chunk contents are copied by the kernel with
+copy_file_range, falling back to sendfile and then to plain writes where
+the file system does not support it. Chunks are written and hashed on a
+thread pool; hashing releases the GIL, so this scales with cores until the
+disk is the limit.
+"""
+
+import argparse
+import codecs
+import errno
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+DEFAULT_CHUNK_SIZE = 10200
+
+MANIFEST_SUFFIX = ".chunks.json"
+
+MANIFEST_VERSION = 1
+
+MODES = ("bytes", "lines", "record")
+
+# Errors that mean a copy method is not supported for these files
+UNSUPPORTED_COPY_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+@dataclass
+class Chunk:
+    """One chunk of a split file.
+
+    Attributes:
+        file: Chunk file name, relative to the manifest.
+        offset: Offset of the chunk in the source file.
+        size: Size of the chunk in bytes.
+        sha256: SHA-256 of the chunk content.
+    """
+
+    file: str
+    offset: int
+    size: int
+    sha256: str = ""
+
+
+def format_size(size: float) -> str:
+    """Return a size in bytes in human readable form."""
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024 or unit == "G":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+def default_jobs() -> int:
+    """Return the default number of worker threads."""
+    return os.cpu_count() or 1
+
+
+def chunk_bounds(data, chunk_size: int, separator: bytes | None):
+    """Yield the (start, end) offsets of each chunk.
+
+    Args:
+        data: Content of the source, usually an mmap.
+        chunk_size: Maximum chunk size in bytes.
+        separator: Chunks end right after a separator, or at any byte if
+            None.
+
+    Yields:
+        Tuples of (start, end) offsets.
+    """
+    size = len(data)
+    start = 0
+
+    while start < size:
+        end = min(start + chunk_size, size)
+        if separator is not None and end < size:
+            cut = data.rfind(separator, start, end)
+            if cut >= 0:
+                end = cut + len(separator)
+            else:
+                # The record is longer than the chunk size: keep it whole
+                cut = data.find(separator, end)
+                end = size if cut < 0 else cut + len(separator)
+        yield start, end
+        start = end
+
+
+def copy_range(src_fd: int, dst_fd: int, offset: int, size: int) -> None:
+    """Copy part of a file to the current position of another.
+
+    Uses copy_file_range, which lets the file system share or copy the
+    blocks without passing them through user space, and falls back to
+    sendfile and then to reading and writing.
+
+    Args:
+        src_fd: Source file descriptor.
+        dst_fd: Destination file descriptor.
+        offset: Offset in the source.
+        size: Number of bytes to copy.
+    """
+    end = offset + size
+
+    for method in ("copy_file_range", "sendfile"):
+        copy = getattr(os, method, None)
+        if copy is None:
+            continue
+        try:
+            while offset < end:
+                if method == "copy_file_range":
+                    copied = copy(src_fd, dst_fd, end - offset, offset)
+                else:
+                    copied = copy(dst_fd, src_fd, offset, end - offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError as exc:
+            if exc.errno not in UNSUPPORTED_COPY_ERRORS:
+                raise
+            continue
+        if offset >= end:
+            return
+
+    while offset < end:
+        block = os.pread(src_fd, min(end - offset, 1 << 20), offset)
+        if not block:
+            raise OSError(errno.EIO, "file shrank while copying")
+        os.write(dst_fd, block)
+        offset += len(block)
+
+
+def hash_range(data, offset: int, size: int) -> str:
+    """Return the SHA-256 of part of a mapped file without copying it."""
+    with memoryview(data) as view:
+        return hashlib.sha256(view[offset : offset + size]).hexdigest()
+
+
+def write_chunk(source_fd: int, data, directory: str, chunk: Chunk) -> Chunk:
+    """Write one chunk file and record its hash."""
+    path = os.path.join(directory, chunk.file)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        copy_range(source_fd, fd, chunk.offset, chunk.size)
+    finally:
+        os.close(fd)
+    chunk.sha256 = hash_range(data, chunk.offset, chunk.size)
+    return chunk
+
+
+def manifest_path(path: str) -> str:
+    """Return the manifest path of a source file."""
+    return path + MANIFEST_SUFFIX
+
+
+def split(path: str, chunk_size: int, mode: str, separator: bytes | None, jobs: int) -> dict:
+    """Split a file into chunks next to it and write their manifest.
+
+    Chunk files listed by a previous manifest of the file that the new
+    split no longer produces are removed, so a shorter split does not
+    leave stale chunks behind.
+
+    Args:
+        path: File to split.
+        chunk_size: Maximum chunk size in bytes.
+        mode: One of MODES.
+        separator: Record separator for the record mode.
+        jobs: Number of worker threads.
+
+    Returns:
+        The manifest.
+    """
+    if mode == "lines":
+        separator = b"\n"
+    elif mode == "bytes":
+        separator = None
+
+    directory = os.path.dirname(path) or "."
+    base = os.path.basename(path)
+
+    try:
+        _, previous = load_manifest(manifest_path(path))
+    except (OSError, ValueError, TypeError, KeyError):
+        previous = []
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        chunks = []
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunks = [
+                    Chunk(f"{base}.chunk{index}", start, end - start)
+                    for index, (start, end) in enumerate(chunk_bounds(data, chunk_size, separator))
+                ]
+                with ThreadPoolExecutor(max_workers=jobs) as pool:
+                    list(pool.map(lambda chunk: write_chunk(f.fileno(), data, directory, chunk), chunks))
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": base,
+        "size": size,
+        "mode": mode,
+        "chunk_size": chunk_size,
+        "separator": separator.decode("latin-1") if separator is not None else None,
+        "chunks": [asdict(chunk) for chunk in chunks],
+    }
+    temp_path = f"{manifest_path(path)}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(temp_path, manifest_path(path))
+
+    current = {chunk.file for chunk in chunks}
+    for chunk in previous:
+        name = os.path.basename(chunk.file)
+        if name not in current:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return manifest
+
+
+def load_manifest(path: str) -> tuple[dict, list[Chunk]]:
+    """Read a manifest.
+
+    Raises:
+        ValueError: If the file is not a chunk manifest.
+    """
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{path} is not a chunk manifest")
+    return manifest, [Chunk(**chunk) for chunk in manifest["chunks"]]
+
+
+def check_chunk(directory: str, chunk: Chunk, output: str | None = None) -> str | None:
+    """Check a chunk file and optionally copy it into place.
+
+    Args:
+        directory: Folder holding the chunk files.
+        chunk: Chunk to check.
+        output: File to copy the chunk into at its offset once it matched.
+
+    Returns:
+        A description of the problem, or None if the chunk matches.
+    """
+    path = os.path.join(directory, chunk.file)
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size != chunk.size:
+                return f"{chunk.file}: size {size}, expected {chunk.size}"
+            if hashlib.file_digest(f, "sha256").hexdigest() != chunk.sha256:
+                return f"{chunk.file}: SHA-256 mismatch"
+            if output is not None:
+                # A descriptor per chunk keeps file positions independent
+                fd = os.open(output, os.O_WRONLY)
+                try:
+                    os.lseek(fd, chunk.offset, os.SEEK_SET)
+                    copy_range(f.fileno(), fd, 0, chunk.size)
+                finally:
+                    os.close(fd)
+    except OSError as exc:
+        return f"{chunk.file}: {exc.strerror}"
+    return None
+
+
+def check_file(path: str, size: int, chunks: list[Chunk], jobs: int) -> list[str]:
+    """Return the problems of a whole file checked against chunk hashes."""
+    with open(path, "rb") as f:
+        actual = os.fstat(f.fileno()).st_size
+        if actual != size:
+            return [f"{path}: size {actual}, expected {size}"]
+        if not size:
+            return []
+        with (
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            ThreadPoolExecutor(max_workers=jobs) as pool,
+        ):
+            digests = pool.map(lambda chunk: hash_range(data, chunk.offset, chunk.size), chunks)
+            return [
+                f"{path}: bytes {chunk.offset}-{chunk.offset + chunk.size - 1} do not match {chunk.file}"
+                for chunk, digest in zip(chunks, digests, strict=True)
+                if digest != chunk.sha256
+            ]
+
+
+def verify(manifest_file: str, jobs: int, target: str | None = None) -> list[str]:
+    """Check chunk files, or a reassembled file, against a manifest.
+
+    Args:
+        manifest_file: Manifest written by split.
+        jobs: Number of worker threads.
+        target: File to check instead of the chunk files.
+
+    Returns:
+        Descriptions of the problems found, empty if everything matches.
+    """
+    manifest, chunks = load_manifest(manifest_file)
+    if target is not None:
+        return check_file(target, manifest["size"], chunks, jobs)
+
+    directory = os.path.dirname(manifest_file) or "."
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return [problem for problem in pool.map(lambda chunk: check_chunk(directory, chunk), chunks) if problem]
+
+
+def join(manifest_file: str, output: str, jobs: int) -> list[str]:
+    """Check the chunks of a manifest and reassemble them.
+
+    Each chunk is read once: hashed, then copied into its place in a
+    temporary file, in parallel. The output is only replaced when every
+    chunk matched.
+
+    Args:
+        manifest_file: Manifest written by split.
+        output: File to write.
+        jobs: Number of worker threads.
+
+    Returns:
+        Descriptions of the problems found. Nothing is written if there
+        are any.
+    """
+    manifest, chunks = load_manifest(manifest_file)
+    directory = os.path.dirname(manifest_file) or "."
+    temp_path = f"{output}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as f:
+        f.truncate(manifest["size"])
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(lambda chunk: check_chunk(directory, chunk, temp_path), chunks)
+            problems = [problem for problem in results if problem]
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    if problems:
+        os.unlink(temp_path)
+        return problems
+    os.replace(temp_path, output)
+    return []
+
+
+def report(action: str, size: int, count: int, elapsed: float) -> str:
+    """Return a summary line with the throughput."""
+    rate = size / elapsed if elapsed > 0 else 0
+    return f"{action} {format_size(size)} in {count} chunks in {elapsed:.2f}s ({format_size(rate)}/s)"
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Split files into chunks with a SHA-256 manifest, and join or verify them.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  chunk_engine.py split big.log --mode=lines --chunk-size=1000000
+  chunk_engine.py split dump.sql --mode=record --separator=';\\n'
+  chunk_engine.py verify big.log.chunks.json
+  chunk_engine.py join big.log.chunks.json --output=big.log.joined
+""",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Worker threads (default: number of CPUs)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    split_parser = subparsers.add_parser("split", help="Split a file into chunks next to it")
+    split_parser.add_argument("file", help="File to split")
+    split_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Maximum chunk size in bytes (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    split_parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="bytes",
+        help="Cut anywhere, only after a newline, or only after a separator (default: bytes)",
+    )
+    split_parser.add_argument(
+        "--separator",
+        help="Record separator for --mode=record; backslash escapes such as \\n are expanded",
+    )
+
+    verify_parser = subparsers.add_parser("verify", help="Check chunks against their manifest")
+    verify_parser.add_argument("manifest", help="Manifest written by split")
+    verify_parser.add_argument(
+        "--file",
+        help="Check this file, e.g. the original or a joined copy, instead of the chunk files",
+    )
+
+    join_parser = subparsers.add_parser("join", help="Verify chunks and reassemble the file")
+    join_parser.add_argument("manifest", help="Manifest written by split")
+    join_parser.add_argument(
+        "--output",
+        help="File to write (default: the original name next to the manifest)",
+    )
+    join_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite the output if it exists",
+    )
+
+    parsed = parser.parse_args(args)
+    if parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if parsed.command == "split":
+        if parsed.chunk_size < 1:
+            parser.error("--chunk-size must be at least 1")
+        if parsed.mode == "record" and not parsed.separator:
+            parser.error("--mode=record needs --separator")
+    return parsed
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+    start = time.perf_counter()
+
+    try:
+        if args.command == "split":
+            separator = codecs.escape_decode(args.separator.encode())[0] if args.separator else None
+            manifest = split(args.file, args.chunk_size, args.mode, separator, args.jobs)
+            elapsed = time.perf_counter() - start
+            print(report("Split", manifest["size"], len(manifest["chunks"]), elapsed))
+            print(f"Manifest written to {manifest_path(args.file)}")
+
+        elif args.command == "verify":
+            problems = verify(args.manifest, args.jobs, args.file)
+            for problem in problems:
+                print(f"FAILED: {problem}", file=sys.stderr)
+            if problems:
+                sys.exit(1)
+            checked = f"{args.file} matches" if args.file else "all chunks match"
+            print(f"OK: {checked} {args.manifest}")
+
+        elif args.command == "join":
+            manifest, chunks = load_manifest(args.manifest)
+            output = args.output or os.path.join(os.path.dirname(args.manifest), manifest["source"])
+            if os.path.exists(output) and not args.force:
+                print(f"Error: '{output}' already exists. Use --force to overwrite.", file=sys.stderr)
+                sys.exit(1)
+            problems = join(args.manifest, output, args.jobs)
+            for problem in problems:
+                print(f"FAILED: {problem}", file=sys.stderr)
+            if problems:
+                sys.exit(1)
+            elapsed = time.perf_counter() - start
+            print(report("Joined", manifest["size"], len(chunks), elapsed))
+            print(f"Output written to {output}")
+
+    except (OSError, ValueError) as exc:
+        message = exc.strerror if isinstance(exc, OSError) and exc.strerror else exc
+        filename = f"'{exc.filename}': " if isinstance(exc, OSError) and exc.filename else ""
+        print(f"Error: {filename}{message}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
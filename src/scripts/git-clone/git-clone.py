@@ -2,14 +2,122 @@
 """Git clone helper for GitHub repositories.
 
 Clone repositories from GitHub with a simpler syntax.
-Defaults to the moztopia organization.
+Defaults to the moztopia organization. With --manifest, clones a list of
+repositories concurrently, retrying clones that fail on the network with
+exponential backoff.
+With --cache, keeps a bare mirror of each repository under a local cache
+folder and clones with --reference to it, so repeat clones only copy what
+changed since the mirror was last fetched.
 """
 
 import argparse
+import fcntl
+import os
+import random
+import shlex
+import shutil
 import subprocess
 import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
+RETRY_BASE_DELAY = 1.0
+
+LAST_USED_FILE = "git-clone-last-used"
+
+# Clones that borrow objects from a mirror, one path per line
+BORROWERS_FILE = "git-clone-borrowers"
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+# git clone errors that retrying cannot fix
+PERMANENT_ERRORS = (
+    "does not appear to be a git repository",
+    "repository not found",
+    "not found in upstream",
+    "already exists and is not an empty directory",
+    "authentication failed",
+    "could not read username",
+    "permission denied",
+)
+
+# git clone errors caused by the network or the remote hanging up
+TRANSIENT_ERRORS = (
+    "could not resolve host",
+    "failed to connect",
+    "connection timed out",
+    "connection refused",
+    "connection reset",
+    "operation timed out",
+    "the remote end hung up",
+    "early eof",
+    "rpc failed",
+    "unexpected disconnect",
+    "gnutls_handshake",
+    "ssl_error",
+    "http/2 stream",
+    "returned error: 5",
+)
+
+
+def default_cache_dir() -> Path:
+    """Return the mirror cache folder, honouring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "git-clone"
+
+
+@dataclass
+class CloneOptions:
+    """How git clone is invoked, shared by single and manifest clones.
+
+    Attributes:
+        depth: Create a shallow clone with this many commits, or None.
+        filter_spec: Partial clone filter such as blob:none, or None.
+        single_branch: Fetch only the checked out branch.
+        cache_dir: Mirror cache folder, or None to clone directly.
+        dissociate: Copy borrowed objects so the clone no longer needs the cache.
+        cache_limit: Evict least recently used mirrors above this many bytes (0: no limit).
+    """
+
+    depth: int | None = None
+    filter_spec: str | None = None
+    single_branch: bool = False
+    cache_dir: Path | None = None
+    dissociate: bool = False
+    cache_limit: int = 0
+
+
+@dataclass
+class ManifestEntry:
+    """One repository to clone from a manifest file.
+
+    Attributes:
+        repo: Repository name, org/name, or full URL.
+        target: Directory to clone into, relative to the base directory.
+        branch: Branch to check out, or None for the remote default.
+    """
+
+    repo: str
+    target: str
+    branch: str | None = None
+
+
+@dataclass
+class CloneResult:
+    """Outcome of cloning one manifest entry."""
+
+    entry: ManifestEntry
+    returncode: int = 0
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    skipped: bool = False
+
 
 def parse_arguments(args: list[str]) -> argparse.Namespace:
     """Parse command line arguments.
@@ -29,17 +137,30 @@ Examples:
   git-clone scriptz my-folder          # Clone to ./my-folder
   git-clone scriptz --org=mozrin       # Clone mozrin/scriptz
   git-clone scriptz ~/Code --quiet     # Clone without prompts
+  git-clone --manifest=repos.txt ~/Code --jobs=8
+                                       # Clone every repo listed in repos.txt
+  git-clone scriptz --cache --quiet    # Borrow objects from a local mirror
+  git-clone scriptz --depth=1          # Shallow clone, latest commit only
+  git-clone scriptz --filter=blob:none # Blobless clone, fetch files on demand
+
+Manifest format (one repo per line, '#' starts a comment):
+  scriptz                              # moztopia/scriptz -> ./scriptz
+  mozrin/dotfiles dots                 # into ./dots
+  file:///srv/git/tool.git --branch=develop
 """,
     )
     parser.add_argument(
         "repo_name",
+        nargs="?",
+        default=None,
         help="The name of the repository to clone",
     )
     parser.add_argument(
         "target_directory",
         nargs="?",
         default=None,
-        help="Local folder where the repo will be cloned (default: repo name)",
+        help="Local folder where the repo will be cloned (default: repo name); "
+        "with --manifest, the base folder for all clones (default: .)",
     )
     parser.add_argument(
         "--org",
@@ -51,8 +172,423 @@ Examples:
         action="store_true",
         help="Suppress prompts",
     )
+    parser.add_argument(
+        "--branch",
+        help="Branch to check out (default: the remote's default branch)",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        help="Shallow clone with this many commits of history",
+    )
+    parser.add_argument(
+        "--filter",
+        dest="filter_spec",
+        metavar="SPEC",
+        help="Partial clone filter, e.g. blob:none or tree:0",
+    )
+    parser.add_argument(
+        "--single-branch",
+        action="store_true",
+        help="Fetch only the branch being checked out",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Clone with --reference to a local bare mirror, creating or fetching it first",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Mirror cache folder (default: $XDG_CACHE_HOME/git-clone)",
+    )
+    parser.add_argument(
+        "--cache-limit",
+        type=parse_size,
+        default=0,
+        metavar="SIZE",
+        help="Evict least recently used mirrors once the cache exceeds SIZE, "
+        "e.g. 500M or 10G (default: no limit)",
+    )
+    parser.add_argument(
+        "--dissociate",
+        action="store_true",
+        help="With --cache, copy borrowed objects so the clone does not depend on "
+        "the mirror (otherwise the mirror is kept while the clone exists)",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        help="Clone every repository listed in FILE",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Concurrent clones with --manifest (default: 4)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries per repository on network failures with --manifest (default: 3)",
+    )
+
+    parsed = parser.parse_args(args)
+
+    if not parsed.manifest and not parsed.repo_name:
+        parser.error("a repository name or --manifest is required")
 
-    return parser.parse_args(args)
+    if parsed.manifest and parsed.target_directory is None:
+        # With --manifest the single positional is the base folder
+        parsed.target_directory = parsed.repo_name
+        parsed.repo_name = None
+
+    if parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    if parsed.depth is not None and parsed.depth < 1:
+        parser.error("--depth must be at least 1")
+
+    if parsed.dissociate and not parsed.cache:
+        parser.error("--dissociate requires --cache")
+
+    return parsed
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 750M or 2G into bytes."""
+    text = value.strip().upper().removesuffix("B")
+    multiplier = 1
+    if text and text[-1] in SIZE_SUFFIXES:
+        multiplier = SIZE_SUFFIXES[text[-1]]
+        text = text[:-1]
+
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}") from None
+
+
+def build_repo_url(repo: str, org: str) -> str:
+    """Turn a repository name into a clone URL.
+
+    Args:
+        repo: Repository name, org/name, or a full URL or local path.
+        org: GitHub organization used when only a name is given.
+
+    Returns:
+        URL (or path) that git clone accepts.
+    """
+    if "://" in repo or repo.startswith(("git@", "/", ".", "~")):
+        return repo
+
+    if "/" in repo:
+        return f"https://github.com/{repo}.git"
+
+    return f"https://github.com/{org}/{repo}.git"
+
+
+def repo_basename(repo: str) -> str:
+    """Return the default checkout folder name for a repository."""
+    name = repo.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1]
+    return name.removesuffix(".git")
+
+
+def read_manifest(manifest_file: Path) -> list[ManifestEntry]:
+    """Read a clone manifest.
+
+    Each non-empty line holds a repository name or URL, an optional target
+    folder and an optional --branch=NAME. Text after '#' is ignored.
+
+    Args:
+        manifest_file: Path to the manifest.
+
+    Returns:
+        Entries in file order.
+    """
+    entries: list[ManifestEntry] = []
+
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            tokens = shlex.split(line, comments=True)
+            if not tokens:
+                continue
+
+            branch = None
+            positional = []
+            for token in tokens:
+                if token.startswith("--branch="):
+                    branch = token.split("=", 1)[1]
+                else:
+                    positional.append(token)
+
+            if len(positional) > 2:
+                raise ValueError(f"{manifest_file}:{line_number}: too many fields")
+
+            repo = positional[0]
+            target = positional[1] if len(positional) > 1 else repo_basename(repo)
+            entries.append(ManifestEntry(repo=repo, target=target, branch=branch))
+
+    return entries
+
+
+def mirror_path(cache_dir: Path, repo_url: str) -> Path:
+    """Return the cache folder holding the bare mirror of a URL.
+
+    The URL's host and path become the folder path, so
+    https://github.com/moztopia/scriptz.git is cached as
+    github.com/moztopia/scriptz.git.
+    """
+    location = repo_url.split("://", 1)[-1].split("@", 1)[-1].replace(":", "/")
+    parts = [part for part in location.split("/") if part not in ("", ".", "..")]
+    name = "/".join(parts)
+    if not name.endswith(".git"):
+        name += ".git"
+    return cache_dir / name
+
+
+def folder_size(path: Path) -> int:
+    """Return the disk usage of a folder in bytes."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_blocks * 512
+            except OSError:
+                pass
+    return total
+
+
+def list_mirrors(cache_dir: Path) -> list[Path]:
+    """Return every mirror in the cache.
+
+    The walk stops at each mirror, so their object folders are never listed.
+    """
+    mirrors = []
+    for root, dirs, files in os.walk(cache_dir):
+        if LAST_USED_FILE in files:
+            mirrors.append(Path(root))
+            dirs.clear()
+        else:
+            dirs[:] = [name for name in dirs if not name.endswith(".partial")]
+    return mirrors
+
+
+def mirror_lock_path(mirror: Path) -> Path:
+    """Return the lock file guarding a mirror."""
+    return mirror.with_name(mirror.name + ".lock")
+
+
+@contextmanager
+def mirror_lock(mirror: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold a mirror's lock exclusively.
+
+    Eviction removes the lock file together with the mirror, so once the
+    lock is taken the file is checked to still be the one at the path, and
+    locked again otherwise.
+
+    Args:
+        mirror: Mirror to lock.
+        blocking: Wait for the lock instead of giving up when it is busy.
+
+    Yields:
+        True while the lock is held, or False if it was busy.
+    """
+    path = mirror_lock_path(mirror)
+    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+
+    while True:
+        with open(path, "a", encoding="utf-8") as lock:
+            try:
+                fcntl.flock(lock, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                current = os.path.samestat(os.fstat(lock.fileno()), os.stat(path))
+            except FileNotFoundError:
+                current = False
+            if current:
+                yield True
+                return
+
+
+def record_borrower(mirror: Path, clone: Path) -> None:
+    """Remember a clone that borrows objects from a mirror.
+
+    Must be called while holding the mirror's lock.
+    """
+    borrowers = mirror / BORROWERS_FILE
+    path = str(clone.resolve())
+    try:
+        known = borrowers.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        known = []
+    if path not in known:
+        with open(borrowers, "a", encoding="utf-8") as f:
+            f.write(path + "\n")
+
+
+def live_borrowers(mirror: Path) -> list[Path]:
+    """Return the recorded clones that still borrow objects from a mirror.
+
+    A clone counts while its alternates file points at the mirror's
+    objects; clones that were deleted or repacked with --dissociate since
+    do not.
+    """
+    try:
+        recorded = (mirror / BORROWERS_FILE).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+
+    objects = os.path.realpath(mirror / "objects")
+    live = []
+    for line in recorded:
+        clone_objects = Path(line) / ".git" / "objects"
+        try:
+            alternates = (clone_objects / "info" / "alternates").read_text(encoding="utf-8")
+        except OSError:
+            continue
+        entries = [os.path.realpath(clone_objects / entry) for entry in alternates.splitlines()]
+        if objects in entries:
+            live.append(Path(line))
+    return live
+
+
+def evict_mirrors(cache_dir: Path, limit: int) -> list[Path]:
+    """Remove least recently used mirrors until the cache fits in a limit.
+
+    A mirror is only removed while holding its lock, so one that is being
+    refreshed or cloned from is skipped. Mirrors that clones made without
+    --dissociate still borrow objects from are never removed.
+
+    Args:
+        cache_dir: Mirror cache folder.
+        limit: Maximum cache size in bytes.
+
+    Returns:
+        Mirrors that were removed.
+    """
+    mirrors = []
+    for mirror in list_mirrors(cache_dir):
+        try:
+            last_used = (mirror / LAST_USED_FILE).stat().st_mtime
+        except OSError:
+            continue
+        mirrors.append((last_used, mirror, folder_size(mirror)))
+
+    total = sum(size for _, _, size in mirrors)
+    evicted = []
+
+    for _, mirror, size in sorted(mirrors, key=lambda item: item[0]):
+        if total <= limit:
+            break
+        with mirror_lock(mirror, blocking=False) as locked:
+            if not locked or live_borrowers(mirror):
+                continue
+            shutil.rmtree(mirror, ignore_errors=True)
+            mirror_lock_path(mirror).unlink(missing_ok=True)
+        total -= size
+        evicted.append(mirror)
+
+    return evicted
+
+
+@contextmanager
+def update_mirror(repo_url: str, options: CloneOptions, quiet: bool) -> Iterator[Path | None]:
+    """Create or refresh the cached bare mirror of a repository.
+
+    A missing mirror is created with git clone --mirror; an existing one is
+    refreshed with git fetch --prune. The mirror's lock is held until the
+    caller is done cloning from it, which serialises concurrent clones of
+    the same repository and keeps eviction away from the mirror meanwhile.
+
+    Args:
+        repo_url: Repository to mirror.
+        options: Clone options holding the cache folder.
+        quiet: Suppress git progress output.
+
+    Yields:
+        Path of the mirror, or None if it could not be created.
+    """
+    if options.cache_dir is None:
+        yield None
+        return
+
+    mirror = mirror_path(options.cache_dir, repo_url)
+    mirror.parent.mkdir(parents=True, exist_ok=True)
+    quiet_flag = ["--quiet"] if quiet else []
+
+    with mirror_lock(mirror):
+        if (mirror / LAST_USED_FILE).exists():
+            fetch = ["git", "-C", str(mirror), "fetch", "--prune", *quiet_flag]
+            if subprocess.run(fetch, check=False).returncode != 0:
+                print(f"Warning: could not refresh mirror {mirror}, using cached objects")
+        else:
+            partial = mirror.with_name(mirror.name + ".partial")
+            shutil.rmtree(partial, ignore_errors=True)
+            create = ["git", "clone", "--mirror", *quiet_flag, repo_url, str(partial)]
+            if subprocess.run(create, check=False).returncode != 0:
+                shutil.rmtree(partial, ignore_errors=True)
+                yield None
+                return
+            shutil.rmtree(mirror, ignore_errors=True)
+            partial.rename(mirror)
+
+        (mirror / LAST_USED_FILE).touch()
+        yield mirror
+
+
+def trim_cache(options: CloneOptions) -> None:
+    """Evict least recently used mirrors if the cache is over its limit."""
+    if options.cache_dir is None or not options.cache_limit:
+        return
+    for evicted in evict_mirrors(options.cache_dir, options.cache_limit):
+        print(f"Evicted cached mirror {evicted}")
+
+
+def build_clone_command(
+    repo_url: str,
+    target_directory: Path,
+    options: CloneOptions,
+    branch: str | None,
+    reference: Path | None,
+    quiet: bool,
+) -> list[str]:
+    """Assemble the git clone command line for a repository.
+
+    Args:
+        repo_url: Repository to clone.
+        target_directory: Local directory to clone into.
+        options: Depth, filter, branch and cache settings.
+        branch: Branch to check out, or None for the default.
+        reference: Mirror to borrow objects from, or None.
+        quiet: Pass --quiet to git.
+
+    Returns:
+        Argument list for subprocess.
+    """
+    cmd = ["git", "clone"]
+
+    if quiet:
+        cmd.append("--quiet")
+    if branch:
+        cmd += ["--branch", branch]
+    if options.single_branch:
+        cmd.append("--single-branch")
+    if options.depth:
+        cmd += ["--depth", str(options.depth)]
+    if options.filter_spec:
+        cmd += ["--filter", options.filter_spec]
+    if reference is not None:
+        cmd += ["--reference", str(reference)]
+        if options.dissociate:
+            cmd.append("--dissociate")
+
+    cmd += [repo_url, str(target_directory)]
+    return cmd
 
 
 def clone_repository(
@@ -60,6 +596,8 @@ def clone_repository(
     target_directory: Path,
     org: str,
     quiet: bool,
+    options: CloneOptions | None = None,
+    branch: str | None = None,
 ) -> int:
     """Clone a repository from GitHub.
 
@@ -68,11 +606,14 @@ def clone_repository(
         target_directory: Local directory to clone into.
         org: GitHub organization or username.
         quiet: Suppress prompts if True.
+        options: Depth, filter and mirror cache settings.
+        branch: Branch to check out, or None for the default.
 
     Returns:
         Exit code from git clone command.
     """
-    repo_url = f"https://github.com/{org}/{repo_name}.git"
+    options = options or CloneOptions()
+    repo_url = build_repo_url(repo_name, org)
 
     if not quiet:
         print(f"Cloning {org}/{repo_name}")
@@ -89,12 +630,15 @@ def clone_repository(
         print(f"Error: Target directory already exists: {target_directory}")
         return 1
 
-    cmd = ["git", "clone", repo_url, str(target_directory)]
-
-    if quiet:
-        cmd.append("--quiet")
+    with update_mirror(repo_url, options, quiet) as reference:
+        if options.cache_dir is not None and reference is None:
+            print("Warning: could not create a cached mirror, cloning directly")
 
-    result = subprocess.run(cmd, check=False)
+        cmd = build_clone_command(repo_url, target_directory, options, branch, reference, quiet)
+        result = subprocess.run(cmd, check=False)
+        if result.returncode == 0 and reference is not None and not options.dissociate:
+            record_borrower(reference, target_directory)
+    trim_cache(options)
 
     if result.returncode == 0 and not quiet:
         print()
@@ -103,11 +647,201 @@ def clone_repository(
     return result.returncode
 
 
+def is_transient_failure(stderr: str) -> bool:
+    """Tell whether a failed clone is worth retrying.
+
+    Args:
+        stderr: Error output of git clone.
+
+    Returns:
+        True only for network or remote hangup failures; permanent and
+        unrecognised errors are not retried.
+    """
+    text = stderr.lower()
+    if any(pattern in text for pattern in PERMANENT_ERRORS):
+        return False
+    return any(pattern in text for pattern in TRANSIENT_ERRORS)
+
+
+def clone_with_retries(
+    entry: ManifestEntry,
+    base_directory: Path,
+    org: str,
+    retries: int,
+    options: CloneOptions,
+) -> CloneResult:
+    """Clone one manifest entry, retrying with exponential backoff.
+
+    Only network and remote hangup failures are retried; any other error
+    ends the entry after the attempt that hit it.
+
+    Args:
+        entry: Repository to clone.
+        base_directory: Folder the entry's target is relative to.
+        org: GitHub organization for bare repository names.
+        retries: Number of retries after the first attempt.
+        options: Depth, filter and mirror cache settings.
+
+    Returns:
+        Result with exit code, attempts, elapsed time and last error.
+    """
+    result = CloneResult(entry=entry)
+    target = base_directory / entry.target
+    start = time.monotonic()
+
+    if target.exists():
+        result.skipped = True
+        return result
+
+    repo_url = build_repo_url(entry.repo, org)
+
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        with update_mirror(repo_url, options, quiet=True) as reference:
+            cmd = build_clone_command(repo_url, target, options, entry.branch, reference, quiet=True)
+            completed = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            if completed.returncode == 0 and reference is not None and not options.dissociate:
+                record_borrower(reference, target)
+        trim_cache(options)
+        result.returncode = completed.returncode
+        if completed.returncode == 0:
+            break
+
+        fatal = [line for line in completed.stderr.splitlines() if line.startswith("fatal:")]
+        result.error = fatal[0][7:] if fatal else f"git exited with {completed.returncode}"
+
+        if not is_transient_failure(completed.stderr):
+            break
+
+        if attempt < retries:
+            delay = RETRY_BASE_DELAY * 2**attempt
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+    result.seconds = time.monotonic() - start
+    return result
+
+
+def clone_manifest(
+    manifest_file: Path,
+    base_directory: Path,
+    org: str,
+    jobs: int,
+    retries: int,
+    quiet: bool,
+    options: CloneOptions,
+    default_branch: str | None = None,
+) -> int:
+    """Clone every repository in a manifest concurrently.
+
+    Args:
+        manifest_file: Manifest listing the repositories.
+        base_directory: Folder the clones are created in.
+        org: GitHub organization for bare repository names.
+        jobs: Maximum number of concurrent clones.
+        retries: Retries per repository on failure.
+        quiet: Only print failures.
+        options: Depth, filter and mirror cache settings.
+        default_branch: Branch for entries that do not name one.
+
+    Returns:
+        0 if every clone succeeded, 1 otherwise.
+    """
+    try:
+        entries = read_manifest(manifest_file)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    for entry in entries:
+        entry.branch = entry.branch or default_branch
+
+    total = len(entries)
+    done = 0
+    failed = 0
+    skipped = 0
+    lock = threading.Lock()
+    show_progress = not quiet and sys.stdout.isatty()
+    start = time.monotonic()
+
+    def progress() -> None:
+        if show_progress:
+            active = min(jobs, total - done)
+            print(
+                f"\r[{done}/{total}] ok={done - failed} failed={failed} active={active}",
+                end="",
+                flush=True,
+            )
+
+    def run(entry: ManifestEntry) -> CloneResult:
+        nonlocal done, failed, skipped
+        result = clone_with_retries(entry, base_directory, org, retries, options)
+        with lock:
+            done += 1
+            if result.returncode != 0:
+                failed += 1
+            if result.skipped:
+                skipped += 1
+            if show_progress:
+                print("\r\033[K", end="")
+            if result.skipped:
+                if not quiet:
+                    print(f"- {entry.repo}: {base_directory / entry.target} already exists, skipped")
+            elif result.returncode == 0:
+                if not quiet:
+                    print(f"✓ {entry.repo} -> {base_directory / entry.target} ({result.seconds:.1f}s)")
+            else:
+                print(f"✗ {entry.repo}: {result.error} (attempts: {result.attempts})")
+            progress()
+        return result
+
+    if not quiet:
+        print(f"Cloning {total} repositories into {base_directory.absolute()} ({jobs} at a time)")
+
+    base_directory.mkdir(parents=True, exist_ok=True)
+    progress()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(run, entries))
+
+    if show_progress:
+        print("\r\033[K", end="")
+
+    if not quiet:
+        elapsed = time.monotonic() - start
+        print()
+        cloned = done - failed - skipped
+        print(f"Cloned {cloned}/{total} in {elapsed:.1f}s ({skipped} skipped, {failed} failed)")
+
+    return 1 if failed else 0
+
+
 def main() -> None:
     """Main execution block."""
     args = parse_arguments(sys.argv[1:])
 
-    target = args.target_directory if args.target_directory else args.repo_name
+    options = CloneOptions(
+        depth=args.depth,
+        filter_spec=args.filter_spec,
+        single_branch=args.single_branch,
+        cache_dir=args.cache_dir if args.cache else None,
+        dissociate=args.dissociate,
+        cache_limit=args.cache_limit,
+    )
+
+    if args.manifest:
+        exit_code = clone_manifest(
+            manifest_file=Path(args.manifest),
+            base_directory=Path(args.target_directory or "."),
+            org=args.org,
+            jobs=args.jobs,
+            retries=args.retries,
+            quiet=args.quiet,
+            options=options,
+            default_branch=args.branch,
+        )
+        sys.exit(exit_code)
+
+    target = args.target_directory if args.target_directory else repo_basename(args.repo_name)
     target_path = Path(target)
 
     exit_code = clone_repository(
@@ -115,6 +849,8 @@ def main() -> None:
         target_directory=target_path,
         org=args.org,
         quiet=args.quiet,
+        options=options,
+        branch=args.branch,
     )
 
     sys.exit(exit_code)
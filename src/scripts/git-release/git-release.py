@@ -6,11 +6,19 @@ Creates versioned release tags with intelligent defaults and safety checks.
 """
 
 import argparse
+import glob
+import os
 import re
 import subprocess
 import sys
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import IntEnum
+from pathlib import Path
+
+# Tag namespaces worth asking git for; everything else is filtered server-side
+SEMVER_TAG_PATTERNS = ("refs/tags/[0-9]*", "refs/tags/v[0-9]*")
 
 
 class Verbosity(IntEnum):
@@ -27,9 +35,52 @@ class Config:
     verbose: Verbosity = Verbosity.NORMAL
 
 
-def run_git(*args: str, capture: bool = True, check: bool = True) -> str:
-    """Run a git command and return its output."""
-    cmd = ["git"] + list(args)
+@dataclass
+class RepoState:
+    """Snapshot of the repository state the release checks need.
+
+    Built from one ``git status`` call (branch and dirty state) and one
+    ``git for-each-ref`` call (branches, origin refs and semver-shaped tags),
+    so the checks themselves never spawn git.
+    """
+    branch: str = "HEAD"
+    dirty: bool = False
+    heads: dict[str, str] = field(default_factory=dict)
+    remotes: dict[str, str] = field(default_factory=dict)
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ReleasePlan:
+    """Outcome of a successful preflight: the tag to create and any warnings."""
+    repo: str | None
+    tag: str
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    """Per-repository progress and timings for a --repos run."""
+    repo: str
+    plan: ReleasePlan | None = None
+    error: str | None = None
+    preflight_seconds: float = 0.0
+    release_seconds: float = 0.0
+    released: bool = False
+
+
+class ReleaseError(Exception):
+    """A safety check failed; the message explains why."""
+
+
+def run_git(
+    *args: str,
+    capture: bool = True,
+    check: bool = True,
+    repo: str | None = None,
+) -> str:
+    """Run a git command (optionally in another working copy) and return its output."""
+    cmd = ["git"] + (["-C", repo] if repo else []) + list(args)
     result = subprocess.run(
         cmd,
         capture_output=capture,
@@ -57,21 +108,73 @@ def warn(msg: str) -> None:
     print(f"WARNING: {msg}", file=sys.stderr)
 
 
-def get_current_branch() -> str:
-    """Get the current git branch name."""
-    return run_git("rev-parse", "--abbrev-ref", "HEAD")
+def read_worktree_state(repo: str | None = None) -> RepoState:
+    """Read the current branch and uncommitted changes with one git call."""
+    output = run_git(
+        "status", "--porcelain=v2", "--branch", "--untracked-files=no", repo=repo
+    )
+    state = RepoState()
+    for line in output.split("\n"):
+        if line.startswith("# branch.head "):
+            head = line[len("# branch.head "):]
+            state.branch = "HEAD" if head == "(detached)" else head
+        elif line and not line.startswith("#"):
+            state.dirty = True
+    return state
+
+
+def read_refs(state: RepoState, repo: str | None = None) -> None:
+    """Load branches, origin refs and semver-shaped tags with one git call.
+
+    Tags come back in descending version order, which get_highest_version
+    relies on.
+    """
+    output = run_git(
+        "for-each-ref",
+        "--sort=-v:refname",
+        "--format=%(refname)%00%(objectname)",
+        "refs/heads",
+        "refs/remotes/origin",
+        *SEMVER_TAG_PATTERNS,
+        repo=repo,
+    )
+    state.heads.clear()
+    state.remotes.clear()
+    state.tags.clear()
+    for line in output.split("\n"):
+        refname, _, objectname = line.partition("\0")
+        if refname.startswith("refs/heads/"):
+            state.heads[refname[len("refs/heads/"):]] = objectname
+        elif refname.startswith("refs/remotes/"):
+            state.remotes[refname[len("refs/remotes/"):]] = objectname
+        elif refname.startswith("refs/tags/"):
+            state.tags.append(refname[len("refs/tags/"):])
+
+
+def start_fetch_tags(config: Config, repo: str | None = None) -> subprocess.Popen[str]:
+    """Start fetching the latest tags from origin in the background."""
+    log("Fetching tags from origin...", config, Verbosity.DEBUG)
+    return subprocess.Popen(
+        ["git"] + (["-C", repo] if repo else []) + ["fetch", "--tags", "--quiet"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
 
 
-def fetch_tags(config: Config) -> None:
-    """Fetch latest tags from origin."""
-    log("Fetching tags from origin...", config, Verbosity.DEBUG)
-    run_git("fetch", "--tags", "--quiet")
+def finish_fetch_tags(fetch: subprocess.Popen[str], config: Config) -> None:
+    """Wait for a background tag fetch and fail if it did not succeed."""
+    _, stderr = fetch.communicate()
+    if fetch.returncode != 0:
+        raise ReleaseError(f"Failed to fetch tags from origin: {stderr.strip()}")
+    log("Fetch complete", config, Verbosity.DEBUG)
 
 
-def get_all_tags() -> list[str]:
-    """Get all tags from the repository."""
-    output = run_git("tag", "--list")
-    return output.split("\n") if output else []
+def abort_fetch_tags(fetch: subprocess.Popen[str]) -> None:
+    """Stop a background tag fetch that is no longer needed."""
+    if fetch.poll() is None:
+        fetch.terminate()
+    fetch.wait()
 
 
 def parse_semver(tag: str) -> tuple[int, int, int] | None:
@@ -90,17 +193,27 @@ def validate_tag_format(tag: str) -> bool:
 
 
 def get_highest_version(tags: list[str]) -> tuple[int, int, int] | None:
-    """Find the highest semantic version from a list of tags."""
-    versions = []
+    """Find the highest semantic version from a list of tags.
+
+    Tags must be in git's descending version order (as read_refs returns
+    them), so only the first valid tag with and without a 'v' prefix needs
+    to be parsed.
+    """
+    highest: dict[bool, tuple[int, int, int]] = {}
     for tag in tags:
+        prefixed = tag.startswith("v")
+        if prefixed in highest:
+            continue
         parsed = parse_semver(tag)
         if parsed:
-            versions.append(parsed)
+            highest[prefixed] = parsed
+            if len(highest) == 2:
+                break
     
-    if not versions:
+    if not highest:
         return None
     
-    return max(versions)
+    return max(highest.values())
 
 
 def suggest_next_version(tags: list[str]) -> str:
@@ -120,60 +233,244 @@ def tag_exists(tag: str, tags: list[str]) -> bool:
     return tag in tags or f"v{normalized}" in tags or normalized in tags
 
 
-def has_uncommitted_changes() -> bool:
-    """Check if there are uncommitted changes."""
-    result = subprocess.run(
-        ["git", "diff-index", "--quiet", "HEAD", "--"],
-        capture_output=True,
-    )
-    return result.returncode != 0
-
-
-def has_unpushed_commits(branch: str) -> bool:
+def has_unpushed_commits(state: RepoState, branch: str) -> bool:
     """Check if there are commits not pushed to origin."""
-    try:
-        local = run_git("rev-parse", branch)
-        remote = run_git("rev-parse", f"origin/{branch}")
-        return local != remote
-    except subprocess.CalledProcessError:
+    remote = state.remotes.get(f"origin/{branch}")
+    if remote is None:
         # Remote branch doesn't exist
         return True
+    return state.heads.get(branch) != remote
 
 
-def get_branch_commit(branch: str) -> str | None:
-    """Get the commit hash of a branch, or None if it doesn't exist."""
-    try:
-        return run_git("rev-parse", branch)
-    except subprocess.CalledProcessError:
-        return None
-
-
-def check_develop_divergence(config: Config) -> None:
-    """Warn if develop branch differs from main."""
-    main_commit = get_branch_commit("main")
-    develop_commit = get_branch_commit("develop")
+def check_develop_divergence(state: RepoState, config: Config) -> str | None:
+    """Return a warning if develop branch differs from main."""
+    main_commit = state.heads.get("main")
+    develop_commit = state.heads.get("develop")
     
     if develop_commit is None:
         log("No 'develop' branch found (this is fine)", config, Verbosity.DEBUG)
-        return
+        return None
     
     if main_commit != develop_commit:
-        warn("'develop' branch differs from 'main' - consider merging before release")
         log(f"  main:    {main_commit[:8] if main_commit else 'N/A'}", config, Verbosity.DEBUG)
         log(f"  develop: {develop_commit[:8]}", config, Verbosity.DEBUG)
+        return "'develop' branch differs from 'main' - consider merging before release"
+    
+    return None
 
 
-def create_tag(tag: str, name: str | None, config: Config) -> None:
+def create_tag(tag: str, name: str | None, config: Config, repo: str | None = None) -> None:
     """Create an annotated tag."""
     message = name if name else f"Release {tag}"
     log(f"Creating tag '{tag}' with message: {message}", config, Verbosity.DEBUG)
-    run_git("tag", "-a", tag, "-m", message)
+    run_git("tag", "-a", tag, "-m", message, repo=repo)
 
 
-def push_tag(tag: str, config: Config) -> None:
+def push_tag(tag: str, config: Config, repo: str | None = None) -> None:
     """Push a tag to origin."""
     log(f"Pushing tag '{tag}' to origin...", config, Verbosity.DEBUG)
-    run_git("push", "origin", tag)
+    run_git("push", "origin", tag, repo=repo)
+
+
+def preflight(config: Config, repo: str | None = None) -> ReleasePlan:
+    """Run every safety check and work out the tag to create.
+
+    The network fetch runs in the background while the local checks run;
+    failures are still reported in a fixed order.
+
+    Args:
+        config: Release configuration.
+        repo: Working copy to check, or None for the current directory.
+
+    Returns:
+        The tag to create and any non-blocking warnings.
+
+    Raises:
+        ReleaseError: If a blocking check fails.
+    """
+    fetch = start_fetch_tags(config, repo)
+    
+    try:
+        # 1. Must be on main branch
+        state = read_worktree_state(repo)
+        current_branch = state.branch
+        log(f"Current branch: {current_branch}", config, Verbosity.DEBUG)
+        
+        if current_branch != "main":
+            raise ReleaseError(
+                f"Must be on 'main' branch to create a release (currently on '{current_branch}')"
+            )
+        
+        # 2. No uncommitted changes
+        if state.dirty:
+            raise ReleaseError("You have uncommitted changes. Commit or stash them first.")
+    except BaseException:
+        abort_fetch_tags(fetch)
+        raise
+    
+    # 3. Wait for the fetch, then snapshot branches and tags
+    finish_fetch_tags(fetch, config)
+    read_refs(state, repo)
+    tags = state.tags
+    log(f"Found {len(tags)} existing version tags", config, Verbosity.DEBUG)
+    
+    # 4. Determine release tag
+    if config.release_tag:
+        release_tag = config.release_tag
+        if not validate_tag_format(release_tag):
+            raise ReleaseError(
+                f"Invalid tag format '{release_tag}'. Expected ##.##.## (e.g., 1.2.3 or v1.2.3)"
+            )
+    else:
+        release_tag = suggest_next_version(tags)
+    
+    # Normalize tag (ensure no 'v' prefix for storage, we'll add it)
+    release_tag_normalized = release_tag.lstrip("v")
+    final_tag = f"v{release_tag_normalized}"
+    
+    # 5. Check for duplicate tags
+    if tag_exists(final_tag, tags):
+        raise ReleaseError(f"Tag '{final_tag}' already exists. Choose a different version.")
+    
+    # 6. Check for unpushed commits
+    if has_unpushed_commits(state, "main"):
+        raise ReleaseError("You have unpushed commits on 'main'. Push them first or pull latest.")
+    
+    # 7. Warn about develop divergence (non-blocking)
+    plan = ReleasePlan(repo=repo, tag=final_tag)
+    divergence = check_develop_divergence(state, config)
+    if divergence:
+        plan.warnings.append(divergence)
+    
+    return plan
+
+
+def resolve_repos(spec: str) -> list[str]:
+    """Expand a --repos value into working-copy paths.
+
+    An existing file is read as one repository path per line (blank lines
+    and '#' comments are ignored). Anything else is treated as a glob and
+    matched against directories that contain a .git entry.
+    """
+    path = Path(spec).expanduser()
+    if path.is_file():
+        repos = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                repos.append(os.path.expanduser(line))
+        return repos
+    
+    matches = glob.glob(os.path.expanduser(spec))
+    return sorted(match for match in matches if os.path.exists(os.path.join(match, ".git")))
+
+
+def git_failure(exc: subprocess.CalledProcessError) -> str:
+    """Describe a failed git command using its stderr when available."""
+    detail = (exc.stderr or "").strip()
+    return detail.splitlines()[-1] if detail else f"git exited with status {exc.returncode}"
+
+
+def batch_preflight(result: BatchResult, config: Config) -> None:
+    """Run the safety checks for one repository of a batch."""
+    start = time.monotonic()
+    try:
+        result.plan = preflight(config, result.repo)
+    except ReleaseError as exc:
+        result.error = str(exc)
+    except subprocess.CalledProcessError as exc:
+        result.error = git_failure(exc)
+    except OSError as exc:
+        result.error = str(exc)
+    result.preflight_seconds = time.monotonic() - start
+
+
+def batch_release(result: BatchResult, config: Config) -> None:
+    """Create and push the planned tag for one repository of a batch.
+
+    If the push fails the local tag is removed again, so the repository is
+    left as it was and the release can simply be retried.
+    """
+    start = time.monotonic()
+    tag = result.plan.tag
+    try:
+        create_tag(tag, config.release_name, config, result.repo)
+        try:
+            push_tag(tag, config, result.repo)
+        except subprocess.CalledProcessError:
+            run_git("tag", "-d", tag, repo=result.repo, check=False)
+            raise
+        result.released = True
+    except subprocess.CalledProcessError as exc:
+        result.error = git_failure(exc)
+    result.release_seconds = time.monotonic() - start
+
+
+def print_batch_table(results: list[BatchResult], config: Config) -> None:
+    """Print one row per repository with its tag, timings and status."""
+    rows = [("Repository", "Tag", "Preflight", "Release", "Status")]
+    for result in results:
+        if result.error:
+            status = f"FAILED: {result.error}"
+        elif result.released:
+            status = "released"
+        else:
+            status = "ready"
+        rows.append((
+            result.repo,
+            result.plan.tag if result.plan else "-",
+            f"{result.preflight_seconds:.2f}s",
+            f"{result.release_seconds:.2f}s" if result.release_seconds else "-",
+            status,
+        ))
+    
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    log("", config)
+    for row in rows:
+        cells = [cell.ljust(width) for cell, width in zip(row[:4], widths)]
+        log("  ".join(cells + [row[4]]), config)
+    log("", config)
+
+
+def run_batch(repos: list[str], config: Config, jobs: int) -> None:
+    """Release many repositories with an all-or-nothing preflight.
+
+    Every repository is checked first (up to `jobs` at a time). Tags are
+    only created if all of them pass; otherwise nothing is tagged.
+    """
+    if not repos:
+        error("No repositories matched --repos.")
+    
+    results = [BatchResult(repo=repo) for repo in repos]
+    log(f"Running preflight checks for {len(results)} repositories...", config)
+    
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(lambda result: batch_preflight(result, config), results))
+    
+    print_batch_table(results, config)
+    
+    failed = [result for result in results if result.error]
+    if failed:
+        error(f"Preflight failed for {len(failed)} of {len(results)} repositories; nothing was tagged.")
+    
+    for result in results:
+        for message in result.plan.warnings:
+            warn(f"{result.repo}: {message}")
+    
+    if not confirm(f"Create {len(results)} releases?", config):
+        log("Release aborted.", config)
+        sys.exit(0)
+    
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(lambda result: batch_release(result, config), results))
+    
+    print_batch_table(results, config)
+    
+    failed = [result for result in results if result.error]
+    if failed:
+        error(f"Release failed for {len(failed)} of {len(results)} repositories.")
+    
+    log(f"✓ {len(results)} releases created and pushed successfully!", config)
 
 
 def confirm(prompt: str, config: Config) -> bool:
@@ -197,6 +494,8 @@ Examples:
   git-release --release-name="Holiday" # Add release name
   git-release --yes                    # Skip confirmation
   git-release --verbose                # Show debug output
+  git-release --repos=repos.txt --yes  # Release every repo listed in a file
+  git-release --repos="~/Code/*" -j 8  # Release every repo matching a glob
         """,
     )
     
@@ -235,6 +534,18 @@ Examples:
         action="store_true",
         help="Same as --verbose=1",
     )
+    parser.add_argument(
+        "--repos",
+        metavar="FILE|GLOB",
+        help="Release several working copies: a file with one path per line, or a glob",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=4,
+        metavar="N",
+        help="Repositories to check and tag in parallel with --repos (default: 4)",
+    )
     
     args = parser.parse_args()
     
@@ -253,48 +564,22 @@ Examples:
         verbose=verbosity,
     )
     
-    # === Safety Checks ===
-    
-    # 1. Must be on main branch
-    current_branch = get_current_branch()
-    log(f"Current branch: {current_branch}", config, Verbosity.DEBUG)
-    
-    if current_branch != "main":
-        error(f"Must be on 'main' branch to create a release (currently on '{current_branch}')")
-    
-    # 2. No uncommitted changes
-    if has_uncommitted_changes():
-        error("You have uncommitted changes. Commit or stash them first.")
-    
-    # 3. Fetch and get all tags
-    fetch_tags(config)
-    tags = get_all_tags()
-    log(f"Found {len(tags)} existing tags", config, Verbosity.DEBUG)
-    
-    # 4. Determine release tag
-    if config.release_tag:
-        release_tag = config.release_tag
-        if not validate_tag_format(release_tag):
-            error(f"Invalid tag format '{release_tag}'. Expected ##.##.## (e.g., 1.2.3 or v1.2.3)")
-    else:
-        suggested = suggest_next_version(tags)
-        release_tag = suggested
-        log(f"Suggested next version: {release_tag}", config)
-    
-    # Normalize tag (ensure no 'v' prefix for storage, we'll add it)
-    release_tag_normalized = release_tag.lstrip("v")
-    final_tag = f"v{release_tag_normalized}"
+    if args.repos:
+        run_batch(resolve_repos(args.repos), config, max(1, args.jobs))
+        return
     
-    # 5. Check for duplicate tags
-    if tag_exists(final_tag, tags):
-        error(f"Tag '{final_tag}' already exists. Choose a different version.")
+    # === Safety Checks ===
+    try:
+        plan = preflight(config)
+    except ReleaseError as exc:
+        error(str(exc))
     
-    # 6. Check for unpushed commits
-    if has_unpushed_commits("main"):
-        error("You have unpushed commits on 'main'. Push them first or pull latest.")
+    final_tag = plan.tag
+    if not config.release_tag:
+        log(f"Suggested next version: {final_tag.lstrip('v')}", config)
     
-    # 7. Warn about develop divergence (non-blocking)
-    check_develop_divergence(config)
+    for message in plan.warnings:
+        warn(message)
     
     # === Summary ===
     log("", config)
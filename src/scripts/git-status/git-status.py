@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""Multi-repository git status overview.
+
+Scans a directory for git repositories and displays a summary of each,
+including the current branch, pending changes, ahead/behind counts and
+local branches.
+
+The scan stops descending at each repository root and skips dependency and
+build folders. Each repository costs a single ``git status --porcelain=v2
+--branch`` call; the remote URL and branch list are read from the git
+directory directly. Repositories are checked on a worker pool and printed
+as soon as each one finishes.
+
+With --cache, results are cached under $XDG_CACHE_HOME/git-status, keyed
+on the mtimes of the repository's index, HEAD, refs, packed-refs and config
+and of the working tree root. A repository whose key is unchanged is
+reported from the cache without running git.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+GREEN = "\033[0;32m"
+YELLOW = "\033[0;33m"
+RESET = "\033[0m"
+
+PRUNE_DIRS = {
+    ".cache",
+    ".dart_tool",
+    ".gradle",
+    ".idea",
+    ".mypy_cache",
+    ".next",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "build",
+    "dist",
+    "node_modules",
+    "target",
+    "vendor",
+    "venv",
+}
+
+CACHE_VERSION = 1
+
+REMOTE_REPO_PATTERN = re.compile(r"[:/]([^/:]+/[^/]+?)(?:\.git)?/?$")
+
+
+@dataclass
+class RepoStatus:
+    """Status of one repository.
+
+    Attributes:
+        folder: Repository root.
+        repo: owner/name taken from the origin URL, or "" without a remote.
+        branch: Checked out branch, or "HEAD" when detached.
+        dirty: True if tracked files have staged or unstaged changes.
+        upstream: Upstream branch, or "" if none is configured.
+        ahead: Commits ahead of the upstream.
+        behind: Commits behind the upstream.
+        branches: Local branch names.
+        error: Error message if git status failed.
+        cached: True if the result was taken from the cache.
+    """
+
+    folder: Path
+    repo: str = ""
+    branch: str = ""
+    dirty: bool = False
+    upstream: str = ""
+    ahead: int = 0
+    behind: int = 0
+    branches: list[str] = field(default_factory=list)
+    error: str = ""
+    cached: bool = False
+
+
+def default_cache_file() -> Path:
+    """Return the cache file path, honouring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "git-status" / "cache.json"
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        args: Command line arguments passed to the script.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        description="Multi-repository status overview",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Output:
+  Displays a formatted table for each repository showing:
+  - Repository name and local folder
+  - Current branch name
+  - Status: "up-to-date" (green) or "changes pending" (yellow)
+  - Ahead/behind counts against the upstream branch
+  - List of all local branches
+
+Cache:
+  With --cache, results are reused while the repository's index, HEAD,
+  refs, config and working tree root are untouched. Edits to tracked files
+  that are not yet staged do not change those, so a cached result can miss
+  them; use --refresh after editing without staging, or to recompute
+  everything. Without --cache every repository is checked with git.
+
+Examples:
+  git-status
+  git-status --source=/projects
+  git-status --skip-no-changes
+  git-status --source=~/work --width=120
+  git-status --cache --show-cached
+  git-status --refresh
+""",
+    )
+    parser.add_argument(
+        "--source",
+        default="~/Code",
+        help="Directory to scan for git repos (default: ~/Code)",
+    )
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=80,
+        help="Width of the output table in characters (default: 80)",
+    )
+    parser.add_argument(
+        "--skip-no-changes",
+        action="store_true",
+        help="Only show repos with uncommitted changes",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="Repositories checked concurrently (default: CPU count)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse cached results for repos whose index, HEAD and refs are unchanged",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached results, run git status for every repo and rewrite the cache",
+    )
+    parser.add_argument(
+        "--show-cached",
+        action="store_true",
+        help="Mark results taken from the cache and print a cache summary",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=default_cache_file(),
+        help="Cache file (default: $XDG_CACHE_HOME/git-status/cache.json)",
+    )
+
+    parsed = parser.parse_args(args)
+
+    if parsed.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    return parsed
+
+
+def find_repositories(root: Path):
+    """Yield repository roots below a folder.
+
+    A folder holding a ``.git`` entry is yielded and not descended into.
+    Folders named in PRUNE_DIRS and symlinks are skipped.
+
+    Args:
+        root: Folder to scan.
+
+    Yields:
+        Repository root folders.
+    """
+    stack = [str(root)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if any(entry.name == ".git" for entry in entries):
+            yield Path(directory)
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if entry.name in PRUNE_DIRS:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+            except OSError:
+                continue
+
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def resolve_git_dir(folder: Path) -> tuple[Path, Path]:
+    """Return the git directory and common directory of a repository.
+
+    Worktrees and submodules use a ``.git`` file pointing elsewhere; linked
+    worktrees keep refs and config in a separate common directory.
+
+    Args:
+        folder: Repository root.
+
+    Returns:
+        Tuple of (git directory, common directory).
+    """
+    git_dir = folder / ".git"
+
+    if git_dir.is_file():
+        content = git_dir.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            git_dir = (folder / content[len("gitdir:") :].strip()).resolve()
+
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text(encoding="utf-8").strip()).resolve()
+
+    return git_dir, common_dir
+
+
+def read_origin_url(common_dir: Path) -> str:
+    """Read remote.origin.url from a repository's config file."""
+    in_origin = False
+
+    try:
+        with open(common_dir / "config", "r", encoding="utf-8") as f:
+            for line in f:
+                stripped = line.strip()
+                if stripped.startswith("["):
+                    in_origin = stripped.replace(" ", "") == '[remote"origin"]'
+                elif in_origin and stripped.startswith("url"):
+                    key, _, value = stripped.partition("=")
+                    if key.strip() == "url":
+                        return value.strip()
+    except OSError:
+        pass
+
+    return ""
+
+
+def read_local_branches(common_dir: Path) -> list[str]:
+    """List local branches from loose refs and packed-refs."""
+    branches = set()
+    heads = common_dir / "refs" / "heads"
+
+    for directory, _dirs, files in os.walk(heads):
+        for name in files:
+            branches.add(os.path.relpath(os.path.join(directory, name), heads))
+
+    try:
+        with open(common_dir / "packed-refs", "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1].startswith("refs/heads/"):
+                    branches.add(parts[1][len("refs/heads/") :])
+    except OSError:
+        pass
+
+    return sorted(branches)
+
+
+def cache_key(folder: Path) -> list[int]:
+    """Return the mtimes that decide whether a cached status is still valid.
+
+    Covers the index and HEAD of the worktree, every directory below
+    refs/heads and refs/remotes (git renames ref files into place, which
+    bumps the directory mtime), packed-refs, config and the worktree root.
+    Missing files contribute 0.
+
+    Args:
+        folder: Repository root.
+
+    Returns:
+        List of mtimes in nanoseconds.
+    """
+    git_dir, common_dir = resolve_git_dir(folder)
+    paths = [
+        folder,
+        git_dir / "index",
+        git_dir / "HEAD",
+        common_dir / "packed-refs",
+        common_dir / "config",
+    ]
+
+    for refs in (common_dir / "refs" / "heads", common_dir / "refs" / "remotes"):
+        paths.append(refs)
+        for directory, dirs, _files in os.walk(refs):
+            paths.extend(Path(directory, name) for name in dirs)
+
+    key = []
+    for path in paths:
+        try:
+            key.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            key.append(0)
+    return key
+
+
+def load_cache(cache_file: Path) -> dict[str, dict]:
+    """Load cached results keyed by repository path."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if data.get("version") != CACHE_VERSION:
+        return {}
+
+    return data.get("repos", {})
+
+
+def save_cache(cache_file: Path, repos: dict[str, dict]) -> None:
+    """Write cached results, replacing the file atomically."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "repos": repos}, f)
+
+    os.replace(temp_file, cache_file)
+
+
+def status_from_cache(folder: Path, entry: dict) -> RepoStatus:
+    """Rebuild a RepoStatus from a cache entry."""
+    fields = {name: value for name, value in entry["status"].items() if name != "folder"}
+    return RepoStatus(folder=folder, **fields, cached=True)
+
+
+def status_to_cache(status: RepoStatus, key: list[int]) -> dict:
+    """Turn a RepoStatus into a cache entry."""
+    fields = asdict(status)
+    del fields["folder"], fields["cached"]
+    return {"key": key, "status": fields}
+
+
+def cached_status(
+    folder: Path,
+    cache: dict[str, dict],
+    refresh: bool,
+) -> tuple[RepoStatus, dict | None]:
+    """Return a repository's status, from the cache when its key matches.
+
+    Args:
+        folder: Repository root.
+        cache: Cached results loaded from disk.
+        refresh: Ignore the cache and always run git.
+
+    Returns:
+        Tuple of (status, cache entry to keep, or None if it must not be cached).
+    """
+    try:
+        key = cache_key(folder)
+    except OSError:
+        return read_status(folder), None
+
+    entry = cache.get(str(folder))
+    if not refresh and entry is not None and entry.get("key") == key:
+        return status_from_cache(folder, entry), entry
+
+    status = read_status(folder)
+    return status, None if status.error else status_to_cache(status, key)
+
+
+def read_status(folder: Path) -> RepoStatus:
+    """Collect the status of one repository.
+
+    Args:
+        folder: Repository root.
+
+    Returns:
+        Status of the repository.
+    """
+    status = RepoStatus(folder=folder)
+
+    result = subprocess.run(
+        [
+            "git",
+            "--no-optional-locks",
+            "-C",
+            str(folder),
+            "status",
+            "--porcelain=v2",
+            "--branch",
+            "--untracked-files=no",
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    if result.returncode != 0:
+        status.error = result.stderr.strip() or f"git status exited with {result.returncode}"
+        return status
+
+    for line in result.stdout.splitlines():
+        if line.startswith("# branch.head "):
+            head = line.split(" ", 2)[2]
+            status.branch = "HEAD" if head == "(detached)" else head
+        elif line.startswith("# branch.upstream "):
+            status.upstream = line.split(" ", 2)[2]
+        elif line.startswith("# branch.ab "):
+            ahead, behind = line.split(" ")[2:4]
+            status.ahead = int(ahead)
+            status.behind = -int(behind)
+        elif not line.startswith("#"):
+            status.dirty = True
+
+    try:
+        _, common_dir = resolve_git_dir(folder)
+    except OSError:
+        return status
+
+    url = read_origin_url(common_dir)
+    match = REMOTE_REPO_PATTERN.search(url)
+    status.repo = match.group(1) if match else url
+    status.branches = read_local_branches(common_dir)
+
+    return status
+
+
+def draw_line(left: str, fill: str, right: str, width: int) -> str:
+    """Return a horizontal box line."""
+    return f"{left}{fill * (width - 2)}{right}"
+
+
+def pad_line(left: str, content: str, right: str, width: int) -> str:
+    """Return a box line holding left-aligned content."""
+    return f"{left} {content:<{width - 4}} {right}"
+
+
+def format_status(status: RepoStatus, root: Path, width: int, show_cached: bool = False) -> str:
+    """Render one repository as a box.
+
+    Args:
+        status: Repository status.
+        root: Scan root, used to show the folder relative to it.
+        width: Box width in characters.
+        show_cached: Mark results that came from the cache.
+
+    Returns:
+        The box as a string.
+    """
+    folder = os.path.relpath(status.folder, root)
+    header = f"Repo: {status.repo}    Folder: ./{'' if folder == '.' else folder}"
+    if show_cached and status.cached:
+        header += "    (cached)"
+
+    lines = [
+        draw_line("╔", "═", "╗", width),
+        pad_line("║", header, "║", width),
+        draw_line("║", "─", "║", width),
+    ]
+
+    if status.error:
+        lines.append(pad_line("║", f"Error: {status.error}", "║", width))
+    else:
+        label, color = ("changes pending", YELLOW) if status.dirty else ("up-to-date", GREEN)
+        lines.append(
+            f"║ Branch: {status.branch:<20} Status: {color}{label:<20}{RESET}"
+            + " " * max(0, width - 60)
+            + "║"
+        )
+        if status.upstream:
+            tracking = f"Tracking: {status.upstream} (ahead {status.ahead}, behind {status.behind})"
+            lines.append(pad_line("║", tracking, "║", width))
+        lines.append(draw_line("║", "─", "║", width))
+        lines.append(pad_line("║", f"Branches: {','.join(status.branches)}", "║", width))
+
+    lines.append(draw_line("╚", "═", "╝", width))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+
+    root = Path(args.source).expanduser().resolve()
+    print(f"Root: {root}")
+
+    use_cache = args.cache or args.refresh
+    cache = load_cache(args.cache_file) if use_cache else {}
+    # Entries for repos outside the scanned root are kept as they are
+    updated = {path: entry for path, entry in cache.items() if not Path(path).is_relative_to(root)}
+    counts = {"repos": 0, "cached": 0}
+
+    def report(future) -> None:
+        status, entry = future.result()
+        counts["repos"] += 1
+        counts["cached"] += status.cached
+        if entry is not None:
+            updated[str(status.folder)] = entry
+        if args.skip_no_changes and not status.dirty and not status.error:
+            return
+        print(format_status(status, root, args.width, args.show_cached), flush=True)
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        pending = set()
+
+        # Print finished repositories while the scan is still running
+        for folder in find_repositories(root):
+            pending.add(pool.submit(cached_status, folder, cache, args.refresh))
+            finished = {future for future in pending if future.done()}
+            for future in finished:
+                report(future)
+            pending -= finished
+
+        for future in as_completed(pending):
+            report(future)
+
+    if use_cache:
+        try:
+            save_cache(args.cache_file, updated)
+        except OSError as exc:
+            print(f"Warning: could not write cache {args.cache_file}: {exc}")
+
+    if args.show_cached:
+        print(f"{counts['cached']} of {counts['repos']} repositories from cache")
+
+
+if __name__ == "__main__":
+    main()
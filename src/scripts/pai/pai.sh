@@ -4,37 +4,47 @@ set -e
 # pai.sh:
 #   Walks folder trees and outputs file contents based on pai.yaml rules.
 #   Supports YAML-driven run configuration, templates, types, include/exclude merging,
-#   chunking, whitespace stripping, dry-run mode, clean mode, quiet mode,
-#   confirmation prompts, and verbose mode.
+#   chunking, whitespace stripping, per-type comment stripping (minify),
+#   incremental mode, dry-run mode, clean mode,
+#   quiet mode, confirmation prompts, and verbose mode. pai_config.py
+#   resolves pai.yaml and the CLI parameters once, caching the parsed YAML
+#   in .pai_cache/config.json until the file changes.
 
 DEBUG=0
 VERBOSE=0
+PRINT_CONFIG=0
+YAML_FILE="pai.yaml"
+SCRIPT_DIR="$(dirname "$(readlink -f "${BASH_SOURCE[0]}")")"
+ENGINE="${SCRIPT_DIR}/pai_engine.py"
+RESOLVER="${SCRIPT_DIR}/pai_config.py"
+
+# Resolved settings, set by load_config from pai.yaml and CLI_PARAMS
 CHUNK_SIZE=""
 NO_WS=0
 DRY_RUN=0
+INCREMENTAL=0
+DEDUP_CONTENT=0
+MAX_FILE_SIZE=""
+SOURCE=""
+UNTRACKED=0
 CLEAN=0
 QUIET=0
 YES=0
-YAML_FILE="pai.yaml"
-
-# YAML-derived defaults (before CLI overrides)
-YAML_CHUNK_SIZE=""
-YAML_NO_WS=0
-YAML_YES=0
-YAML_QUIET=0
-YAML_DRY_RUN=0
-YAML_CLEAN=0
 
 # Global Arrays
-RUN_TYPES=()
-RUN_PARAMS=()
+CLI_PARAMS=()
 FINAL_TYPES=()
+RULE_ARGS=()
+MINIFY_ARGS=()
+FILES=()
 
 # log:
 #   Prints messages only when verbose and not quiet.
 log() {
   debug_print "Logging the files $1"
-  [ "$QUIET" -eq 0 ] && [ "$VERBOSE" -eq 1 ] && echo "$1"
+  if [ "$QUIET" -eq 0 ] && [ "$VERBOSE" -eq 1 ]; then
+    echo "$1"
+  fi
 }
 
 # warn_override:
@@ -68,28 +78,44 @@ full_help() {
   echo "  --chunk             Enable chunking (default size 10200 chars)"
   echo "  --chunk=SIZE        Set custom chunk size"
   echo "  --no-whitespace     Strip leading whitespace from all lines"
+  echo "  --incremental       Reuse cached output, keep files in their previous chunks,"
+  echo "                      write pai.manifest.json and report changed chunks"
+  echo "  --dedup-content     Write files identical to an earlier file as a reference"
+  echo "  --max-file-size=SIZE  Skip files larger than SIZE, e.g. 512K or 1M"
+  echo "                      (overrides run.max_file_size in pai.yaml)"
+  echo "  --source=SOURCE     Where candidate files come from: 'walk' (default) walks"
+  echo "                      the tree, 'git' lists files in the git index so ignored"
+  echo "                      files are never read, falling back to the walk outside"
+  echo "                      a git work tree"
+  echo "  --untracked         With --source=git, also include untracked files that"
+  echo "                      are not ignored"
+  echo
+  echo "A type whose definition sets 'minify: LANGUAGE' has comments, blank line runs"
+  echo "and repeated license headers stripped (languages: blank-lines, c, cpp,"
+  echo "csharp, dart, go, javascript, sql, typescript)."
+  echo
   echo "  --dry-run           Show what would happen without writing files"
   echo "  --clean             Remove existing pai.output* files before running"
   echo "  --quiet             Suppress all output (implies --yes)"
   echo "  --yes               Skip confirmation prompt"
+  echo "  --print-config      Print the resolved settings and rules as JSON and exit"
   exit 0
 }
 
 # parse_args:
-#   Parses CLI arguments and sets global variables.
+#   Parses CLI arguments. Options that mirror run.parameters are queued in
+#   CLI_PARAMS, in the same vocabulary, and override pai.yaml.
 parse_args() {
   for arg in "$@"; do
     case "$arg" in
-      -h|-?) short_help ;;
+      -h|'-?') short_help ;;
       --help) full_help ;;
       --verbose|-v) VERBOSE=1 ;;
-      --chunk=*) CHUNK_SIZE="${arg#*=}" ;;
-      --chunk) CHUNK_SIZE="10200" ;;
-      --no-whitespace) NO_WS=1 ;;
-      --dry-run) DRY_RUN=1; YES=1 ;;
-      --clean) CLEAN=1 ;;
-      --quiet) QUIET=1; YES=1 ;;
-      --yes) YES=1 ;;
+      --chunk|--chunk=*|--no-whitespace|--incremental|--dedup-content|--max-file-size=*|--source=*|--untracked|--clean|--yes)
+        CLI_PARAMS+=("${arg#--}") ;;
+      --dry-run) CLI_PARAMS+=("dry-run" "yes") ;;
+      --quiet) CLI_PARAMS+=("quiet" "yes") ;;
+      --print-config) PRINT_CONFIG=1 ;;
       --debug) DEBUG=1 ;;
       *) YAML_FILE="$arg" ;;
     esac
@@ -97,244 +123,96 @@ parse_args() {
 }
 
 debug_print() {
-  [ "$DEBUG" -eq 1 ] && echo "DEBUG: $*"
-}
-
-load_yaml_run_section() {
-  if ! yq '.run' "$YAML_FILE" >/dev/null 2>&1; then
-    echo "ERROR: Missing 'run:' section in $YAML_FILE."
-    echo
-    echo "Expected structure:"
-    echo "run:"
-    echo "  types:"
-    echo "    - dart"
-    echo "    - flutter"
-    echo "  parameters:"
-    echo "    - no-whitespace"
-    echo "    - yes"
-    echo "    - chunk=10100"
-    exit 1
+  if [ "$DEBUG" -eq 1 ]; then
+    echo "DEBUG: $*"
   fi
-
-  RUN_TYPES=()
-  while IFS= read -r line; do
-    RUN_TYPES+=("$line")
-  done < <(yq -r '.run.types // [] | .[]' "$YAML_FILE")
-
-  RUN_PARAMS=()
-  while IFS= read -r line; do
-    RUN_PARAMS+=("$line")
-  done < <(yq -r '.run.parameters // [] | .[]' "$YAML_FILE")
 }
 
+# load_config:
+#   Resolves pai.yaml and CLI_PARAMS into the settings, FINAL_TYPES and the
+#   engine arguments in RULE_ARGS and MINIFY_ARGS.
+load_config() {
+  local config
 
-apply_yaml_parameters() {
-  for p in "${RUN_PARAMS[@]}"; do
-    case "$p" in
-      no-whitespace) YAML_NO_WS=1 ;;
-      yes) YAML_YES=1 ;;
-      quiet) YAML_QUIET=1 ;;
-      dry-run) YAML_DRY_RUN=1 ;;
-      clean) YAML_CLEAN=1 ;;
-      chunk) YAML_CHUNK_SIZE="10200" ;;
-      chunk=*) YAML_CHUNK_SIZE="${p#*=}" ;;
-    esac
-  done
-
-  # Apply YAML defaults unless CLI overrides them
-  [ "$YAML_NO_WS" -eq 1 ] && [ "$NO_WS" -eq 0 ] && NO_WS=1
-  [ "$YAML_YES" -eq 1 ] && [ "$YES" -eq 0 ] && YES=1
-  [ "$YAML_QUIET" -eq 1 ] && [ "$QUIET" -eq 0 ] && QUIET=1
-  [ "$YAML_DRY_RUN" -eq 1 ] && [ "$DRY_RUN" -eq 0 ] && DRY_RUN=1
-  [ "$YAML_CLEAN" -eq 1 ] && [ "$CLEAN" -eq 0 ] && CLEAN=1
-
-  if [ -n "$YAML_CHUNK_SIZE" ]; then
-    [ -z "$CHUNK_SIZE" ] && CHUNK_SIZE="$YAML_CHUNK_SIZE"
-  fi
-}
-
-# load_yaml:
-#   Loads templates, types, and definitions from pai.yaml using yq.
-load_yaml() {
-  if ! command -v yq >/dev/null 2>&1; then
-    echo "yq is required but not installed."
+  if ! command -v python3 >/dev/null 2>&1; then
+    echo "python3 is required but not installed."
     exit 1
   fi
 
-  TEMPLATES=$(yq '.templates' "$YAML_FILE" 2>/dev/null || echo "")
-  TYPES=$(yq '.types[]?' "$YAML_FILE" 2>/dev/null || echo "")
-}
-
-# expand_selection:
-#   Expands a template name into its list of types, or returns the type itself.
-expand_selection() {
-  local selection="$1"
-  local template_types=""
-
-  template_types=$(yq ".templates.${selection}[]" "$YAML_FILE" 2>/dev/null || true)
+  local resolver_args=("$YAML_FILE")
+  for param in "${CLI_PARAMS[@]}"; do
+    resolver_args+=("--set=$param")
+  done
 
-  if [ -n "$template_types" ]; then
-    echo "$template_types"
-  else
-    echo "$selection"
+  if [ "$PRINT_CONFIG" -eq 1 ]; then
+    python3 "$RESOLVER" "${resolver_args[@]}" --format=json
+    exit 0
   fi
-}
 
-# merge_rules:
-#   Merges global include/exclude with type-specific include/exclude.
-merge_rules() {
-  local type="$1"
+  config=$(python3 "$RESOLVER" "${resolver_args[@]}") || exit 1
+  eval "$config"
 
-  local g_inc=$(yq '.definitions.global.include[]?' "$YAML_FILE")
-  local g_exc=$(yq '.definitions.global.exclude[]?' "$YAML_FILE")
-  local t_inc=$(yq ".definitions.$type.include[]?" "$YAML_FILE")
-  local t_exc=$(yq ".definitions.$type.exclude[]?" "$YAML_FILE")
-
-  EFFECTIVE_INCLUDE=$(printf "%s\n%s\n" "$g_inc" "$t_inc" | sed '/^$/d')
-  EFFECTIVE_EXCLUDE=$(printf "%s\n%s\n" "$g_exc" "$t_exc" | sed '/^$/d')
+  debug_print "Types: ${FINAL_TYPES[*]}"
+  debug_print "Rules: ${RULE_ARGS[*]}"
 }
 
 # collect_files:
-#   Uses merged include/exclude rules to gather matching files.
+#   Walks the tree once with the queued rules of every type and gathers
+#   matching files. Excluded folders are pruned during the walk. With
+#   --source=git the candidates come from the git index instead.
 collect_files() {
-  debug_print "Entering collect_files for type..."
-  
-  local type_files="" 
-
-  local old_ifs="$IFS"
-  IFS=$'\n'
-
-  for pattern in $EFFECTIVE_INCLUDE; do
-    [ -z "$pattern" ] && continue 
+  local path
+  local list
+  local collect_args=("--source=${SOURCE:-walk}")
 
-    debug_print "Searching for pattern: $pattern"
+  [ "$UNTRACKED" -eq 1 ] && collect_args+=("--untracked")
+  [ "$QUIET" -eq 0 ] && [ "$VERBOSE" -eq 1 ] && collect_args+=("--verbose")
+  # Minifying needs to know the type each file was matched by
+  [ "${#MINIFY_ARGS[@]}" -gt 0 ] && collect_args+=("--with-types")
 
-    MATCHES=$(find . -type f -path "./*" -name "$pattern" 2>/dev/null || true)
-    type_files="$type_files $MATCHES"
-  done
-
-  IFS="$old_ifs"
-  
-  type_files=$(echo "$type_files" | sed 's/^ *//' | tr '\n' ' ')
+  debug_print "Collecting files with: ${collect_args[*]} ${RULE_ARGS[*]}"
 
-  debug_print "Initial file list size: $(echo "$type_files" | wc -w)"
+  list=$(mktemp)
+  python3 "$ENGINE" collect "${collect_args[@]}" "${RULE_ARGS[@]}" > "$list"
 
-  local excluded_files="$type_files" 
-
-  for ignore in $EFFECTIVE_EXCLUDE; do
-    debug_print "Excluding pattern: $ignore"
-    
-    excluded_files=$(printf "%s" "$excluded_files" | tr ' ' '\n' | grep -v "$ignore" || true)
-  done
-  
-  FINAL_MATCHES=$(echo "$excluded_files" | tr '\n' ' ')
-  
-  FILES="$FILES $FINAL_MATCHES"
+  FILES=()
+  while IFS= read -r -d '' path; do
+    FILES+=("$path")
+  done < "$list"
+  rm -f "$list"
 
-  debug_print "Final file list size (after exclude): $(echo "$FINAL_MATCHES" | wc -w)"
-}
-
-# expand_run_types:
-#   Expands run.types (which may include templates) and prints the final list.
-#   The caller must capture this output.
-expand_run_types() {
-  for t in "${RUN_TYPES[@]}"; do
-    expand_selection "$t"
-  done
+  debug_print "Final file list size: ${#FILES[@]}"
 }
 
 
-# strip_leading_ws:
-#   Removes leading whitespace from all lines. Reads from stdin.
-strip_leading_ws() {
-  sed 's/^[[:space:]]*//'
-}
-
 # output_all:
-#   Outputs all collected files, optionally chunked, writing to pai.output files.
+#   Streams all collected files into pai.output, or into pai.output.NNNN
+#   chunks that never split a line, optionally stripping leading whitespace
+#   and minifying the types that set a minify language.
 output_all() {
-  OUTPUT=""
-
-  debug_print "Total files in list for output: $(echo "$FILES" | wc -w)"
-  debug_print "Starting file content collection."
-
-  for f in $FILES; do
-    debug_print "Attempting to process file: $f"
-    [ -f "$f" ] || continue
-    debug_print "Successfully found and including: $f"
-    # log "Including: $f"
+  local emit_args=()
 
-    # Capture content, prevent crash if cat fails
-    CONTENT=$(cat "$f" || true)
-
-    if [ "$NO_WS" -eq 1 ]; then
-      debug_print "Stripping whitespace for $f"
-      # Pipe content to strip_leading_ws to avoid Argument List Too Long errors
-      CONTENT=$(printf "%s" "$CONTENT" | strip_leading_ws || true)
-    fi
-
-    OUTPUT="$OUTPUT\n===== FILE: $f =====\n$CONTENT\n"
-    debug_print "Appended content for file: $f. Total OUTPUT length: ${#OUTPUT}"
-  done
-  
-  debug_print "Finished file content collection loop."
+  debug_print "Total files in list for output: ${#FILES[@]}"
 
   if [ "$DRY_RUN" -eq 1 ]; then
     [ "$QUIET" -eq 0 ] && echo "(dry-run) Would write output files."
     return
   fi
 
-  local output_content="${OUTPUT:1}"
+  [ -n "$CHUNK_SIZE" ] && emit_args+=("--chunk=$CHUNK_SIZE")
+  [ "$NO_WS" -eq 1 ] && emit_args+=("--no-whitespace")
+  [ "$INCREMENTAL" -eq 1 ] && emit_args+=("--incremental")
+  [ "$DEDUP_CONTENT" -eq 1 ] && emit_args+=("--dedup-content")
+  [ -n "$MAX_FILE_SIZE" ] && emit_args+=("--max-file-size=$MAX_FILE_SIZE")
+  [ "$QUIET" -eq 0 ] && [ "$VERBOSE" -eq 1 ] && emit_args+=("--verbose")
+  [ "$QUIET" -eq 1 ] && emit_args+=("--quiet")
+  [ "${#MINIFY_ARGS[@]}" -gt 0 ] && emit_args+=("--with-types" "${MINIFY_ARGS[@]}")
 
-  if [ -z "$CHUNK_SIZE" ]; then
-    debug_print "Writing single output file: pai.output"
-    printf "%b" "$output_content" > pai.output
-    debug_print "Finished writing single output file."
-  else
-    debug_print "Preparing to chunk output. Chunk size: $CHUNK_SIZE"
-    chunk_output "$output_content"
-    debug_print "Finished calling chunk_output."
-  fi
-}
+  debug_print "Writing output with: ${emit_args[*]}"
 
-# chunk_output:
-#   Splits output into chunk files without breaking lines.
-chunk_output() {
-  local data="$1"
-  local index=1
-  local current=""
-  local current_len=0
-  local line_count=0
-  
-  debug_print "Chunking started. Chunk size: $CHUNK_SIZE"
-
-  while IFS= read -r line || [ -n "$line" ]; do
-    line_count=$((line_count + 1))
-    
-    local line_len=${#line}
-    local new_len=$((current_len + line_len + 1))
-
-    if [ $new_len -gt $CHUNK_SIZE ] && [ $current_len -gt 0 ]; then
-      debug_print "Writing chunk $(printf '%04d' "$index") (current length: $current_len)"
-      printf "%s\n" "$current" > "pai.output.$(printf '%04d' "$index")"
-      index=$((index + 1))
-      current="$line"
-      current_len=$line_len
-    else
-      if [ -z "$current" ]; then
-        current="$line"
-      else
-        current="$current"$'\n'"$line"
-      fi
-      current_len=$new_len
-    fi
-  done < <(printf "%b" "$data")
+  printf '%s\0' "${FILES[@]}" | python3 "$ENGINE" emit "${emit_args[@]}"
 
-  if [ -n "$current" ]; then
-    debug_print "Writing final chunk $(printf '%04d' "$index") (current length: $current_len)"
-    printf "%s\n" "$current" > "pai.output.$(printf '%04d' "$index")"
-  fi
-  debug_print "Chunking complete."
+  debug_print "Finished writing output."
 }
 
 
@@ -350,6 +228,11 @@ confirm_run() {
   echo "  Types: ${FINAL_TYPES[*]}"
   echo "  Chunk size: ${CHUNK_SIZE:-none}"
   echo "  No whitespace: $([ $NO_WS -eq 1 ] && echo yes || echo no)"
+  echo "  Minify: $([ ${#MINIFY_ARGS[@]} -gt 0 ] && echo "${MINIFY_ARGS[*]#--minify=}" || echo none)"
+  echo "  Incremental: $([ $INCREMENTAL -eq 1 ] && echo yes || echo no)"
+  echo "  Dedup content: $([ $DEDUP_CONTENT -eq 1 ] && echo yes || echo no)"
+  echo "  Max file size: ${MAX_FILE_SIZE:-none}"
+  echo "  Source: ${SOURCE:-walk}$([ $UNTRACKED -eq 1 ] && echo ' (with untracked)')"
   echo "  Dry run: $([ $DRY_RUN -eq 1 ] && echo yes || echo no)"
   echo "  Clean: $([ $CLEAN -eq 1 ] && echo yes || echo no)"
   echo "  Quiet: $([ $QUIET -eq 1 ] && echo yes || echo no)"
@@ -370,30 +253,19 @@ clean_outputs() {
 }
 
 # main:
-#   Orchestrates argument parsing, YAML loading, rule merging, file collection, and output.
+#   Orchestrates argument parsing, config resolution, file collection, and output.
 main() {
   parse_args "$@"
 
+  load_config
+
   if [ "$CLEAN" -eq 1 ]; then
     clean_outputs
   fi
 
-  load_yaml_run_section
-
-  load_yaml
-
-  apply_yaml_parameters
-
-  FINAL_TYPES=($(expand_run_types))
-
   confirm_run
 
-  FILES=""
-
-  for type in "${FINAL_TYPES[@]}"; do
-    merge_rules "$type"
-    collect_files
-  done
+  collect_files
 
   output_all
 
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""Configuration resolver for pai.
+
+Reads pai.yaml once and resolves it into the settings and rules pai.sh
+needs: run.types with templates expanded, the global include/exclude rules
+merged into every selected type's own rules, each type's minify language,
+and run.parameters with the command line parameters applied on top.
+
+Parsing the YAML is the slow part, so the resolved snapshot is cached in
+``.pai_cache/config.json`` together with the SHA-256 of the YAML file. As
+long as the file is unchanged a run only reads and hashes it. Command line
+parameters are not part of the snapshot and are applied on every run.
+
+The YAML is parsed with PyYAML when it is installed, and with ``yq`` (the
+Go implementation, ``yq -o=json``) otherwise.
+
+Parameters use the run.parameters vocabulary on the command line too:
+``no-whitespace``, ``chunk`` or ``chunk=SIZE``, ``max-file-size=SIZE``,
+``source=walk|git`` and the flags listed in FLAG_PARAMETERS. Later
+parameters win, so ``--set`` values override pai.yaml.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+
+CACHE_DIR = ".pai_cache"
+
+CONFIG_CACHE_FILE = "config.json"
+
+CONFIG_VERSION = 1
+
+DEFAULT_CHUNK_SIZE = "10200"
+
+SOURCES = ("walk", "git")
+
+# Parameters that switch a setting on, with the setting they switch
+FLAG_PARAMETERS = {
+    "no-whitespace": "no_whitespace",
+    "yes": "yes",
+    "quiet": "quiet",
+    "dry-run": "dry_run",
+    "incremental": "incremental",
+    "dedup-content": "dedup_content",
+    "untracked": "untracked",
+    "clean": "clean",
+}
+
+# Parameters that take a value, with the setting they set
+VALUE_PARAMETERS = {
+    "chunk": "chunk_size",
+    "max-file-size": "max_file_size",
+    "source": "source",
+}
+
+# Shell variable pai.sh keeps each setting in
+SHELL_VARIABLES = {
+    "chunk_size": "CHUNK_SIZE",
+    "no_whitespace": "NO_WS",
+    "yes": "YES",
+    "quiet": "QUIET",
+    "dry_run": "DRY_RUN",
+    "incremental": "INCREMENTAL",
+    "dedup_content": "DEDUP_CONTENT",
+    "max_file_size": "MAX_FILE_SIZE",
+    "source": "SOURCE",
+    "untracked": "UNTRACKED",
+    "clean": "CLEAN",
+}
+
+MISSING_RUN_MESSAGE = """\
+ERROR: Missing 'run:' section in {path}.
+
+Expected structure:
+run:
+  types:
+    - dart
+    - flutter
+  parameters:
+    - no-whitespace
+    - yes
+    - chunk=10100"""
+
+
+class ConfigError(Exception):
+    """Raised when pai.yaml cannot be read or resolved."""
+
+
+def parse_yaml(data: bytes, path: str) -> object:
+    """Parse YAML with PyYAML, or with yq when PyYAML is not installed.
+
+    Args:
+        data: Content of the YAML file.
+        path: Path of the file, for yq and error messages.
+
+    Returns:
+        The parsed document.
+
+    Raises:
+        ConfigError: If the document cannot be parsed.
+    """
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+
+    if yaml is not None:
+        try:
+            return yaml.safe_load(data)
+        except yaml.YAMLError as exc:
+            raise ConfigError(f"ERROR: Could not parse {path}: {exc}") from exc
+
+    try:
+        result = subprocess.run(["yq", "-o=json", ".", path], capture_output=True, check=True)
+    except FileNotFoundError as exc:
+        raise ConfigError("PyYAML or yq is required but neither is installed.") from exc
+    except subprocess.CalledProcessError as exc:
+        message = exc.stderr.decode(errors="replace").strip()
+        raise ConfigError(f"ERROR: Could not parse {path}: {message}") from exc
+    return json.loads(result.stdout or b"null")
+
+
+def string_list(value: object) -> list[str]:
+    """Return a YAML sequence as a list of strings, dropping empty entries."""
+    if not isinstance(value, list):
+        return []
+    return [str(item) for item in value if item is not None and str(item) != ""]
+
+
+def resolve(document: object, path: str) -> dict:
+    """Resolve a parsed pai.yaml into the snapshot that gets cached.
+
+    Args:
+        document: Parsed YAML document.
+        path: Path of the YAML file, for error messages.
+
+    Returns:
+        Dictionary with the run selection, the expanded types, the
+        parameters from pai.yaml and the merged rules of every type.
+
+    Raises:
+        ConfigError: If the document has no run section.
+    """
+    if not isinstance(document, dict) or not isinstance(document.get("run"), dict):
+        raise ConfigError(MISSING_RUN_MESSAGE.format(path=path))
+
+    run = document["run"]
+    templates = document.get("templates")
+    templates = templates if isinstance(templates, dict) else {}
+    definitions = document.get("definitions")
+    definitions = definitions if isinstance(definitions, dict) else {}
+
+    selection = string_list(run.get("types"))
+    types = []
+    for name in selection:
+        # A template expands to its types, anything else is a type itself
+        for type_name in string_list(templates.get(name)) or [name]:
+            if type_name not in types:
+                types.append(type_name)
+
+    # YAML 1.1 parsers read a bare yes as true
+    parameters = ["yes" if item is True else item for item in run.get("parameters") or []]
+    parameters = string_list(parameters)
+    if run.get("max_file_size") not in (None, ""):
+        parameters.append(f"max-file-size={run['max_file_size']}")
+
+    global_rules = definitions.get("global")
+    global_rules = global_rules if isinstance(global_rules, dict) else {}
+    rules = {}
+    for type_name in types:
+        definition = definitions.get(type_name)
+        definition = definition if isinstance(definition, dict) else {}
+        minify = definition.get("minify")
+        rules[type_name] = {
+            "include": string_list(global_rules.get("include")) + string_list(definition.get("include")),
+            "exclude": string_list(global_rules.get("exclude")) + string_list(definition.get("exclude")),
+            "minify": str(minify) if minify not in (None, "") else None,
+        }
+
+    return {"selection": selection, "types": types, "parameters": parameters, "rules": rules}
+
+
+def load_snapshot(path: str, cache_dir: str = CACHE_DIR) -> tuple[dict, str, bool]:
+    """Return the resolved snapshot of a YAML file, using the cache if valid.
+
+    Args:
+        path: YAML file to load.
+        cache_dir: Folder holding the snapshot cache.
+
+    Returns:
+        Tuple of (snapshot, SHA-256 of the file, whether it came from the
+        cache).
+
+    Raises:
+        ConfigError: If the file cannot be read or resolved.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as exc:
+        raise ConfigError(MISSING_RUN_MESSAGE.format(path=path)) from exc
+
+    digest = hashlib.sha256(data).hexdigest()
+    cache_path = os.path.join(cache_dir, CONFIG_CACHE_FILE)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached = json.load(f)
+        if cached.get("version") == CONFIG_VERSION and cached.get("sha256") == digest:
+            return cached["snapshot"], digest, True
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    snapshot = resolve(parse_yaml(data, path), path)
+
+    # The cache only saves time, so a folder that cannot be written is fine
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CONFIG_VERSION, "sha256": digest, "snapshot": snapshot}, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+    return snapshot, digest, False
+
+
+def apply_parameters(parameters: list[str]) -> dict:
+    """Turn run parameters into settings, later parameters winning.
+
+    Unknown parameters are ignored.
+
+    Raises:
+        ConfigError: If the source is not one of SOURCES.
+    """
+    settings = {name: False for name in FLAG_PARAMETERS.values()}
+    settings.update({name: "" for name in VALUE_PARAMETERS.values()})
+
+    for parameter in parameters:
+        name, has_value, value = parameter.partition("=")
+        if name in FLAG_PARAMETERS and not has_value:
+            settings[FLAG_PARAMETERS[name]] = True
+        elif name == "chunk" and not has_value:
+            settings["chunk_size"] = DEFAULT_CHUNK_SIZE
+        elif name in VALUE_PARAMETERS and has_value:
+            settings[VALUE_PARAMETERS[name]] = value
+
+    if settings["source"] not in ("", *SOURCES):
+        raise ConfigError(f"ERROR: Unknown source '{settings['source']}' (expected 'walk' or 'git').")
+    return settings
+
+
+def shell_array(name: str, values: list[str]) -> str:
+    """Return a bash array assignment."""
+    return f"{name}=(" + " ".join(shlex.quote(value) for value in values) + ")"
+
+
+def shell_assignments(settings: dict, snapshot: dict) -> str:
+    """Return bash assignments for the settings, types and engine arguments."""
+    lines = []
+    for name, variable in SHELL_VARIABLES.items():
+        value = settings[name]
+        if isinstance(value, bool):
+            value = "1" if value else "0"
+        lines.append(f"{variable}={shlex.quote(value)}")
+
+    rule_args = []
+    minify_args = []
+    for type_name in snapshot["types"]:
+        rules = snapshot["rules"][type_name]
+        rule_args.append(f"--type={type_name}")
+        rule_args.extend(f"--include={type_name}={pattern}" for pattern in rules["include"])
+        rule_args.extend(f"--exclude={type_name}={pattern}" for pattern in rules["exclude"])
+        if rules["minify"]:
+            minify_args.append(f"--minify={type_name}={rules['minify']}")
+
+    lines.append(shell_array("FINAL_TYPES", snapshot["types"]))
+    lines.append(shell_array("RULE_ARGS", rule_args))
+    lines.append(shell_array("MINIFY_ARGS", minify_args))
+    return "\n".join(lines)
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Resolve pai.yaml into settings and per-type rules.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  pai_config.py pai.yaml --set chunk=5000 --set incremental
+  pai_config.py pai.yaml --format=json
+""",
+    )
+    parser.add_argument("yaml_file", help="pai.yaml to resolve")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="PARAMETER",
+        help="Parameter overriding run.parameters, e.g. chunk=5000 or incremental (repeatable)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("shell", "json"),
+        default="shell",
+        help="Print bash assignments for pai.sh, or the resolved config as JSON (default: shell)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help=f"Folder for the snapshot cache (default: {CACHE_DIR})",
+    )
+    return parser.parse_args(args)
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+
+    try:
+        snapshot, digest, cached = load_snapshot(args.yaml_file, args.cache_dir)
+        settings = apply_parameters(snapshot["parameters"] + args.set)
+    except ConfigError as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "json":
+        config = {
+            "yaml_file": args.yaml_file,
+            "sha256": digest,
+            "cached": cached,
+            "selection": snapshot["selection"],
+            "types": snapshot["types"],
+            "settings": settings,
+            "rules": snapshot["rules"],
+        }
+        print(json.dumps(config, indent=2))
+    else:
+        print(shell_assignments(settings, snapshot))
+
+
+if __name__ == "__main__":
+    main()
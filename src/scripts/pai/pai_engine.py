@@ -0,0 +1,1697 @@
+#!/usr/bin/env python3
+"""File engine for pai.
+
+pai.sh resolves pai.yaml into per-type include/exclude rules and hands them
+to this helper. ``collect`` walks the tree once and prints the matching
+files; ``emit`` streams their contents into pai.output or rolling
+pai.output.NNNN chunks.
+
+Rules follow these conventions:
+
+- A pattern without a slash matches a single path component, like
+  ``find -name``: ``*.dart`` matches any Dart file, ``build`` any folder
+  or file named build.
+- A pattern with a slash matches the path relative to the root and
+  supports ``**`` for any number of folders: ``lib/**/*.dart`` matches
+  ``lib/main.dart`` and ``lib/src/a/b.dart``.
+- A folder excluded for every type is pruned during the walk, so
+  ``.git``, ``node_modules`` and similar trees are never read.
+
+``collect --source=git`` takes the candidate files from ``git ls-files``
+instead of walking the tree, so ignored build output and caches are never
+looked at, and applies the same rules to that list. With ``--untracked``
+untracked files that are not ignored are listed too. Outside a git work
+tree it falls back to the walk.
+
+``emit`` reads each file in blocks of whole lines and writes them straight
+to the open output file, so memory use is bounded by the block size and the
+longest line rather than the size of the project. A line is never split
+across chunks.
+
+``emit --incremental`` keeps a cache in ``.pai_cache``: the SHA-256 of each
+file (trusted while its size and mtime are unchanged) and its processed
+output. Files keep the chunk they were assigned on the previous run, so an
+edit only rewrites the chunks holding that file. ``pai.manifest.json``
+maps every file to its chunks and byte ranges.
+
+Each file is written once even when several types select it. With
+``--dedup-content``, a file whose bytes match an earlier file is written
+as a header plus a reference to that file instead of a second copy.
+
+``collect --with-types`` marks where each type's files start, and ``emit
+--minify=TYPE=LANGUAGE`` then strips comments and extra blank lines from
+that type's files (see pai_minify.py). A leading comment block, usually a
+license header, is written only the first time it appears.
+
+Files are read and processed on a thread pool while the output keeps the
+collected order. Files that look binary (a NUL byte near the start) or
+exceed ``--max-file-size`` are skipped. Files of MMAP_THRESHOLD bytes or
+more are memory-mapped and streamed instead of being read into memory.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import re
+import stat
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Self
+
+from pai_minify import Minifier
+
+OUTPUT_PREFIX = "pai.output"
+
+DEFAULT_CHUNK_SIZE = 10200
+
+READ_BLOCK_SIZE = 1 << 20
+
+MMAP_THRESHOLD = 8 << 20
+
+BINARY_SNIFF_SIZE = 8000
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+CACHE_DIR = ".pai_cache"
+
+MANIFEST_FILE = "pai.manifest.json"
+
+CACHE_VERSION = 1
+
+TYPE_MARKER = "type:"
+
+LEADING_WHITESPACE_PATTERN = re.compile(rb"^[ \t\r\f\v]+", re.MULTILINE)
+
+
+@dataclass
+class TypeRules:
+    """Compiled include/exclude rules for one pai type.
+
+    Attributes:
+        name: Type name from pai.yaml.
+        include_names: Matches file names (patterns without a slash).
+        include_paths: Matches relative paths (patterns with a slash).
+        exclude_names: Matches any path component.
+        exclude_paths: Matches relative paths of folders and files.
+    """
+
+    name: str
+    include_names: re.Pattern | None = None
+    include_paths: re.Pattern | None = None
+    exclude_names: re.Pattern | None = None
+    exclude_paths: re.Pattern | None = None
+
+    def includes(self, name: str, rel_path: str) -> bool:
+        """Return True if a file is selected by an include pattern."""
+        if self.include_names is not None and self.include_names.fullmatch(name):
+            return True
+        return self.include_paths is not None and bool(self.include_paths.fullmatch(rel_path))
+
+    def excludes(self, name: str, rel_path: str) -> bool:
+        """Return True if a folder or file is excluded."""
+        if self.exclude_names is not None and self.exclude_names.fullmatch(name):
+            return True
+        return self.exclude_paths is not None and bool(self.exclude_paths.fullmatch(rel_path))
+
+
+@dataclass
+class RuleSet:
+    """Include/exclude rules for every selected type, in run order."""
+
+    types: list[TypeRules] = field(default_factory=list)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a glob pattern into a regular expression.
+
+    ``*`` and ``?`` do not cross folder boundaries, ``**`` does, and
+    ``**/`` also matches no folder at all.
+
+    Args:
+        pattern: Glob pattern.
+
+    Returns:
+        Regular expression source matching the same paths.
+    """
+    i = 0
+    out = []
+
+    while i < len(pattern):
+        char = pattern[i]
+
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif char == "*":
+            out.append("[^/]*")
+            i += 1
+        elif char == "?":
+            out.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+                i += 1
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end + 1
+        else:
+            out.append(re.escape(char))
+            i += 1
+
+    return "".join(out)
+
+
+def compile_patterns(patterns: list[str]) -> re.Pattern | None:
+    """Combine glob patterns into a single compiled alternation."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in patterns))
+
+
+def compile_type(name: str, include: list[str], exclude: list[str]) -> TypeRules:
+    """Compile one type's include and exclude patterns.
+
+    Args:
+        name: Type name.
+        include: Include patterns.
+        exclude: Exclude patterns.
+
+    Returns:
+        Compiled rules for the type.
+    """
+
+    def split(patterns: list[str]) -> tuple[list[str], list[str]]:
+        names, paths = [], []
+        for pattern in patterns:
+            pattern = pattern.strip().removeprefix("./")
+            if not pattern:
+                continue
+            if "/" in pattern.rstrip("/"):
+                paths.append(pattern.strip("/"))
+            else:
+                names.append(pattern.rstrip("/"))
+        return names, paths
+
+    include_names, include_paths = split(include)
+    exclude_names, exclude_paths = split(exclude)
+
+    return TypeRules(
+        name=name,
+        include_names=compile_patterns(include_names),
+        include_paths=compile_patterns(include_paths),
+        exclude_names=compile_patterns(exclude_names),
+        exclude_paths=compile_patterns(exclude_paths),
+    )
+
+
+def is_own_output(name: str) -> bool:
+    """Return True for files pai writes into the folder it runs in."""
+    return name in (CACHE_DIR, MANIFEST_FILE) or name == OUTPUT_PREFIX or name.startswith(f"{OUTPUT_PREFIX}.")
+
+
+def walk(root: str, rules: RuleSet):
+    """Walk a tree once and yield each matching file for each type.
+
+    Folders are visited in sorted order. A folder excluded by a type is not
+    searched for that type; once no type remains it is not entered at all.
+
+    Args:
+        root: Folder to walk.
+        rules: Compiled rules for the selected types.
+
+    Yields:
+        Tuples of (type index, path relative to root).
+    """
+    all_types = frozenset(range(len(rules.types)))
+    stack: list[tuple[str, frozenset[int]]] = [("", all_types)]
+
+    while stack:
+        rel_dir, active = stack.pop()
+        directory = os.path.join(root, rel_dir) if rel_dir else root
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if not rel_dir and is_own_output(entry.name):
+                continue
+
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                remaining = frozenset(
+                    index for index in active if not rules.types[index].excludes(entry.name, rel_path)
+                )
+                if remaining:
+                    subdirs.append((rel_path, remaining))
+            elif is_file:
+                for index in sorted(active):
+                    type_rules = rules.types[index]
+                    if type_rules.includes(entry.name, rel_path) and not type_rules.excludes(
+                        entry.name, rel_path
+                    ):
+                        yield index, rel_path
+
+        stack.extend(reversed(subdirs))
+
+
+def git_paths(root: str, untracked: bool) -> list[str] | None:
+    """List the files git knows about below a folder.
+
+    Args:
+        root: Folder inside a git work tree.
+        untracked: Also list untracked files that are not ignored.
+
+    Returns:
+        Paths relative to root, or None if root is not in a work tree or
+        git is not available.
+    """
+    command = ["git", "-C", root, "ls-files", "-z", "--cached"]
+    if untracked:
+        command += ["--others", "--exclude-standard"]
+
+    try:
+        result = subprocess.run(command, capture_output=True, check=False)
+    except OSError:
+        return None
+
+    if result.returncode != 0:
+        return None
+
+    # A conflicted file is listed once per stage
+    return [os.fsdecode(path) for path in set(result.stdout.split(b"\0")) if path]
+
+
+def walk_order(rel_path: str) -> tuple:
+    """Sort key that puts a flat path list into the order walk visits it.
+
+    walk lists the files of a folder by name before entering its
+    subfolders, also by name.
+    """
+    parts = rel_path.split("/")
+    return (*((1, part) for part in parts[:-1]), (0, parts[-1]))
+
+
+def match_paths(root: str, rules: RuleSet, paths: list[str]):
+    """Yield each matching file for each type from a list of paths.
+
+    Applies the rules as walk does, including folder excludes: a file
+    below a folder excluded by a type is not matched for that type. Paths
+    that are not regular files, such as deleted files and submodules, are
+    skipped.
+
+    Args:
+        root: Folder the paths are relative to.
+        rules: Compiled rules for the selected types.
+        paths: Relative paths of candidate files, in any order.
+
+    Yields:
+        Tuples of (type index, path relative to root), in walk order.
+    """
+    folder_types: dict[str, tuple[int, ...]] = {"": tuple(range(len(rules.types)))}
+
+    def active_types(rel_dir: str) -> tuple[int, ...]:
+        active = folder_types.get(rel_dir)
+        if active is None:
+            parent, _, name = rel_dir.rpartition("/")
+            active = tuple(
+                index for index in active_types(parent) if not rules.types[index].excludes(name, rel_dir)
+            )
+            folder_types[rel_dir] = active
+        return active
+
+    matched = []
+    for rel_path in paths:
+        rel_dir, _, name = rel_path.rpartition("/")
+        active = active_types(rel_dir)
+        if not active or is_own_output(rel_path.partition("/")[0]):
+            continue
+
+        indexes = [
+            index
+            for index in active
+            if rules.types[index].includes(name, rel_path) and not rules.types[index].excludes(name, rel_path)
+        ]
+        if indexes:
+            matched.append((rel_path, indexes))
+
+    # Only the matches are sorted, and only they cost a stat
+    for rel_path, indexes in sorted(matched, key=lambda match: walk_order(match[0])):
+        try:
+            if not stat.S_ISREG(os.lstat(os.path.join(root, rel_path)).st_mode):
+                continue
+        except OSError:
+            continue
+
+        for index in indexes:
+            yield index, rel_path
+
+
+def collect(root: str, rules: RuleSet, source: str = "walk", untracked: bool = False) -> tuple[list[list[str]], str]:
+    """Return the matching files of each type, in run order.
+
+    A file selected by several types is listed only under the first of
+    them, so it is written once.
+
+    Args:
+        root: Folder to search.
+        rules: Compiled rules for the selected types.
+        source: "walk" to walk the tree, or "git" to take candidates from
+            the git index, falling back to the walk outside a work tree.
+        untracked: With the git source, also consider untracked files
+            that are not ignored.
+
+    Returns:
+        Tuple of (one list of relative paths per type, source used).
+    """
+    matches = None
+    if source == "git":
+        candidates = git_paths(root, untracked)
+        if candidates is not None:
+            matches = match_paths(root, rules, candidates)
+
+    if matches is None:
+        source = "walk"
+        matches = walk(root, rules)
+
+    files: list[list[str]] = [[] for _ in rules.types]
+    for index, rel_path in matches:
+        files[index].append(rel_path)
+
+    seen: set[str] = set()
+    for paths in files:
+        unique = []
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                unique.append(path)
+        paths[:] = unique
+
+    return files, source
+
+
+def unique_paths(paths):
+    """Yield paths that exist as files, skipping later spellings of the same file."""
+    seen: set[str] = set()
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        canonical = os.path.realpath(path)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        yield path
+
+
+class ContentIndex:
+    """Finds files whose bytes match a file seen earlier in the run.
+
+    Files are grouped by size first, so only files sharing a size with an
+    earlier file are ever hashed. Empty files are never matched.
+    """
+
+    def __init__(self) -> None:
+        self._by_size: dict[int, list[list]] = {}
+        self.duplicates = 0
+        self.bytes_saved = 0
+
+    def original(self, path: str) -> str | None:
+        """Return the earlier file with the same content as path, or None."""
+        size = os.path.getsize(path)
+        if size == 0:
+            return None
+
+        candidates = self._by_size.setdefault(size, [])
+        digest = hash_file(path) if candidates else None
+
+        for candidate in candidates:
+            if candidate[1] is None:
+                candidate[1] = hash_file(candidate[0])
+            if candidate[1] == digest:
+                self.duplicates += 1
+                self.bytes_saved += size
+                return candidate[0]
+
+        candidates.append([path, digest])
+        return None
+
+    def report(self) -> str:
+        """Return a one line summary of the duplicates found."""
+        return f"Deduplicated {self.duplicates} files ({self.bytes_saved} bytes)."
+
+
+def file_header(path: str) -> bytes:
+    """Return the header line written before a file's content."""
+    return b"===== FILE: " + os.fsencode(path) + b" =====\n"
+
+
+def reference_line(original: str) -> bytes:
+    """Return the line written instead of content already written for another file."""
+    return b"(identical to " + os.fsencode(original) + b")\n"
+
+
+def text_length(data: bytes) -> int:
+    """Return the length of text in characters, as bash's ${#line} counts them."""
+    if data.isascii():
+        return len(data)
+    return len(data.decode("utf-8", "surrogateescape"))
+
+
+class OutputSink:
+    """Writes output to a single pai.output file."""
+
+    def __init__(self, prefix: str = OUTPUT_PREFIX) -> None:
+        self.prefix = prefix
+        self.files_written = 1
+        self._out = open(prefix, "wb")  # noqa: SIM115 - closed by close()
+
+    def write(self, data: bytes) -> None:
+        """Write complete lines, each ending in a newline."""
+        self._out.write(data)
+
+    def close(self) -> None:
+        """Close the output file."""
+        self._out.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ChunkSink(OutputSink):
+    """Writes output into pai.output.NNNN files of bounded size.
+
+    A chunk rolls over when the next line would push it past the chunk
+    size, unless the chunk is still empty, so a line longer than the chunk
+    size gets a chunk of its own instead of being split.
+    """
+
+    def __init__(self, chunk_size: int, prefix: str = OUTPUT_PREFIX) -> None:
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.files_written = 0
+        self._out = None
+        self._length = 0
+
+    def _open_next(self) -> None:
+        if self._out is not None:
+            self._out.close()
+        self.files_written += 1
+        self._out = open(f"{self.prefix}.{self.files_written:04d}", "wb")  # noqa: SIM115 - closed on roll over
+        self._length = 0
+
+    def write(self, data: bytes) -> None:
+        """Write complete lines, each ending in a newline, rolling chunks as needed."""
+        if self._out is None:
+            self._open_next()
+
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+
+        if not data.isascii():
+            # Character and byte offsets differ, so place line by line
+            for line in data.splitlines(keepends=True):
+                self._write_line(line, text_length(line))
+            return
+
+        # Bytes are characters: cut at the last newline that still fits
+        pos = 0
+        while pos < len(data):
+            room = self.chunk_size - self._length
+            cut = data.rfind(b"\n", pos, pos + room) + 1 if room > 0 else 0
+            if cut > pos:
+                self._out.write(data[pos:cut])
+                self._length += cut - pos
+                pos = cut
+            else:
+                end = data.index(b"\n", pos) + 1
+                self._write_line(data[pos:end], end - pos)
+                pos = end
+
+    def _write_line(self, line: bytes, length: int) -> None:
+        if self._length > 0 and self._length + length > self.chunk_size:
+            self._open_next()
+        self._out.write(line)
+        self._length += length
+
+    def close(self) -> None:
+        """Close the current chunk."""
+        if self._out is not None:
+            self._out.close()
+
+
+def line_blocks(path: str):
+    """Yield a file as blocks of whole lines; the last may lack its newline."""
+    with open(path, "rb") as f:
+        carry = b""
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            data = carry + block if carry else block
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if cut:
+                yield data[:cut]
+        if carry:
+            yield carry
+
+
+def file_blocks(path: str, strip_whitespace: bool, minifier: Minifier | None = None):
+    """Yield the content of a file as blocks of complete lines.
+
+    Every block ends in a newline, a missing final newline is added, and
+    trailing blank lines are dropped, matching what ``$(cat file)`` kept.
+    Memory use is bounded by the block size plus the longest line.
+
+    Args:
+        path: File to read.
+        strip_whitespace: Remove leading whitespace from every line.
+        minifier: Strips comments and blank lines first, if given.
+
+    Yields:
+        Blocks of lines as bytes.
+    """
+    blocks = line_blocks(path)
+    if minifier is not None:
+        blocks = minifier.minify_blocks(blocks)
+    blank = 0
+
+    def lines_out(lines: bytes):
+        nonlocal blank
+        if strip_whitespace:
+            lines = LEADING_WHITESPACE_PATTERN.sub(b"", lines)
+        content = lines.rstrip(b"\n")
+        if not content:
+            blank += len(lines)
+            return
+        # Blank lines are only written once later content shows they are not trailing
+        yield b"\n" * blank + content + b"\n"
+        blank = len(lines) - len(content) - 1
+
+    for block in blocks:
+        yield from lines_out(block if block.endswith(b"\n") else block + b"\n")
+
+
+def mapped_blocks(path: str, strip_whitespace: bool):
+    """Yield the content of a large file from a memory map.
+
+    Produces the same output as file_blocks. Without whitespace stripping
+    the blocks are views into the map, so the content is never copied
+    into Python objects on its way to the output file.
+
+    Args:
+        path: File to read.
+        strip_whitespace: Remove leading whitespace from every line.
+
+    Yields:
+        Blocks of complete lines as bytes or memoryview.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        end = len(mapped)
+
+        if strip_whitespace:
+            # Keep up to the end of the last line that is not blank after stripping
+            last = end - 1
+            while last >= 0 and mapped[last] in b" \t\r\f\v\n":
+                last -= 1
+            newline = mapped.find(b"\n", last + 1) if last >= 0 else -1
+            end = newline if newline != -1 else (end if last >= 0 else 0)
+        else:
+            while end and mapped[end - 1] == 0x0A:
+                end -= 1
+
+        view = memoryview(mapped)
+        pos = 0
+        while pos < end:
+            cut = mapped.rfind(b"\n", pos, min(pos + READ_BLOCK_SIZE, end)) + 1
+            if cut <= pos:
+                cut = mapped.find(b"\n", pos + READ_BLOCK_SIZE, end) + 1 or end
+
+            piece = view[pos:cut]
+            if strip_whitespace:
+                piece = LEADING_WHITESPACE_PATTERN.sub(b"", piece)
+            if cut == end:
+                piece = bytes(piece) + b"\n"
+            yield piece
+            del piece
+            pos = cut
+
+        view.release()
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as 512K or 2M into bytes; 0 means no limit."""
+    text = value.strip().upper().removesuffix("B")
+    multiplier = 1
+    if text and text[-1] in SIZE_SUFFIXES:
+        multiplier = SIZE_SUFFIXES[text[-1]]
+        text = text[:-1]
+
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}") from None
+
+
+def format_size(size: float) -> str:
+    """Return a size in bytes as a short human readable string."""
+    for unit in ("B", "K", "M"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+def skip_reason(size: int, head: bytes, max_file_size: int) -> str | None:
+    """Return why a file should be left out of the output, or None.
+
+    Args:
+        size: File size in bytes.
+        head: The first bytes of the file, at least BINARY_SNIFF_SIZE if it has them.
+        max_file_size: Largest file to include, or 0 for no limit.
+
+    Returns:
+        Reason for skipping the file, or None to include it.
+    """
+    if max_file_size and size > max_file_size:
+        return f"{format_size(size)} is over max_file_size {format_size(max_file_size)}"
+
+    if b"\0" in head[:BINARY_SNIFF_SIZE]:
+        return "binary"
+
+    return None
+
+
+def process_bytes(data: bytes, strip_whitespace: bool, minifier: Minifier | None = None) -> bytes:
+    """Return in-memory file content as file_blocks would produce it."""
+    if minifier is not None:
+        data = minifier.minify(data)
+    if strip_whitespace:
+        data = LEADING_WHITESPACE_PATTERN.sub(b"", data)
+    content = data.rstrip(b"\n")
+    return content + b"\n" if content else b""
+
+
+@dataclass
+class ReadResult:
+    """A file after the reader stage.
+
+    Attributes:
+        path: File path.
+        data: Processed content, or None if the file is large and is
+            streamed from a memory map when written.
+        skip: Reason the file is left out, or None.
+        error: Read error message, or None.
+        size: Size of the file on disk.
+    """
+
+    path: str
+    data: bytes | None = None
+    skip: str | None = None
+    error: str | None = None
+    size: int = 0
+
+
+@dataclass
+class MinifyPlan:
+    """Minifiers selected per type, and the type of each collected file.
+
+    Attributes:
+        minifiers: Minifier by type name.
+        path_types: Type name by path.
+        headers: Leading comment blocks already written, whitespace
+            normalised.
+    """
+
+    minifiers: dict[str, Minifier] = field(default_factory=dict)
+    path_types: dict[str, str] = field(default_factory=dict)
+    headers: set[bytes] = field(default_factory=set)
+
+    def minifier(self, path: str) -> Minifier | None:
+        """Return the minifier for a file's type, or None."""
+        return self.minifiers.get(self.path_types.get(path, ""))
+
+    def drop_repeated_header(self, minifier: Minifier, data: bytes) -> bytes:
+        """Remove the leading comment block if an earlier file had the same one.
+
+        Must be called in output order so the first file keeps its header.
+        """
+        header, rest = minifier.split_header(data)
+        key = b" ".join(header.split())
+        if not key:
+            return data
+        if key in self.headers:
+            return rest
+        self.headers.add(key)
+        return data
+
+
+@dataclass
+class Stats:
+    """Counters and timings reported in verbose mode."""
+
+    files: int = 0
+    read_seconds: float = 0.0
+    write_seconds: float = 0.0
+    skipped: list[tuple[str, str]] = field(default_factory=list)
+    minified: dict[str, list[int]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_read_time(self, seconds: float) -> None:
+        """Add time spent in a reader thread."""
+        with self.lock:
+            self.read_seconds += seconds
+
+    def add_minified(self, type_name: str, before: int, after: int) -> None:
+        """Count one minified file of a type and its size before and after."""
+        counts = self.minified.setdefault(type_name, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += before
+        counts[2] += after
+
+    def report(self, total_seconds: float) -> str:
+        """Return skip reasons, minify savings and stage timings, one per line."""
+        lines = [f"Skipped {path} ({reason})" for path, reason in self.skipped]
+        for type_name, (files, before, after) in self.minified.items():
+            saved = 100 * (before - after) / before if before else 0
+            lines.append(
+                f"Minified {type_name}: {files} files, {format_size(before)} -> {format_size(after)} "
+                f"({format_size(before - after)}, {saved:.0f}% saved)"
+            )
+        lines.append(
+            f"Timings: read {self.read_seconds:.3f}s (summed over threads), "
+            f"write {self.write_seconds:.3f}s, total {total_seconds:.3f}s; "
+            f"{self.files} files written, {len(self.skipped)} skipped"
+        )
+        return "\n".join(lines)
+
+
+def ordered_map(func, items, jobs: int):
+    """Run func over items on a thread pool and yield results in input order.
+
+    At most a few results per worker are held at once, so memory stays
+    bounded however many items there are.
+    """
+    if jobs == 1:
+        yield from map(func, items)
+        return
+
+    window = jobs * 4
+    pending: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def read_file(
+    path: str,
+    strip_whitespace: bool,
+    max_file_size: int,
+    stats: Stats,
+    process=None,
+    minifier: Minifier | None = None,
+) -> ReadResult:
+    """Reader stage: check, read and process one file.
+
+    Args:
+        path: File to read.
+        strip_whitespace: Remove leading whitespace from every line.
+        max_file_size: Largest file to include, or 0 for no limit.
+        stats: Collects the time spent.
+        process: Callable returning the processed content of a path. Only
+            the binary sniff is read here then, so a cache behind it can
+            skip reading unchanged files. Without one, files under
+            MMAP_THRESHOLD are processed in memory and larger files are
+            left to be streamed.
+        minifier: Strips comments and blank lines, if given.
+
+    Returns:
+        The processed file, or the reason it was skipped.
+    """
+    start = time.perf_counter()
+    result = ReadResult(path=path)
+
+    try:
+        with open(path, "rb") as f:
+            size = result.size = os.fstat(f.fileno()).st_size
+            # Small files are read whole with the same read that sniffs them,
+            # unless process reads them itself (and may not need to)
+            whole = process is None and size < MMAP_THRESHOLD
+            head = f.read() if whole else f.read(BINARY_SNIFF_SIZE)
+
+        result.skip = skip_reason(size, head, max_file_size)
+        if result.skip is None:
+            if process is not None:
+                result.data = process(path)
+            elif size < MMAP_THRESHOLD:
+                result.data = process_bytes(head, strip_whitespace, minifier)
+    except OSError as exc:
+        result.error = exc.strerror
+
+    stats.add_read_time(time.perf_counter() - start)
+    return result
+
+
+def emit(
+    paths,
+    sink: OutputSink,
+    strip_whitespace: bool,
+    content_index: ContentIndex | None = None,
+    max_file_size: int = 0,
+    jobs: int = 1,
+    stats: Stats | None = None,
+    plan: MinifyPlan | None = None,
+) -> int:
+    """Stream files into an output sink.
+
+    Each file is written as a ``===== FILE: path =====`` header followed
+    by its content, with a blank line between files. Files are read on a
+    thread pool and written in the order given.
+
+    Args:
+        paths: Paths of the files to write, in order.
+        sink: Destination for the output.
+        strip_whitespace: Remove leading whitespace from every line.
+        content_index: Replaces repeated content with a reference, if given.
+        max_file_size: Largest file to include, or 0 for no limit.
+        jobs: Reader threads.
+        stats: Collects skip reasons and timings, if given.
+        plan: Minifiers by type and the type of each file, if given.
+
+    Returns:
+        Number of files written.
+    """
+    stats = stats or Stats()
+    plan = plan or MinifyPlan()
+
+    def reader(path: str) -> ReadResult:
+        return read_file(path, strip_whitespace, max_file_size, stats, minifier=plan.minifier(path))
+
+    for result in ordered_map(reader, unique_paths(paths), jobs):
+        path = result.path
+        if result.skip:
+            stats.skipped.append((path, result.skip))
+            continue
+
+        start = time.perf_counter()
+        header = file_header(path)
+        sink.write(b"\n" + header if stats.files else header)
+        stats.files += 1
+
+        minifier = plan.minifier(path)
+        try:
+            original = content_index.original(path) if content_index else None
+            if result.error:
+                print(f"WARNING: could not read {path}: {result.error}", file=sys.stderr)
+            elif original is not None:
+                sink.write(reference_line(original))
+            elif minifier is None:
+                if result.data is not None:
+                    sink.write(result.data)
+                else:
+                    for block in mapped_blocks(path, strip_whitespace):
+                        sink.write(block)
+            else:
+                if result.data is not None:
+                    blocks = iter((result.data,))
+                else:
+                    blocks = file_blocks(path, strip_whitespace, minifier)
+                written = 0
+                first = plan.drop_repeated_header(minifier, next(blocks, b""))
+                for block in itertools.chain((first,), blocks):
+                    sink.write(block)
+                    written += len(block)
+                stats.add_minified(plan.path_types[path], result.size, written)
+        except OSError as exc:
+            print(f"WARNING: could not read {path}: {exc.strerror}", file=sys.stderr)
+
+        stats.write_seconds += time.perf_counter() - start
+
+    return stats.files
+
+
+@dataclass
+class Unit:
+    """One file as it appears in the output: header plus processed content.
+
+    Attributes:
+        path: Path of the file, as printed in the header.
+        data: Header and content, ending in a newline.
+        length: Length of data in characters.
+        pieces: Data split for chunks of its own, filled in by split().
+    """
+
+    path: str
+    data: bytes
+    length: int
+    pieces: list[bytes] | None = None
+
+    def split(self, chunk_size: int) -> list[bytes]:
+        """Return the data split into chunk-sized pieces, splitting only once.
+
+        Planning and rendering ask for the pieces once per chunk of the
+        file; splitting again each time would be quadratic in the number
+        of chunks a large file produces.
+        """
+        if self.pieces is None:
+            self.pieces = split_lines(self.data, chunk_size)
+        return self.pieces
+
+
+@dataclass
+class Chunk:
+    """Files placed in one output chunk.
+
+    A shared chunk holds whole files separated by blank lines. A file
+    larger than the chunk size instead gets chunks of its own, and part
+    says which piece of it this chunk holds.
+
+    Attributes:
+        number: Chunk number, NNNN in pai.output.NNNN.
+        paths: Files in the chunk, in output order.
+        part: Index of the piece of a large file, or None for shared chunks.
+    """
+
+    number: int
+    paths: list[str] = field(default_factory=list)
+    part: int | None = None
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write a file through a temporary file and rename."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+class ContentCache:
+    """Per-file content hashes and processed output kept between runs.
+
+    A file's hash is reused without reading it while its size and mtime
+    match the cached entry. Processed output is stored under
+    ``objects/<sha256>-<options>`` so a file whose content is unchanged is
+    never processed again.
+    """
+
+    def __init__(self, directory: str, options_key: str) -> None:
+        self.directory = directory
+        self.options_key = options_key
+        self.entries: dict[str, dict] = {}
+        self.used: set[str] = set()
+
+        try:
+            with open(os.path.join(directory, "state.json"), "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == CACHE_VERSION:
+                self.entries = state.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", f"{digest}-{self.options_key}")
+
+    def processed(self, path: str, process, variant: str = "") -> bytes:
+        """Return the processed output of a file, reusing cached results.
+
+        Args:
+            path: File to read.
+            process: Callable turning a path into processed bytes.
+            variant: Distinguishes outputs of the same content processed
+                differently, such as by different minifiers.
+
+        Returns:
+            Processed output of the file.
+        """
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            digest = entry["sha256"]
+        else:
+            digest = hash_file(path)
+            self.entries[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+
+        object_path = self._object_path(digest) + variant
+        self.used.add(object_path)
+
+        try:
+            with open(object_path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+
+        data = process(path)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        write_atomic(object_path, data)
+        return data
+
+    def save(self, paths: set[str]) -> None:
+        """Write the state for the given files and drop unused objects."""
+        os.makedirs(self.directory, exist_ok=True)
+        files = {path: entry for path, entry in self.entries.items() if path in paths}
+        state = {"version": CACHE_VERSION, "files": files}
+        write_atomic(os.path.join(self.directory, "state.json"), json.dumps(state).encode())
+
+        objects = os.path.join(self.directory, "objects")
+        try:
+            with os.scandir(objects) as it:
+                for entry in it:
+                    if entry.path not in self.used:
+                        os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def hash_file(path: str) -> str:
+    """Return the SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_lines(data: bytes, limit: int) -> list[bytes]:
+    """Split text into pieces of at most limit characters at line ends.
+
+    A single line longer than the limit becomes a piece of its own.
+    """
+    pieces: list[bytes] = []
+
+    # Plain ASCII with only \n line ends can be cut by searching for newlines
+    if data.isascii() and b"\r" not in data:
+        start = 0
+        while len(data) - start > limit:
+            end = data.rfind(b"\n", start, start + limit)
+            if end < 0:
+                end = data.find(b"\n", start + limit)
+                if end < 0:
+                    break
+            pieces.append(data[start : end + 1])
+            start = end + 1
+        if start < len(data):
+            pieces.append(data[start:])
+        return pieces
+
+    current: list[bytes] = []
+    length = 0
+
+    for line in data.splitlines(keepends=True):
+        line_length = text_length(line)
+        if current and length + line_length > limit:
+            pieces.append(b"".join(current))
+            current, length = [], 0
+        current.append(line)
+        length += line_length
+
+    if current:
+        pieces.append(b"".join(current))
+    return pieces
+
+
+def load_manifest(path: str, options: dict) -> dict:
+    """Read the manifest of the previous run.
+
+    Args:
+        path: Manifest file.
+        options: Options of this run; a manifest written with different
+            options is ignored.
+
+    Returns:
+        The manifest, or an empty dict.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("version") != CACHE_VERSION or manifest.get("options") != options:
+        return {}
+
+    return manifest
+
+
+def assign_chunks(units: dict[str, Unit], previous: list[Chunk], chunk_size: int) -> list[Chunk]:
+    """Place files into chunks, keeping the previous placement where possible.
+
+    A file stays in the chunk it had last time while the chunk still fits.
+    Files that no longer fit and new files are appended to the last shared
+    chunk while there is room, then to new chunks numbered after every
+    chunk seen so far. Files larger than the chunk size keep their own
+    chunk numbers, taking new numbers if they grow.
+
+    Args:
+        units: Rendered files by path, in output order.
+        previous: Chunks of the previous run.
+        chunk_size: Maximum chunk length in characters.
+
+    Returns:
+        Chunks of this run, ordered by number.
+    """
+    next_number = max((chunk.number for chunk in previous), default=0) + 1
+    placed: set[str] = set()
+    shared: list[Chunk] = []
+    own_numbers: dict[str, list[int]] = {}
+    pending: list[str] = []
+
+    for chunk in previous:
+        if chunk.part is not None:
+            if chunk.paths and chunk.paths[0] in units:
+                own_numbers.setdefault(chunk.paths[0], []).append(chunk.number)
+            continue
+
+        kept = Chunk(number=chunk.number)
+        length = 0
+        for path in chunk.paths:
+            unit = units.get(path)
+            if unit is None or path in placed or unit.length > chunk_size:
+                continue
+            placed.add(path)
+            added = unit.length + (1 if kept.paths else 0)
+            if length + added > chunk_size:
+                pending.append(path)
+                continue
+            kept.paths.append(path)
+            length += added
+        if kept.paths:
+            shared.append(kept)
+
+    pending += [path for path, unit in units.items() if path not in placed and unit.length <= chunk_size]
+
+    chunks = list(shared)
+    large = [path for path, unit in units.items() if unit.length > chunk_size]
+
+    for path in large:
+        numbers = own_numbers.get(path, [])
+        for part in range(len(units[path].split(chunk_size))):
+            if part < len(numbers):
+                number = numbers[part]
+            else:
+                number = next_number
+                next_number += 1
+            chunks.append(Chunk(number=number, paths=[path], part=part))
+
+    open_chunk = max(shared, key=lambda chunk: chunk.number, default=None)
+    open_length = 0
+    if open_chunk is not None:
+        open_length = sum(units[path].length for path in open_chunk.paths) + len(open_chunk.paths) - 1
+
+    for path in pending:
+        added = units[path].length + 1
+        if open_chunk is None or open_length + added > chunk_size:
+            open_chunk = Chunk(number=next_number)
+            next_number += 1
+            chunks.append(open_chunk)
+            open_length = units[path].length
+        else:
+            open_length += added
+        open_chunk.paths.append(path)
+
+    return sorted(chunks, key=lambda chunk: chunk.number)
+
+
+def render_chunk(chunk: Chunk, units: dict[str, Unit], chunk_size: int) -> tuple[bytes, list[dict]]:
+    """Build a chunk's content and the byte range of each file in it.
+
+    Args:
+        chunk: Chunk to render.
+        units: Rendered files by path.
+        chunk_size: Chunk size, used to split large files.
+
+    Returns:
+        Tuple of (content, list of {path, start, end} byte ranges).
+    """
+    if chunk.part is not None:
+        path = chunk.paths[0]
+        data = units[path].split(chunk_size)[chunk.part]
+        return data, [{"path": path, "start": 0, "end": len(data)}]
+
+    parts = []
+    ranges = []
+    offset = 0
+    for index, path in enumerate(chunk.paths):
+        if index:
+            parts.append(b"\n")
+            offset += 1
+        data = units[path].data
+        parts.append(data)
+        ranges.append({"path": path, "start": offset, "end": offset + len(data)})
+        offset += len(data)
+
+    return b"".join(parts), ranges
+
+
+def process_file(path: str, strip_whitespace: bool, minifier: Minifier | None = None) -> bytes:
+    """Return a file's content as it is written to the output."""
+    return b"".join(file_blocks(path, strip_whitespace, minifier))
+
+
+def emit_incremental(
+    paths: list[str],
+    prefix: str,
+    chunk_size: int | None,
+    strip_whitespace: bool,
+    quiet: bool,
+    content_index: ContentIndex | None = None,
+    max_file_size: int = 0,
+    jobs: int = 1,
+    stats: Stats | None = None,
+    plan: MinifyPlan | None = None,
+) -> list[str]:
+    """Write output using the content cache and stable chunk placement.
+
+    Only chunks whose content changed are rewritten, plus any missing from
+    disk; chunks no longer used are removed. The manifest records, for
+    every chunk, its files and their byte ranges.
+
+    Args:
+        paths: Files to write, in order.
+        prefix: Output file, or chunk prefix when chunking.
+        chunk_size: Chunk size in characters, or None for a single file.
+        strip_whitespace: Remove leading whitespace from every line.
+        quiet: Do not report changed chunks.
+        content_index: Replaces repeated content with a reference, if given.
+        max_file_size: Largest file to include, or 0 for no limit.
+        jobs: Reader threads.
+        stats: Collects skip reasons and timings, if given.
+        plan: Minifiers by type and the type of each file, if given.
+
+    Returns:
+        Names of the output files whose content changed.
+    """
+    plan = plan or MinifyPlan()
+    options = {
+        "chunk_size": chunk_size,
+        "no_whitespace": strip_whitespace,
+        "dedup_content": content_index is not None,
+        "max_file_size": max_file_size,
+        "minify": {name: minifier.language for name, minifier in plan.minifiers.items()},
+    }
+    options_key = "ws" if strip_whitespace else "raw"
+    cache = ContentCache(CACHE_DIR, options_key)
+
+    stats = stats or Stats()
+
+    def process(path: str) -> bytes:
+        minifier = plan.minifier(path)
+        if minifier is None:
+            return cache.processed(path, lambda p: process_file(p, strip_whitespace))
+        return cache.processed(
+            path, lambda p: process_file(p, strip_whitespace, minifier), f"-{minifier.language}"
+        )
+
+    def reader(path: str) -> ReadResult:
+        return read_file(path, strip_whitespace, max_file_size, stats, process)
+
+    units: dict[str, Unit] = {}
+    for result in ordered_map(reader, unique_paths(paths), jobs):
+        path = result.path
+        if result.skip:
+            stats.skipped.append((path, result.skip))
+            continue
+
+        content = result.data or b""
+        minifier = plan.minifier(path)
+        original = None
+        if result.error:
+            print(f"WARNING: could not read {path}: {result.error}", file=sys.stderr)
+        elif content_index is not None:
+            try:
+                original = content_index.original(path)
+            except OSError:
+                original = None
+            if original is not None:
+                content = reference_line(original)
+        if minifier is not None and not result.error and original is None:
+            content = plan.drop_repeated_header(minifier, content)
+            stats.add_minified(plan.path_types[path], result.size, len(content))
+
+        data = file_header(path) + content
+        units[path] = Unit(path=path, data=data, length=text_length(data))
+        stats.files += 1
+
+    previous = load_manifest(MANIFEST_FILE, options).get("chunks", [])
+    previous_hashes = {chunk["name"]: chunk["sha256"] for chunk in previous}
+    previous_stats = {chunk["name"]: [chunk.get("size"), chunk.get("mtime_ns")] for chunk in previous}
+
+    if chunk_size is None:
+        chunks = [Chunk(number=0, paths=list(units))]
+    else:
+        previous_chunks = [
+            Chunk(number=chunk["number"], paths=chunk["files"], part=chunk.get("part")) for chunk in previous
+        ]
+        chunks = assign_chunks(units, previous_chunks, chunk_size)
+
+    manifest_chunks = []
+    changed = []
+
+    for chunk in chunks:
+        name = prefix if chunk_size is None else f"{prefix}.{chunk.number:04d}"
+        data, ranges = render_chunk(chunk, units, chunk_size or 0)
+        digest = hashlib.sha256(data).hexdigest()
+
+        if previous_hashes.get(name) != digest:
+            changed.append(name)
+
+        # Rewrite when the content changed or the file on disk is not the one written last time
+        try:
+            stat = os.stat(name)
+            on_disk = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            on_disk = None
+        if previous_hashes.get(name) != digest or on_disk != previous_stats.get(name):
+            write_atomic(name, data)
+            stat = os.stat(name)
+
+        entry = {
+            "name": name,
+            "number": chunk.number,
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "files": chunk.paths,
+            "ranges": ranges,
+        }
+        if chunk.part is not None:
+            entry["part"] = chunk.part
+        manifest_chunks.append(entry)
+
+    current_names = {chunk["name"] for chunk in manifest_chunks}
+    removed = sorted(name for name in previous_hashes if name not in current_names)
+    for name in removed:
+        try:
+            os.unlink(name)
+        except OSError:
+            pass
+
+    files: dict[str, list[dict]] = {}
+    for chunk in manifest_chunks:
+        for byte_range in chunk["ranges"]:
+            files.setdefault(byte_range["path"], []).append(
+                {"chunk": chunk["name"], "start": byte_range["start"], "end": byte_range["end"]}
+            )
+
+    manifest = {"version": CACHE_VERSION, "options": options, "files": files, "chunks": manifest_chunks}
+    write_atomic(MANIFEST_FILE, json.dumps(manifest, indent=2).encode() + b"\n")
+    cache.save(set(units))
+
+    if not quiet:
+        if changed:
+            print(f"Changed: {', '.join(changed)}")
+        else:
+            print("No output changed since the last run.")
+        if removed:
+            print(f"Removed: {', '.join(removed)}")
+
+    return changed
+
+
+def read_path_list(stream, with_types: bool = False) -> tuple[list[str], dict[str, str]]:
+    """Read a NUL separated list of paths.
+
+    Args:
+        stream: Binary input stream.
+        with_types: The list comes from ``collect --with-types``; a
+            ``type:NAME`` record applies to the paths after it.
+
+    Returns:
+        Tuple of (paths, type name by path).
+    """
+    paths: list[str] = []
+    path_types: dict[str, str] = {}
+    type_name = ""
+
+    for record in stream.read().split(b"\0"):
+        if not record:
+            continue
+        path = os.fsdecode(record)
+        if with_types and path.startswith(TYPE_MARKER):
+            type_name = path.removeprefix(TYPE_MARKER)
+            continue
+        paths.append(path)
+        if type_name:
+            path_types.setdefault(path, type_name)
+
+    return paths, path_types
+
+
+def parse_rule_arguments(args: argparse.Namespace) -> RuleSet:
+    """Build a RuleSet from repeated --type/--include/--exclude arguments."""
+    include: dict[str, list[str]] = {name: [] for name in args.type}
+    exclude: dict[str, list[str]] = {name: [] for name in args.type}
+
+    for target, option in ((include, args.include), (exclude, args.exclude)):
+        for rule in option:
+            name, _, pattern = rule.partition("=")
+            if name not in target:
+                raise SystemExit(f"pai_engine: rule for unknown type '{name}': {rule}")
+            target[name].append(pattern)
+
+    return RuleSet(types=[compile_type(name, include[name], exclude[name]) for name in args.type])
+
+
+def parse_minify_arguments(rules: list[str]) -> dict[str, Minifier]:
+    """Build minifiers by type name from repeated --minify=TYPE=LANGUAGE arguments."""
+    minifiers = {}
+    for rule in rules:
+        name, _, language = rule.partition("=")
+        try:
+            minifiers[name] = Minifier(language)
+        except ValueError as exc:
+            raise SystemExit(f"pai_engine: {exc}") from exc
+    return minifiers
+
+
+def parse_arguments(args: list[str]) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        args: Command line arguments passed to the script.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        description="File engine for pai (called by pai.sh)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  pai_engine.py collect --type=dart --include='dart=*.dart' --exclude='dart=build'
+  pai_engine.py collect --source=git --untracked --type=dart --include='dart=*.dart'
+  pai_engine.py collect --with-types --type=dart --include='dart=*.dart' | pai_engine.py emit --with-types --minify=dart=dart
+  pai_engine.py collect --type=dart --include='dart=*.dart' | pai_engine.py emit --chunk=10200
+""",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = subparsers.add_parser("collect", help="Print matching files, NUL separated")
+    collect_parser.add_argument("--root", default=".", help="Folder to walk (default: .)")
+    collect_parser.add_argument(
+        "--source",
+        choices=("walk", "git"),
+        default="walk",
+        help="Walk the tree, or list files from the git index and fall back "
+        "to the walk outside a work tree (default: walk)",
+    )
+    collect_parser.add_argument(
+        "--untracked",
+        action="store_true",
+        help="With --source=git, also list untracked files that are not ignored",
+    )
+    collect_parser.add_argument(
+        "--with-types",
+        action="store_true",
+        help=f"Write a {TYPE_MARKER}NAME record before each type's files",
+    )
+    collect_parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report the source and collect time on stderr",
+    )
+    collect_parser.add_argument(
+        "--type",
+        action="append",
+        default=[],
+        help="Type to collect, in output order (repeatable)",
+    )
+    collect_parser.add_argument(
+        "--include",
+        action="append",
+        default=[],
+        metavar="TYPE=PATTERN",
+        help="Include pattern for a type (repeatable)",
+    )
+    collect_parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="TYPE=PATTERN",
+        help="Exclude pattern for a type (repeatable)",
+    )
+
+    emit_parser = subparsers.add_parser(
+        "emit",
+        help="Write the contents of NUL separated paths read from stdin",
+    )
+    emit_parser.add_argument(
+        "--chunk",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CHUNK_SIZE,
+        metavar="SIZE",
+        help=f"Write pai.output.NNNN chunks of at most SIZE characters (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    emit_parser.add_argument(
+        "--no-whitespace",
+        action="store_true",
+        help="Strip leading whitespace from all lines",
+    )
+    emit_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Reuse cached file hashes and output, keep files in their previous chunks "
+        f"and write {MANIFEST_FILE}",
+    )
+    emit_parser.add_argument(
+        "--dedup-content",
+        action="store_true",
+        help="Write files with the same bytes as an earlier file as a reference to it",
+    )
+    emit_parser.add_argument(
+        "--with-types",
+        action="store_true",
+        help=f"Read {TYPE_MARKER}NAME records written by collect --with-types",
+    )
+    emit_parser.add_argument(
+        "--minify",
+        action="append",
+        default=[],
+        metavar="TYPE=LANGUAGE",
+        help="Strip comments and extra blank lines from a type's files using a "
+        "language's syntax, e.g. dart=dart (repeatable, needs --with-types)",
+    )
+    emit_parser.add_argument(
+        "--max-file-size",
+        type=parse_size,
+        default=0,
+        metavar="SIZE",
+        help="Skip files larger than SIZE, e.g. 512K or 1M (default: no limit)",
+    )
+    emit_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="Reader threads (default: CPU count)",
+    )
+    emit_parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Report skipped files and stage timings on stderr",
+    )
+    emit_parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not report which outputs changed",
+    )
+    emit_parser.add_argument(
+        "--output",
+        default=OUTPUT_PREFIX,
+        help=f"Output file, or chunk prefix with --chunk (default: {OUTPUT_PREFIX})",
+    )
+
+    return parser.parse_args(args)
+
+
+def main() -> None:
+    """Main execution block."""
+    args = parse_arguments(sys.argv[1:])
+
+    start = time.perf_counter()
+
+    if args.command == "collect":
+        rules = parse_rule_arguments(args)
+        out = sys.stdout.buffer
+        count = 0
+        files, source = collect(args.root, rules, args.source, args.untracked)
+        for rule, paths in zip(rules.types, files, strict=True):
+            if args.with_types and paths:
+                out.write(os.fsencode(f"{TYPE_MARKER}{rule.name}") + b"\0")
+            for rel_path in paths:
+                out.write(os.fsencode(f"./{rel_path}") + b"\0")
+                count += 1
+        out.flush()
+
+        if args.verbose:
+            where = "the git index" if source == "git" else "a walk"
+            print(f"Collected {count} files from {where} in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+
+    elif args.command == "emit":
+        content_index = ContentIndex() if args.dedup_content else None
+        paths, path_types = read_path_list(sys.stdin.buffer, args.with_types)
+        plan = MinifyPlan(minifiers=parse_minify_arguments(args.minify), path_types=path_types)
+        stats = Stats()
+        jobs = max(1, args.jobs)
+
+        if args.incremental:
+            emit_incremental(
+                paths,
+                args.output,
+                args.chunk,
+                args.no_whitespace,
+                args.quiet,
+                content_index,
+                args.max_file_size,
+                jobs,
+                stats,
+                plan,
+            )
+        else:
+            if args.chunk is not None:
+                sink = ChunkSink(args.chunk, args.output)
+            else:
+                sink = OutputSink(args.output)
+            with sink:
+                emit(paths, sink, args.no_whitespace, content_index, args.max_file_size, jobs, stats, plan)
+
+        if content_index is not None and not args.quiet:
+            print(content_index.report())
+
+        if args.verbose:
+            print(stats.report(time.perf_counter() - start), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
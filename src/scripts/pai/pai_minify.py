@@ -0,0 +1,342 @@
+"""Comment and blank-line stripping for pai.
+
+Each language is described by the string literals, line comments and
+block comments of its syntax. A single regular expression per language
+finds those tokens left to right, so comment markers inside strings are
+never mistaken for comments. Minifying:
+
+- removes comments, dropping lines that held nothing but a comment,
+- keeps the leading comment block of a file (usually a license header)
+  so the caller can decide whether it was already written,
+- strips trailing whitespace and collapses runs of blank lines into one.
+
+Input is consumed as blocks of whole lines. A token that may continue
+past the end of a block is carried over to the next one, so large files
+are minified as a stream.
+
+Known limits: nested block comments (Dart, some SQL dialects) end at the
+first ``*/``, and JavaScript regular expression literals are not
+recognised as tokens.
+"""
+
+import re
+from dataclasses import dataclass
+
+# Comments are first replaced by this marker so that the line stage can
+# tell a line that held only a comment from one that was blank already.
+COMMENT_MARK = b"\0"
+
+BLANK_CHARS = b" \t\r\n\f\v"
+
+DOUBLE_QUOTED = rb'"(?:[^"\\\n]|\\.)*(?:"|(?=\n)|\Z)'
+
+SINGLE_QUOTED = rb"'(?:[^'\\\n]|\\.)*(?:'|(?=\n)|\Z)"
+
+SLASH_LINE_COMMENT = rb"//[^\n]*"
+
+SLASH_BLOCK_COMMENT = rb"/\*.*?(?:\*/|\Z)"
+
+# Patterns of the line stage are anchored on a character that has to be
+# present, which is far faster than testing every position of the text.
+COMMENT_ONLY_LINE_PATTERN = re.compile(rb"\n[ \t]*\0[ \t\0]*(?=\n)")
+
+TRAILING_BLANKS = (b" ", b"\t", b"\r", b"\f", b"\v")
+
+TRAILING_WHITESPACE_PATTERN = re.compile(rb"[ \t\r\f\v]+\n")
+
+BLANK_RUN_PATTERN = re.compile(rb"\n{3,}")
+
+WHITESPACE_PATTERN = re.compile(rb"\s*")
+
+REST_OF_LINE_PATTERN = re.compile(rb"[ \t\r\f\v]*(?:\n|\Z)")
+
+
+@dataclass(frozen=True)
+class Syntax:
+    """Tokens of a language that matter for stripping comments.
+
+    Every pattern starts with a literal character; a lookbehind may only
+    come after it. Alternatives that all start with a literal let the
+    regular expression engine jump to the next possible token instead of
+    trying each one at every position, which is most of the cost on text
+    without comments.
+
+    Attributes:
+        strings: Regular expressions for string literals, longest
+            delimiters first. Each must also match an unterminated
+            literal up to the end of its line or of the input.
+        line_comments: Regular expressions for comments that run to the
+            end of the line.
+        block_comments: Regular expressions for delimited comments, also
+            matching an unterminated comment up to the end of the input.
+    """
+
+    strings: tuple[bytes, ...] = ()
+    line_comments: tuple[bytes, ...] = ()
+    block_comments: tuple[bytes, ...] = ()
+
+
+C_SYNTAX = Syntax(
+    strings=(DOUBLE_QUOTED, SINGLE_QUOTED),
+    line_comments=(SLASH_LINE_COMMENT,),
+    block_comments=(SLASH_BLOCK_COMMENT,),
+)
+
+LANGUAGES: dict[str, Syntax] = {
+    "blank-lines": Syntax(),
+    "c": C_SYNTAX,
+    "cpp": Syntax(
+        strings=(
+            rb'R(?<!\wR)"(?P<delimiter>[^()\\\s"]{0,16})\(.*?(?:\)(?P=delimiter)"|\Z)',
+            DOUBLE_QUOTED,
+            SINGLE_QUOTED,
+        ),
+        line_comments=C_SYNTAX.line_comments,
+        block_comments=C_SYNTAX.block_comments,
+    ),
+    "csharp": Syntax(
+        strings=(
+            rb'""".*?(?:"""|\Z)',
+            rb'@\$?"(?:[^"]|"")*(?:"|\Z)',
+            rb'\$@"(?:[^"]|"")*(?:"|\Z)',
+            DOUBLE_QUOTED,
+            SINGLE_QUOTED,
+        ),
+        line_comments=C_SYNTAX.line_comments,
+        block_comments=C_SYNTAX.block_comments,
+    ),
+    "dart": Syntax(
+        strings=(
+            rb"r(?<![\w$]r)'''.*?(?:'''|\Z)",
+            rb'r(?<![\w$]r)""".*?(?:"""|\Z)',
+            rb"'''(?:[^\\]|\\.)*?(?:'''|\Z)",
+            rb'"""(?:[^\\]|\\.)*?(?:"""|\Z)',
+            rb"r(?<![\w$]r)'[^'\n]*(?:'|(?=\n)|\Z)",
+            rb'r(?<![\w$]r)"[^"\n]*(?:"|(?=\n)|\Z)',
+            DOUBLE_QUOTED,
+            SINGLE_QUOTED,
+        ),
+        line_comments=C_SYNTAX.line_comments,
+        block_comments=C_SYNTAX.block_comments,
+    ),
+    "go": Syntax(
+        strings=(rb"`[^`]*(?:`|\Z)", DOUBLE_QUOTED, SINGLE_QUOTED),
+        line_comments=C_SYNTAX.line_comments,
+        block_comments=C_SYNTAX.block_comments,
+    ),
+    "javascript": Syntax(
+        strings=(rb"`(?:[^`\\]|\\.)*(?:`|\Z)", DOUBLE_QUOTED, SINGLE_QUOTED),
+        line_comments=C_SYNTAX.line_comments,
+        block_comments=C_SYNTAX.block_comments,
+    ),
+    "sql": Syntax(
+        strings=(
+            rb"\$(?P<tag>[A-Za-z_]\w*|)\$.*?(?:\$(?P=tag)\$|\Z)",
+            rb"'(?:[^']|'')*(?:'|\Z)",
+            rb'"(?:[^"]|"")*(?:"|\Z)',
+        ),
+        line_comments=(rb"--[^\n]*",),
+        block_comments=C_SYNTAX.block_comments,
+    ),
+}
+LANGUAGES["typescript"] = LANGUAGES["javascript"]
+
+
+def compile_syntax(syntax: Syntax) -> tuple[re.Pattern | None, frozenset[int]]:
+    """Compile a syntax into one pattern.
+
+    Each token becomes its first character followed by a group holding
+    the rest, so the group that took part in a match tells a string from
+    a comment.
+
+    Returns:
+        Tuple of (pattern, numbers of the groups that match strings). The
+        pattern is None if the syntax has no tokens.
+    """
+    alternatives = []
+    string_groups = set()
+    group = 1
+
+    for is_string, tokens in (
+        (True, syntax.strings),
+        (False, syntax.line_comments),
+        (False, syntax.block_comments),
+    ):
+        for token in tokens:
+            first = 2 if token.startswith(b"\\") else 1
+            alternatives.append(token[:first] + b"(" + token[first:] + b")")
+            if is_string:
+                string_groups.add(group)
+            group += 1 + re.compile(token).groups
+
+    if not alternatives:
+        return None, frozenset()
+    return re.compile(b"|".join(alternatives), re.DOTALL), frozenset(string_groups)
+
+
+class Minifier:
+    """Strips comments and blank lines from one language's source.
+
+    Args:
+        language: Name of a syntax in LANGUAGES.
+
+    Raises:
+        ValueError: If the language is not known.
+    """
+
+    def __init__(self, language: str) -> None:
+        if language not in LANGUAGES:
+            known = ", ".join(sorted(LANGUAGES))
+            raise ValueError(f"unknown minify language '{language}' (known: {known})")
+        self.language = language
+        self.pattern, self.string_groups = compile_syntax(LANGUAGES[language])
+
+    def _header_length(self, data: bytes) -> int:
+        """Return the length of the comment block data starts with.
+
+        The block ends with the line of the last leading comment that is
+        not followed by code on that line.
+        """
+        header_end = 0
+        while True:
+            start = WHITESPACE_PATTERN.match(data, header_end).end()
+            match = self.pattern.match(data, start)
+            if match is None or match.lastindex in self.string_groups:
+                return header_end
+            line_end = REST_OF_LINE_PATTERN.match(data, match.end())
+            if line_end is None:
+                return header_end
+            header_end = line_end.end()
+
+    def _strip_tokens(self, data: bytes, state: dict, final: bool) -> tuple[bytes, bytes]:
+        """Replace comments in data, keeping the leading comment block.
+
+        A comment between two non-blank characters becomes a space so the
+        code on either side is not joined; any other comment becomes
+        COMMENT_MARK for the line stage.
+
+        Returns:
+            Tuple of (processed text, tail to prepend to the next block).
+            The tail is a token that reaches the end of data and may
+            continue in the next block.
+        """
+        if self.pattern is None:
+            return data, b""
+
+        header = b""
+        if state["header"]:
+            length = self._header_length(data)
+            if not final and not data[length:].strip():
+                # The header may go on in the next block
+                return b"", data
+            state["header"] = False
+            header, data = data[:length], data[length:]
+
+        end = len(data)
+        tail = []
+        # The character before data, kept from the previous block
+        previous = state["previous"]
+
+        def replace(match: re.Match) -> bytes:
+            start, stop = match.span()
+            if stop == end and not final:
+                tail.append(start)
+                return b""
+            if match.lastindex in self.string_groups:
+                return match.group()
+            before = data[start - 1] if start else previous
+            if stop < end and before not in BLANK_CHARS and data[stop] not in BLANK_CHARS:
+                return b" "
+            return COMMENT_MARK
+
+        text = header + self.pattern.sub(replace, data)
+        cut = tail[0] if tail else end
+        if cut:
+            state["previous"] = data[cut - 1]
+        return text, data[cut:]
+
+    @staticmethod
+    def _clean_lines(lines: bytes, state: dict) -> bytes:
+        """Drop comment-only lines, trailing whitespace and extra blank lines.
+
+        Args:
+            lines: Whole lines with comments already marked.
+            state: Carries the number of newlines the output ends in.
+
+        Returns:
+            Cleaned lines.
+        """
+        # Each pattern only runs when a quick substring test finds work for it
+        if COMMENT_MARK in lines:
+            lines = COMMENT_ONLY_LINE_PATTERN.sub(b"", b"\n" + lines)[1:].replace(COMMENT_MARK, b"")
+        if any(char + b"\n" in lines for char in TRAILING_BLANKS):
+            lines = TRAILING_WHITESPACE_PATTERN.sub(b"\n", lines)
+        if b"\n\n\n" in lines:
+            lines = BLANK_RUN_PATTERN.sub(b"\n\n", lines)
+
+        # Blank lines at the start of this piece join those the output
+        # already ends with; none are kept at the start of the file.
+        content = lines.lstrip(b"\n")
+        leading = len(lines) - len(content)
+        allowed = 0 if state["newlines"] is None else max(0, 2 - state["newlines"])
+        lines = b"\n" * min(leading, allowed) + content
+
+        if not content:
+            if state["newlines"] is not None:
+                state["newlines"] += len(lines)
+        else:
+            state["newlines"] = len(content) - len(content.rstrip(b"\n"))
+        return lines
+
+    def minify_blocks(self, blocks):
+        """Minify a stream of blocks.
+
+        Args:
+            blocks: Bytes-like blocks of the input, in order.
+
+        Yields:
+            Blocks of whole lines, each ending in a newline.
+        """
+        state = {"header": True, "newlines": None, "previous": BLANK_CHARS[0]}
+        carry = b""
+        partial = b""
+
+        for block in blocks:
+            data = carry + bytes(block) if carry else bytes(block)
+            text, carry = self._strip_tokens(data, state, final=False)
+            text = partial + text
+            cut = text.rfind(b"\n") + 1
+            partial = text[cut:]
+            if cut:
+                lines = self._clean_lines(text[:cut], state)
+                if lines:
+                    yield lines
+
+        text, _ = self._strip_tokens(carry, state, final=True)
+        text = partial + text
+        if text:
+            lines = self._clean_lines(text if text.endswith(b"\n") else text + b"\n", state)
+            if lines:
+                yield lines
+
+    def minify(self, data: bytes) -> bytes:
+        """Return minified content."""
+        return b"".join(self.minify_blocks((data,)))
+
+    def split_header(self, data: bytes) -> tuple[bytes, bytes]:
+        """Split minified content into its leading comment block and the rest.
+
+        Args:
+            data: Content produced by minify.
+
+        Returns:
+            Tuple of (header, rest). The header is the run of comments the
+            content starts with, up to the end of the line holding the
+            last one that is not followed by code. It is empty if there
+            is no such comment.
+        """
+        if self.pattern is None:
+            return b"", data
+
+        header_end = self._header_length(data)
+        return data[:header_end], data[header_end:]